@@ -7,6 +7,8 @@
 
 import os
 
+from gunicorn.arbiter import Arbiter
+
 # On Heroku, web dynos must bind to the port number specified via the `PORT` env var. This
 # env var is set automatically for web dynos and also when using `heroku local` locally:
 # https://devcenter.heroku.com/articles/dyno-startup-behavior#port-binding-of-web-dynos
@@ -71,3 +73,21 @@ secure_scheme_headers = {
 }
 proxy_allow_ips = "*"
 proxy_protocol = True
+
+
+def when_ready(server: Arbiter) -> None:
+    # Imports run on threads inside the workers, so a restart cuts off any in progress. The app is
+    # preloaded here, mark the ones left behind by the previous run as failed.
+    from django.db import connections
+
+    from pyjams.utils.imports import fail_stale_imports
+
+    # Only housekeeping, the server must still come up without a database or before migrating.
+    # Stale jobs are also failed one at a time when their status is polled.
+    try:
+        fail_stale_imports()
+    except Exception:
+        server.log.exception("Failing stale imports on startup failed")
+    finally:
+        # Forked workers must not share the master's database connection
+        connections.close_all()
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PyjamsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pyjams"
+
+    def ready(self) -> None:
+        # Connect signal receivers
+        from pyjams import signals  # noqa: F401
@@ -0,0 +1,61 @@
+import json
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from spotipy import Spotify, SpotifyClientCredentials
+
+from pyjams.utils.analytics import get_report
+from pyjams.utils.tracks import format_duration
+
+
+class Command(BaseCommand):
+    help = "Build the site wide analytics report over active featured playlists and store it in the cache."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--fetch-missing",
+            action="store_true",
+            help="Fetch playlists without a stored snapshot and uncached track metadata from Spotify",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        spotify = None
+        if options["fetch_missing"]:
+            spotify = Spotify(
+                auth_manager=SpotifyClientCredentials(
+                    client_id=settings.SPOTIFY_CLIENT_ID, client_secret=settings.SPOTIFY_CLIENT_SECRET
+                )
+            )
+        report = get_report(refresh=True, spotify=spotify)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        duration = report["duration"]
+        self.stdout.write(
+            f"{report['playlists']} playlists, {report['tracks']} tracks "
+            f"({report['tracks_with_metadata']} with metadata), {report['playlist_entries']} playlist entries"
+        )
+        self.stdout.write(f"Mean duration {format_duration(int(duration['mean_ms']))}")
+        for name, value in duration["percentiles_ms"].items():
+            self.stdout.write(f"  {name}: {format_duration(int(value))}")
+        self.stdout.write(f"Explicit: {report['explicit_ratio']:.1%}")
+        self.stdout.write(
+            "Popularity: " + ", ".join(f"{k} {v:.0f}" for k, v in report["popularity_percentiles"].items())
+        )
+        self.stdout.write("Top artists:")
+        for artist in report["top_artists"]:
+            self.stdout.write(f"  {artist['name']}: {artist['tracks']} tracks in {artist['playlists']} playlists")
+        overlap = report["community_overlap"]
+        self.stdout.write(
+            f"Community overlap: {overlap['overlapping_pairs']} of {overlap['pairs']} pairs share tracks, "
+            f"mean Jaccard {overlap['mean_jaccard']:.3f}"
+        )
+        for pair in overlap["top"]:
+            self.stdout.write(
+                f"  {pair['first']} / {pair['second']}: {pair['shared_tracks']} shared ({pair['jaccard']:.2f})"
+            )
+        self.stdout.write(self.style.SUCCESS("Report cached"))
@@ -0,0 +1,37 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from spotipy import Spotify, SpotifyClientCredentials
+
+from pyjams.models import FeaturedPlaylist
+from pyjams.utils.artists import index_playlist_artists
+
+
+class Command(BaseCommand):
+    help = "Index the artists of active featured playlists that have no artist index yet."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--all", action="store_true", help="Rebuild the index of every active featured playlist")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        spotify = Spotify(
+            auth_manager=SpotifyClientCredentials(
+                client_id=settings.SPOTIFY_CLIENT_ID, client_secret=settings.SPOTIFY_CLIENT_SECRET
+            )
+        )
+        playlists = FeaturedPlaylist.objects.filter(is_active=True).order_by("id")
+        if not options["all"]:
+            playlists = playlists.filter(artist_entries__isnull=True)
+
+        failed = 0
+        for playlist in playlists:
+            try:
+                artists = index_playlist_artists(spotify, playlist)
+            except Exception as e:
+                # Private playlists can't be read with app credentials, they are indexed on their next edit
+                failed += 1
+                self.stderr.write(f"{playlist.name}: {e!s}")
+                continue
+            self.stdout.write(f"{playlist.name}: {artists} artists")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {len(playlists) - failed} playlists, {failed} failed"))
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-19 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pyjams", "0007_alter_featuredplaylist_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="featuredplaylist",
+            index=models.Index(
+                fields=["featured_type", "is_active", "featured_date", "id"], name="pyjams_feat_feature_623d11_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="featuredplaylist",
+            index=models.Index(
+                fields=["featured_type", "is_active", "unfeatured_date", "id"], name="pyjams_feat_feature_cbf369_idx"
+            ),
+        ),
+    ]
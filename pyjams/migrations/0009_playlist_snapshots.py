@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-19 08:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pyjams", "0008_featuredplaylist_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Track",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("spotify_id", models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PlaylistSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("snapshot_id", models.CharField(max_length=128)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("track_count", models.PositiveIntegerField()),
+                ("is_keyframe", models.BooleanField(default=False)),
+                ("chain_length", models.PositiveSmallIntegerField(default=0)),
+                ("data", models.BinaryField()),
+                (
+                    "playlist",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshots",
+                        to="pyjams.featuredplaylist",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-id"],
+                "indexes": [
+                    models.Index(fields=["playlist", "is_keyframe", "id"], name="pyjams_play_playlis_ab393d_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(fields=("playlist", "snapshot_id"), name="unique_playlist_snapshot")
+                ],
+            },
+        ),
+    ]
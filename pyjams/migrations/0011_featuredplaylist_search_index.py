@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# Kept verbatim in pyjams.utils.search, Postgres only uses an expression index for an identical expression
+PG_SEARCH_VECTOR = (
+    "(setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B'))"
+)
+PG_INDEX = "featuredplaylist_search_idx"
+FTS_TABLE = "pyjams_featuredplaylist_fts"
+
+# External content FTS5 table: the text lives in pyjams_featuredplaylist, the triggers keep the
+# index in step with every insert, update and delete
+SQLITE_FORWARDS = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "name, description, content='pyjams_featuredplaylist', content_rowid='id', tokenize='porter unicode61')",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON pyjams_featuredplaylist BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON pyjams_featuredplaylist BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF name, description ON pyjams_featuredplaylist BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"CREATE INDEX {PG_INDEX} ON pyjams_featuredplaylist USING GIN ({PG_SEARCH_VECTOR})")
+    elif vendor == "sqlite":
+        for statement in SQLITE_FORWARDS:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
+    elif vendor == "sqlite":
+        for statement in SQLITE_BACKWARDS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pyjams", "0010_import_jobs"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
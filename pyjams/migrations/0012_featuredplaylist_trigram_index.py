@@ -0,0 +1,25 @@
+from django.db import migrations
+
+PG_INDEX = "featuredplaylist_name_trgm_idx"
+
+
+def create_trigram_index(apps, schema_editor):
+    # Other databases use the in-memory index in pyjams.utils.trigrams
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(f"CREATE INDEX {PG_INDEX} ON pyjams_featuredplaylist USING GIN (name gin_trgm_ops)")
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pyjams", "0011_featuredplaylist_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
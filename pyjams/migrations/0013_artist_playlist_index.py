@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-19 08:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pyjams", "0012_featuredplaylist_trigram_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArtistPlaylist",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("artist_id", models.CharField(max_length=64)),
+                ("artist_name", models.CharField(blank=True, max_length=255)),
+                ("added_by", models.CharField(blank=True, max_length=64)),
+                ("track_count", models.PositiveIntegerField()),
+                (
+                    "playlist",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="artist_entries",
+                        to="pyjams.featuredplaylist",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("artist_id", "playlist", "added_by"), name="unique_artist_playlist_adder"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-19 08:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pyjams", "0013_artist_playlist_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlaylistSignature",
+            fields=[
+                (
+                    "playlist",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="signature",
+                        serialize=False,
+                        to="pyjams.featuredplaylist",
+                    ),
+                ),
+                ("snapshot_id", models.CharField(max_length=128)),
+                ("signature", models.BinaryField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PlaylistBand",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("band", models.PositiveSmallIntegerField()),
+                ("bucket", models.BigIntegerField()),
+                (
+                    "playlist",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="signature_bands",
+                        to="pyjams.featuredplaylist",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["band", "bucket"], name="pyjams_play_band_0506fb_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.4 on 2026-10-19 08:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pyjams", "0014_playlist_signatures"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrackSuggestion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True)),
+                ("track_uri", models.CharField(max_length=64)),
+                ("track_name", models.CharField(blank=True, max_length=255)),
+                ("artists", models.CharField(blank=True, max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("accepted", "Accepted"), ("rejected", "Rejected")],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("score", models.IntegerField(default=0)),
+                (
+                    "playlist",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="suggestions",
+                        to="pyjams.featuredplaylist",
+                    ),
+                ),
+                (
+                    "reviewed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="reviewed_suggestions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "suggested_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="track_suggestions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="SuggestionVote",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("value", models.SmallIntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="suggestion_votes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "suggestion",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="votes", to="pyjams.tracksuggestion"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="tracksuggestion",
+            index=models.Index(fields=["playlist", "status", "-score"], name="pyjams_trac_playlis_f4bd74_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="tracksuggestion",
+            constraint=models.UniqueConstraint(fields=("playlist", "track_uri"), name="unique_playlist_suggestion"),
+        ),
+        migrations.AddConstraint(
+            model_name="suggestionvote",
+            constraint=models.UniqueConstraint(fields=("suggestion", "user"), name="unique_suggestion_vote"),
+        ),
+    ]
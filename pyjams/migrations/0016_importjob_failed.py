@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-19 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pyjams", "0015_track_suggestions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="failed",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,14 +1,35 @@
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
 from enum import Enum, Flag, auto
 from typing import Any, ClassVar, Optional, TypedDict
 
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.core.validators import MinLengthValidator, URLValidator
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Index
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from pyjams.utils import cache as pyjams_cache, minhash, snapshots
+from pyjams.utils.pagination import DEFAULT_PAGE_SIZE, KeysetPage, paginate_keyset
+from pyjams.utils.search import rank_featured, search_terms
+from pyjams.utils.trigrams import TRIGRAM_LIMIT, TRIGRAM_THRESHOLD, rank_featured_similar
+
+# Featured playlists only change when someone features or unfeatures, so cached lookups can live
+# for a long time; every write bumps the featured cache generation.
+FEATURED_CACHE_TIMEOUT = 60 * 60
+# Similar playlist results also depend on other playlists' signatures, which don't bump the
+# featured generation, so they are only cached briefly
+SIMILAR_CACHE_TIMEOUT = 60 * 10
+# Candidates sharing an LSH band that are scored at most
+SIMILAR_MAX_CANDIDATES = 200
+# Every this many snapshots a full track list is stored, bounding how many deltas a read replays
+SNAPSHOT_KEYFRAME_INTERVAL = 20
+# Snapshots kept per playlist, older ones are pruned as new ones are recorded
+SNAPSHOT_RETENTION = 200
+
 
 def validate_permissions_schema(value: dict[str, Any]) -> None:
     """Validates the permissions schema for playlist managers."""
@@ -182,6 +203,9 @@ class FeaturedPlaylist(BaseModel):
         indexes: ClassVar[list[Index]] = [
             Index(fields=["featured_type", "is_active"]),
             Index(fields=["creator", "featured_type"]),
+            # Keyset pagination of the community listing and the site featured history
+            Index(fields=["featured_type", "is_active", "featured_date", "id"]),
+            Index(fields=["featured_type", "is_active", "unfeatured_date", "id"]),
         ]
         permissions: ClassVar[list[tuple[str, str]]] = [
             ("can_feature_site", _("Can feature site playlists")),
@@ -228,15 +252,101 @@ class FeaturedPlaylist(BaseModel):
         """Check if this is a community featured playlist."""
         return self.featured_type == "community" and self.is_active
 
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Invalidate cached featured playlist lookups for every worker."""
+        pyjams_cache.invalidate(pyjams_cache.FEATURED_NAMESPACE)
+
     @classmethod
     def get_site_featured(cls) -> Optional["FeaturedPlaylist"]:
         """Get the current site featured playlist."""
-        return cls.objects.filter(featured_type="site", is_active=True).first()
+        return pyjams_cache.get_or_set(
+            pyjams_cache.FEATURED_NAMESPACE,
+            "site",
+            lambda: cls.objects.filter(featured_type="site", is_active=True).select_related("creator").first(),
+            FEATURED_CACHE_TIMEOUT,
+        )
+
+    @classmethod
+    def get_community_featured_page(
+        cls, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> KeysetPage["FeaturedPlaylist"]:
+        """Get one page of active community featured playlists, most recently featured first.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        queryset = cls.objects.filter(featured_type="community", is_active=True).select_related("creator")
+        return pyjams_cache.get_or_set(
+            pyjams_cache.FEATURED_NAMESPACE,
+            f"community_page:{cursor or ''}:{limit}",
+            lambda: paginate_keyset(queryset, "featured_date", cursor, limit),
+            FEATURED_CACHE_TIMEOUT,
+        )
+
+    @classmethod
+    def get_active_spotify_ids(cls) -> frozenset[str]:
+        """Get the Spotify ids of all active featured playlists."""
+        return pyjams_cache.get_or_set(
+            pyjams_cache.FEATURED_NAMESPACE,
+            "active_ids",
+            lambda: frozenset(cls.objects.filter(is_active=True).values_list("spotify_id", flat=True)),
+            FEATURED_CACHE_TIMEOUT,
+        )
+
+    @classmethod
+    def search(cls, query: str, page: int = 1, limit: int = DEFAULT_PAGE_SIZE) -> tuple[list["FeaturedPlaylist"], bool]:
+        """Full-text search over active featured playlists, best match first.
+
+        Returns:
+            The playlists on the requested page and whether there is a next page
+        """
+
+        def lookup() -> tuple[list[FeaturedPlaylist], bool]:
+            offset = (page - 1) * limit
+            # One extra row tells us whether another page exists
+            ranked = rank_featured(query, limit + 1, offset)
+            if ranked is None:
+                queryset = cls.objects.filter(is_active=True)
+                for term in search_terms(query):
+                    queryset = queryset.filter(models.Q(name__icontains=term) | models.Q(description__icontains=term))
+                rows = list(queryset.select_related("creator")[offset : offset + limit + 1])
+            else:
+                found = cls.objects.select_related("creator").in_bulk([row_id for row_id, _ in ranked])
+                rows = [found[row_id] for row_id, _ in ranked if row_id in found]
+            return rows[:limit], len(rows) > limit
+
+        return pyjams_cache.get_or_set(
+            pyjams_cache.FEATURED_NAMESPACE, f"search:{query.lower()}:{page}:{limit}", lookup, FEATURED_CACHE_TIMEOUT
+        )
 
     @classmethod
-    def get_community_featured(cls) -> models.QuerySet["FeaturedPlaylist"]:
-        """Get all active community featured playlists."""
-        return cls.objects.filter(featured_type="community", is_active=True).select_related("creator")
+    def similar_to(
+        cls, query: str, threshold: float = TRIGRAM_THRESHOLD, limit: int = TRIGRAM_LIMIT
+    ) -> list[tuple["FeaturedPlaylist", float]]:
+        """Active featured playlists whose name is spelled like ``query``, most similar first.
+
+        Returns:
+            ``(playlist, similarity)`` pairs, similarity from ``threshold`` to 1
+        """
+
+        def lookup() -> list[tuple[FeaturedPlaylist, float]]:
+            ranked = rank_featured_similar(
+                query,
+                threshold,
+                limit,
+                pyjams_cache.get_generation(pyjams_cache.FEATURED_NAMESPACE),
+                lambda: cls.objects.filter(is_active=True).values_list("id", "name").iterator(),
+            )
+            found = cls.objects.select_related("creator").in_bulk([row_id for row_id, _ in ranked])
+            return [(found[row_id], score) for row_id, score in ranked if row_id in found]
+
+        return pyjams_cache.get_or_set(
+            pyjams_cache.FEATURED_NAMESPACE,
+            f"similar:{query.lower()}:{threshold}:{limit}",
+            lookup,
+            FEATURED_CACHE_TIMEOUT,
+        )
 
     @classmethod
     def user_has_featured(cls, user: User) -> bool:
@@ -250,6 +360,8 @@ class FeaturedPlaylist(BaseModel):
         """Set a new site-wide featured playlist."""
         # Deactivate current site featured playlist
         cls.objects.filter(featured_type="site", is_active=True).update(is_active=False, unfeatured_date=timezone.now())
+        # Bulk updates bypass post_save, so invalidate explicitly
+        cls.invalidate_cache()
 
         # Create new site featured playlist
         return cls.objects.create(
@@ -268,6 +380,24 @@ class FeaturedPlaylist(BaseModel):
         """Get previous site featured playlists."""
         return cls.objects.filter(featured_type="site", is_active=False).order_by("-unfeatured_date")
 
+    @classmethod
+    def get_previous_site_featured_page(
+        cls, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> KeysetPage["FeaturedPlaylist"]:
+        """Get one page of previous site featured playlists, most recently unfeatured first.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        # Every unfeature path stamps unfeatured_date, rows without one cannot be placed in the ordering
+        queryset = cls.objects.filter(featured_type="site", is_active=False, unfeatured_date__isnull=False)
+        return pyjams_cache.get_or_set(
+            pyjams_cache.FEATURED_NAMESPACE,
+            f"history_page:{cursor or ''}:{limit}",
+            lambda: paginate_keyset(queryset.select_related("creator"), "unfeatured_date", cursor, limit),
+            FEATURED_CACHE_TIMEOUT,
+        )
+
     def unfeature_site_playlist(self) -> None:
         """Unfeature the current site playlist."""
         if self.featured_type == "site" and self.is_active:
@@ -300,6 +430,15 @@ class PlaylistManager(BaseModel):
     def get_active_managers(cls, playlist_id: int) -> models.QuerySet[Any]:
         return cls.objects.filter(playlist_id=playlist_id, is_active=True).select_related("playlist")
 
+    @classmethod
+    def version(cls, playlist_id: int) -> str:
+        """Changes whenever a manager of the playlist is added, removed or edited."""
+        rows = cls.objects.filter(playlist_id=playlist_id).aggregate(
+            active=models.Count("id", filter=models.Q(is_active=True)), changed=models.Max("updated_at")
+        )
+        changed = rows["changed"].isoformat() if rows["changed"] else ""
+        return f"{rows['active']}:{changed}"
+
     @classmethod
     def add_manager(cls, playlist_id: int, user_id: str) -> tuple[bool, str]:
         try:
@@ -354,3 +493,451 @@ class ModerationAction(BaseModel):
 
     def get_permissions(self) -> PermissionsDict:
         return self.permissions
+
+
+class Track(models.Model):
+    """A Spotify track id interned as a small integer, so snapshots can store 4 bytes per track."""
+
+    spotify_id = models.CharField(max_length=64, unique=True)
+
+    def __str__(self) -> str:
+        return self.spotify_id
+
+    @classmethod
+    def intern(cls, spotify_ids: Iterable[str]) -> dict[str, int]:
+        """Get the interned id of every given track, creating the missing ones."""
+        wanted = set(spotify_ids)
+        found = dict(cls.objects.filter(spotify_id__in=wanted).values_list("spotify_id", "id"))
+        missing = wanted - found.keys()
+        if missing:
+            cls.objects.bulk_create([cls(spotify_id=spotify_id) for spotify_id in missing], ignore_conflicts=True)
+            found.update(cls.objects.filter(spotify_id__in=missing).values_list("spotify_id", "id"))
+        return found
+
+    @classmethod
+    def resolve(cls, ids: Iterable[int]) -> dict[int, str]:
+        """Map interned ids back to Spotify track ids."""
+        return dict(cls.objects.filter(id__in=set(ids)).values_list("id", "spotify_id"))
+
+
+@dataclass(frozen=True)
+class SnapshotDiff:
+    added: list[str]
+    removed: list[str]
+    # True when the same tracks are present in both, but in a different order
+    reordered: bool
+
+
+class PlaylistSnapshot(models.Model):
+    """One version of a featured playlist's track list.
+
+    Track lists are stored as interned ids, either in full (a keyframe) or as a delta against the
+    previous snapshot of the same playlist. See :mod:`pyjams.utils.snapshots` for the encoding.
+    """
+
+    playlist = models.ForeignKey(FeaturedPlaylist, on_delete=models.CASCADE, related_name="snapshots")
+    snapshot_id = models.CharField(max_length=128)
+    created_at = models.DateTimeField(default=timezone.now)
+    track_count = models.PositiveIntegerField()
+    is_keyframe = models.BooleanField(default=False)
+    # Deltas since the last keyframe, including this one
+    chain_length = models.PositiveSmallIntegerField(default=0)
+    data = models.BinaryField()
+
+    class Meta:
+        ordering: ClassVar[list[str]] = ["-id"]
+        constraints: ClassVar[list[models.UniqueConstraint]] = [
+            models.UniqueConstraint(fields=["playlist", "snapshot_id"], name="unique_playlist_snapshot")
+        ]
+        indexes: ClassVar[list[Index]] = [Index(fields=["playlist", "is_keyframe", "id"])]
+
+    def __str__(self) -> str:
+        return f"{self.playlist.name} @ {self.snapshot_id}"
+
+    def track_ids(self) -> list[int]:
+        """Decode the interned track ids, replaying deltas from the nearest keyframe."""
+        keyframe_id = (
+            PlaylistSnapshot.objects.filter(playlist_id=self.playlist_id, is_keyframe=True, id__lte=self.id)
+            .values_list("id", flat=True)
+            .order_by("-id")
+            .first()
+        )
+        chain = PlaylistSnapshot.objects.filter(
+            playlist_id=self.playlist_id, id__gte=keyframe_id, id__lte=self.id
+        ).order_by("id")
+
+        ids: list[int] = []
+        for snapshot in chain.only("is_keyframe", "data"):
+            data = bytes(snapshot.data)
+            ids = snapshots.decode_keyframe(data) if snapshot.is_keyframe else snapshots.decode_delta(ids, data)
+        return ids
+
+    def spotify_ids(self) -> list[str]:
+        """Decode the Spotify track ids, in playlist order."""
+        ids = self.track_ids()
+        names = Track.resolve(ids)
+        return [names[track_id] for track_id in ids]
+
+    def diff(self, other: "PlaylistSnapshot") -> SnapshotDiff:
+        """Compare this snapshot against an earlier (or any other) one."""
+        before, after = other.track_ids(), self.track_ids()
+        added = Counter(after) - Counter(before)
+        removed = Counter(before) - Counter(after)
+        names = Track.resolve(added.keys() | removed.keys())
+        return SnapshotDiff(
+            added=[names[track_id] for track_id in added.elements()],
+            removed=[names[track_id] for track_id in removed.elements()],
+            reordered=not added and not removed and before != after,
+        )
+
+    @classmethod
+    def record(cls, playlist: FeaturedPlaylist, snapshot_id: str, spotify_ids: Sequence[str]) -> "PlaylistSnapshot":
+        """Store a version of a playlist, unless it is already the latest one recorded."""
+        with transaction.atomic():
+            latest = cls.objects.select_for_update().filter(playlist=playlist).first()
+            if latest and latest.snapshot_id == snapshot_id:
+                return latest
+
+            interned = Track.intern(spotify_ids)
+            ids = [interned[spotify_id] for spotify_id in spotify_ids]
+            snapshot = cls(playlist=playlist, snapshot_id=snapshot_id, track_count=len(ids))
+
+            keyframe = snapshots.encode_keyframe(ids)
+            if latest is None or latest.chain_length + 1 >= SNAPSHOT_KEYFRAME_INTERVAL:
+                snapshot.is_keyframe, snapshot.data = True, keyframe
+            else:
+                delta = snapshots.encode_delta(latest.track_ids(), ids)
+                # A rewrite of most of the playlist can come out larger as a delta
+                if len(delta) < len(keyframe):
+                    snapshot.data, snapshot.chain_length = delta, latest.chain_length + 1
+                else:
+                    snapshot.is_keyframe, snapshot.data = True, keyframe
+            snapshot.save()
+            cls.prune(playlist)
+            return snapshot
+
+    @classmethod
+    def prune(cls, playlist: FeaturedPlaylist, keep: int = SNAPSHOT_RETENTION) -> int:
+        """Drop all but the newest ``keep`` snapshots of a playlist.
+
+        The oldest survivor is rewritten as a keyframe first, since the deltas it depends on are
+        about to go.
+
+        Returns:
+            Number of snapshots deleted
+        """
+        oldest_kept = cls.objects.filter(playlist=playlist).order_by("-id")[keep - 1 : keep].first()
+        if oldest_kept is None or not cls.objects.filter(playlist=playlist, id__lt=oldest_kept.id).exists():
+            return 0
+        if not oldest_kept.is_keyframe:
+            oldest_kept.data = snapshots.encode_keyframe(oldest_kept.track_ids())
+            oldest_kept.is_keyframe, oldest_kept.chain_length = True, 0
+            oldest_kept.save(update_fields=["data", "is_keyframe", "chain_length"])
+        deleted, _ = cls.objects.filter(playlist=playlist, id__lt=oldest_kept.id).delete()
+        return deleted
+
+
+class ImportJob(BaseModel):
+    """A bulk import of tracks into a playlist, run in the background."""
+
+    STATUSES: ClassVar[list[tuple[str, str]]] = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="import_jobs")
+    playlist_id = models.CharField(max_length=64)
+    filename = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default="pending")
+    # Progress counters, updated after every batch
+    rows = models.PositiveIntegerField(default=0)
+    added = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    unresolved = models.PositiveIntegerField(default=0)
+    # Rows that could not be read at all
+    failed = models.PositiveIntegerField(default=0)
+    snapshot_id = models.CharField(max_length=128, blank=True)
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(BaseModel.Meta):
+        indexes: ClassVar[list[Index]] = [Index(fields=["user", "created_at"])]
+
+    def __str__(self) -> str:
+        return f"Import into {self.playlist_id} ({self.status})"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+# (artist_id, added_by) -> (artist_name, track_count)
+ArtistCounts = dict[tuple[str, str], tuple[str, int]]
+
+
+@dataclass(frozen=True)
+class ArtistUsage:
+    """Where an artist appears among active featured playlists, and who added their tracks."""
+
+    artist_id: str
+    artist_name: str
+    # (playlist, track count), most tracks first
+    playlists: list[tuple[FeaturedPlaylist, int]]
+    # (Spotify user id, track count), most tracks first
+    added_by: list[tuple[str, int]]
+
+
+class ArtistPlaylist(models.Model):
+    """Inverted index row: how many tracks of an artist one user added to a featured playlist."""
+
+    artist_id = models.CharField(max_length=64)
+    artist_name = models.CharField(max_length=255, blank=True)
+    playlist = models.ForeignKey(FeaturedPlaylist, on_delete=models.CASCADE, related_name="artist_entries")
+    # Spotify id of the user who added the tracks, blank when Spotify doesn't say
+    added_by = models.CharField(max_length=64, blank=True)
+    track_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints: ClassVar[list[models.BaseConstraint]] = [
+            # Leads with the artist, so it is also the index behind artist lookups
+            models.UniqueConstraint(fields=["artist_id", "playlist", "added_by"], name="unique_artist_playlist_adder"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.artist_name or self.artist_id} in {self.playlist_id} ({self.track_count})"
+
+    @classmethod
+    def replace_for(cls, playlist: FeaturedPlaylist, counts: ArtistCounts) -> None:
+        """Make the index rows of ``playlist`` match ``counts``, upserting changed rows in bulk."""
+        rows = [
+            cls(artist_id=artist_id, artist_name=name, playlist=playlist, added_by=added_by, track_count=count)
+            for (artist_id, added_by), (name, count) in counts.items()
+        ]
+        with transaction.atomic():
+            stale = [
+                pk
+                for pk, artist_id, added_by in cls.objects.filter(playlist=playlist).values_list(
+                    "pk", "artist_id", "added_by"
+                )
+                if (artist_id, added_by) not in counts
+            ]
+            cls.objects.filter(pk__in=stale).delete()
+            cls.objects.bulk_create(
+                rows,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["artist_id", "playlist", "added_by"],
+                update_fields=["artist_name", "track_count"],
+            )
+
+    @classmethod
+    def usage(cls, artist_id: str) -> ArtistUsage | None:
+        """Look up an artist in a single indexed query. None if no active featured playlist has them."""
+        rows = list(
+            cls.objects.filter(artist_id=artist_id, playlist__is_active=True).select_related("playlist__creator")
+        )
+        if not rows:
+            return None
+        playlists: Counter[int] = Counter()
+        added_by: Counter[str] = Counter()
+        by_id: dict[int, FeaturedPlaylist] = {}
+        for row in rows:
+            playlists[row.playlist_id] += row.track_count
+            by_id[row.playlist_id] = row.playlist
+            if row.added_by:
+                added_by[row.added_by] += row.track_count
+        return ArtistUsage(
+            artist_id=artist_id,
+            artist_name=rows[0].artist_name,
+            playlists=[(by_id[pk], count) for pk, count in playlists.most_common()],
+            added_by=added_by.most_common(),
+        )
+
+
+class PlaylistSignature(models.Model):
+    """MinHash signature of a featured playlist's tracks. See :mod:`pyjams.utils.minhash`."""
+
+    playlist = models.OneToOneField(
+        FeaturedPlaylist, on_delete=models.CASCADE, primary_key=True, related_name="signature"
+    )
+    snapshot_id = models.CharField(max_length=128)
+    signature = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Signature of {self.playlist_id} at {self.snapshot_id}"
+
+    @classmethod
+    def update_for(cls, playlist: FeaturedPlaylist, snapshot_id: str, spotify_ids: Iterable[str]) -> bool:
+        """Store the signature of a playlist version and its LSH buckets, unless already stored.
+
+        Returns:
+            Whether anything changed
+        """
+        if cls.objects.filter(playlist=playlist, snapshot_id=snapshot_id).exists():
+            return False
+        sig = minhash.signature(spotify_ids)
+        with transaction.atomic():
+            PlaylistBand.objects.filter(playlist=playlist).delete()
+            if sig is None:
+                cls.objects.filter(playlist=playlist).delete()
+                return True
+            cls.objects.update_or_create(
+                playlist=playlist, defaults={"snapshot_id": snapshot_id, "signature": minhash.to_bytes(sig)}
+            )
+            PlaylistBand.objects.bulk_create(
+                PlaylistBand(band=band, bucket=bucket, playlist=playlist)
+                for band, bucket in enumerate(minhash.band_buckets(sig))
+            )
+        return True
+
+    @classmethod
+    def similar_to(cls, playlist: FeaturedPlaylist, limit: int = 5) -> list[tuple[FeaturedPlaylist, float]]:
+        """Active featured playlists sharing the most tracks with ``playlist``, by estimated Jaccard similarity.
+
+        Only playlists sharing an LSH band are scored, so the cost doesn't grow with the number of
+        featured playlists.
+        """
+        own = cls.objects.filter(playlist=playlist).first()
+        if own is None:
+            return []
+
+        def lookup() -> list[tuple[FeaturedPlaylist, float]]:
+            sig = minhash.from_bytes(own.signature)
+            buckets = models.Q()
+            for band, bucket in enumerate(minhash.band_buckets(sig)):
+                buckets |= models.Q(band=band, bucket=bucket)
+            candidates = (
+                PlaylistBand.objects.filter(buckets)
+                .exclude(playlist=playlist)
+                .values_list("playlist_id", flat=True)
+                .distinct()[:SIMILAR_MAX_CANDIDATES]
+            )
+            scored = [
+                (other.playlist, minhash.similarity(sig, minhash.from_bytes(other.signature)))
+                for other in cls.objects.filter(playlist__in=list(candidates), playlist__is_active=True).select_related(
+                    "playlist__creator"
+                )
+            ]
+            scored.sort(key=lambda pair: (-pair[1], -pair[0].pk))
+            return scored[:limit]
+
+        return pyjams_cache.get_or_set(
+            pyjams_cache.FEATURED_NAMESPACE,
+            f"similar_playlists:{playlist.pk}:{own.snapshot_id}:{limit}",
+            lookup,
+            SIMILAR_CACHE_TIMEOUT,
+        )
+
+
+class PlaylistBand(models.Model):
+    """One LSH band bucket of a playlist signature. Playlists sharing a bucket are similar candidates."""
+
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+    playlist = models.ForeignKey(FeaturedPlaylist, on_delete=models.CASCADE, related_name="signature_bands")
+
+    class Meta:
+        indexes: ClassVar[list[Index]] = [Index(fields=["band", "bucket"])]
+
+    def __str__(self) -> str:
+        return f"Band {self.band} bucket {self.bucket} of {self.playlist_id}"
+
+
+class TrackSuggestion(BaseModel):
+    """A track a contributor proposed for a featured playlist, ranked by votes."""
+
+    STATUSES: ClassVar[list[tuple[str, str]]] = [
+        ("pending", "Pending"),
+        ("accepted", "Accepted"),
+        ("rejected", "Rejected"),
+    ]
+
+    playlist = models.ForeignKey(FeaturedPlaylist, on_delete=models.CASCADE, related_name="suggestions")
+    track_uri = models.CharField(max_length=64)
+    track_name = models.CharField(max_length=255, blank=True)
+    artists = models.CharField(max_length=255, blank=True)
+    suggested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="track_suggestions")
+    status = models.CharField(max_length=20, choices=STATUSES, default="pending")
+    # Sum of the votes, written when buffered votes are flushed rather than on every vote
+    score = models.IntegerField(default=0)
+    reviewed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="reviewed_suggestions"
+    )
+
+    class Meta(BaseModel.Meta):
+        constraints: ClassVar[list[models.BaseConstraint]] = [
+            models.UniqueConstraint(fields=["playlist", "track_uri"], name="unique_playlist_suggestion"),
+        ]
+        indexes: ClassVar[list[Index]] = [Index(fields=["playlist", "status", "-score"])]
+
+    def __str__(self) -> str:
+        return f"{self.track_name or self.track_uri} for {self.playlist_id} ({self.status}, {self.score})"
+
+
+class SuggestionVote(models.Model):
+    """One user's vote on a suggestion: 1 for, -1 against. Retracted votes are deleted."""
+
+    suggestion = models.ForeignKey(TrackSuggestion, on_delete=models.CASCADE, related_name="votes")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="suggestion_votes")
+    value = models.SmallIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints: ClassVar[list[models.BaseConstraint]] = [
+            models.UniqueConstraint(fields=["suggestion", "user"], name="unique_suggestion_vote"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} voted {self.value:+d} on {self.suggestion_id}"
+
+    @classmethod
+    def apply(cls, votes: dict[tuple[int, int], int]) -> dict[int, int]:
+        """Write a batch of votes and recount the scores of the suggestions they touch.
+
+        Every statement covers the whole batch, so a flush costs the same handful of queries
+        however many votes it carries.
+
+        Args:
+            votes: ``(suggestion_id, user_id) -> value``, where a value of 0 retracts the vote
+
+        Returns:
+            New score of every touched suggestion that still exists
+        """
+        if not votes:
+            return {}
+        suggestion_ids = {suggestion_id for suggestion_id, _ in votes}
+        existing = set(TrackSuggestion.objects.filter(pk__in=suggestion_ids).values_list("pk", flat=True))
+        retracted = models.Q()
+        for (suggestion_id, user_id), value in votes.items():
+            if value == 0 and suggestion_id in existing:
+                retracted |= models.Q(suggestion_id=suggestion_id, user_id=user_id)
+        rows = [
+            cls(suggestion_id=suggestion_id, user_id=user_id, value=value)
+            for (suggestion_id, user_id), value in votes.items()
+            if value and suggestion_id in existing
+        ]
+        with transaction.atomic():
+            if retracted:
+                cls.objects.filter(retracted).delete()
+            cls.objects.bulk_create(
+                rows,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["suggestion", "user"],
+                update_fields=["value", "updated_at"],
+            )
+            totals = dict(
+                cls.objects.filter(suggestion_id__in=existing)
+                .values("suggestion")
+                .annotate(total=models.Sum("value"))
+                .values_list("suggestion", "total")
+            )
+            scores = {suggestion_id: totals.get(suggestion_id, 0) for suggestion_id in existing}
+            suggestions = list(TrackSuggestion.objects.filter(pk__in=existing).only("pk", "score"))
+            for suggestion in suggestions:
+                suggestion.score = scores[suggestion.pk]
+            TrackSuggestion.objects.bulk_update(suggestions, ["score"], batch_size=500)
+        return scores
@@ -177,6 +177,30 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Cached lookups are invalidated through generation counters, which only works when every worker
+# shares the same backend. The Heroku Redis addon sets `REDIS_URL` (using self-signed TLS), otherwise
+# fall back to a per-process memory cache which is fine for a single local worker.
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {"ssl_cert_reqs": None} if REDIS_URL.startswith("rediss://") else {},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "pyjams",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -265,6 +289,10 @@ if not all([SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET]):
     raise ValueError("Missing SPOTIFY_CLIENT_ID or SPOTIFY_CLIENT_SECRET environment variables")
 SPOTIFY_SCOPE = "playlist-modify-public playlist-modify-private user-read-private user-read-email"
 
+# Live playlist updates: every open change stream holds one of a worker's gunicorn `threads` for
+# up to a minute, so keep this well below it. Viewers over the cap poll the playlist version.
+LIVE_MAX_STREAMS = int(os.environ.get("LIVE_MAX_STREAMS", 1))
+
 # Session Settings - Optimized for OAuth flows
 # Session Settings
 SESSION_ENGINE = "django.contrib.sessions.backends.db"
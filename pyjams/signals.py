@@ -0,0 +1,74 @@
+from collections.abc import Sequence
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from spotipy import Spotify
+
+from pyjams.models import FeaturedPlaylist, PlaylistSignature, PlaylistSnapshot
+from pyjams.utils.artists import schedule_artist_index_for
+from pyjams.utils.live import live_broker
+from pyjams.utils.tracks import track_id_from_uri
+
+# Sent by the sync engine after it has rewritten a playlist, with the `spotify` client used,
+# `playlist_id`, the `previous` and new `snapshot_id` and the track URIs at each (`previous_uris`,
+# `track_uris`)
+playlist_synced = Signal()
+
+
+@receiver(post_save, sender=FeaturedPlaylist)
+@receiver(post_delete, sender=FeaturedPlaylist)
+def invalidate_featured_cache(sender: type[FeaturedPlaylist], **kwargs: Any) -> None:
+    """Drop cached featured playlist lookups whenever a featured playlist changes."""
+    FeaturedPlaylist.invalidate_cache()
+
+
+def _track_ids(uris: Sequence[str | None]) -> list[str]:
+    # Unavailable items have no URI and can't be restored, so they aren't kept in the history
+    return [track_id_from_uri(uri) for uri in uris if uri]
+
+
+@receiver(playlist_synced)
+def record_playlist_snapshots(
+    sender: Any,
+    playlist_id: str,
+    previous: str,
+    snapshot_id: str,
+    previous_uris: list[str | None],
+    track_uris: list[str],
+    **kwargs: Any,
+) -> None:
+    """Keep the version a featured playlist was synced from, and the one it was synced to."""
+    playlist = FeaturedPlaylist.objects.filter(spotify_id=playlist_id).first()
+    if playlist is None:
+        return
+    PlaylistSnapshot.record(playlist, previous, _track_ids(previous_uris))
+    PlaylistSnapshot.record(playlist, snapshot_id, _track_ids(track_uris))
+
+
+@receiver(playlist_synced)
+def update_playlist_signature(
+    sender: Any, playlist_id: str, snapshot_id: str, track_uris: list[str], **kwargs: Any
+) -> None:
+    """Update the similarity signature of a synced featured playlist from the tracks just written."""
+    for playlist in FeaturedPlaylist.objects.filter(spotify_id=playlist_id, is_active=True):
+        PlaylistSignature.update_for(playlist, snapshot_id, _track_ids(track_uris))
+
+
+@receiver(playlist_synced)
+def reindex_playlist_artists(sender: Any, spotify: Spotify, playlist_id: str, **kwargs: Any) -> None:
+    """Keep the artist index of a synced featured playlist current."""
+    schedule_artist_index_for(spotify, playlist_id)
+
+
+@receiver(playlist_synced)
+def publish_playlist_change(
+    sender: Any,
+    playlist_id: str,
+    snapshot_id: str,
+    previous_uris: list[str | None],
+    track_uris: list[str],
+    **kwargs: Any,
+) -> None:
+    """Tell live viewers about a write made here, without waiting for the next change check."""
+    live_broker.announce(playlist_id, snapshot_id, list(track_uris), previous_uris)
@@ -96,6 +96,35 @@ const PlaylistUtils = {
         });
     },
 
+    // Apply the snapshot and stats returned by a track write to the playlist page
+    applyPlaylistUpdate(data) {
+        const view = document.querySelector('.playlist-view');
+        if (view && data.snapshot_id) {
+            view.dataset.snapshotId = data.snapshot_id;
+        }
+        if (data.stats) {
+            Object.entries(data.stats).forEach(([name, value]) => {
+                const statEl = document.querySelector(`#playlistStats [data-stat="${name}"]`);
+                if (statEl) statEl.textContent = value;
+            });
+        }
+    },
+
+    renumberTrackRows() {
+        const trackList = document.getElementById('trackListBody');
+        // Rows above the scrolling window aren't in the page
+        const start = Number(trackList?.dataset.start || 0);
+        document.querySelectorAll('#trackListBody tr.track-row').forEach((row, index) => {
+            row.querySelector('td:first-child').textContent = start + index + 1;
+        });
+    },
+
+    // Replace the rendered tracks with a fresh first page
+    replaceTrackList(html) {
+        document.getElementById('trackListBody').innerHTML = html;
+        window.trackListScroller?.reset();
+    },
+
     // Consolidated loading state management
     setButtonLoading(button, isLoading, loadingText, originalText, iconClass = 'fa-spinner fa-spin') {
         if (!button) return;
@@ -253,11 +282,13 @@ class PlaylistManager {
 
             const data = await response.json();
             if (response.ok) {
-                this.showToast('success', 'Track added successfully');
-                const trackList = document.querySelector('.table tbody');
+                this.showToast('success', data.message || 'Track added successfully');
+                const trackList = document.getElementById('trackListBody');
                 if (trackList && data.html) {
-                    trackList.innerHTML = data.html;
+                    trackList.insertAdjacentHTML('beforeend', data.html);
+                    PlaylistUtils.renumberTrackRows();
                 }
+                PlaylistUtils.applyPlaylistUpdate(data);
             } else {
                 throw new Error(data.error || 'Failed to add track');
             }
@@ -905,7 +936,8 @@ class TrackManager {
         window.removeTrack = async (trackId) => {
             if (!confirm('Are you sure you want to remove this track?')) return;
             
-            const trackRow = document.querySelector(`tr[data-track-id="${trackId}"]`);
+            const trackRows = document.querySelectorAll(`tr[data-track-id="${trackId}"]`);
+            const trackRow = trackRows[0];
             if (!trackRow) return;
             
             const playlistId = document.querySelector('[data-playlist-id]')?.dataset.playlistId;
@@ -925,24 +957,26 @@ class TrackManager {
                         headers: {
                             'Content-Type': 'application/x-www-form-urlencoded'
                         },
-                        body: `track_id=${trackId}&playlist_id=${playlistId}`
+                        body: `track_id=${trackId}`
                     }
                 );
                 
                 PlaylistUtils.showToast(response.message || "Track removed successfully");
+                PlaylistUtils.applyPlaylistUpdate(response);
                 
-                // Animate row removal
-                trackRow.style.height = `${trackRow.offsetHeight}px`;
+                // Animate row removal, every occurrence was removed from the playlist
+                trackRows.forEach(row => {
+                    row.style.height = `${row.offsetHeight}px`;
+                });
                 setTimeout(() => {
-                    trackRow.style.height = '0';
-                    trackRow.style.opacity = '0';
+                    trackRows.forEach(row => {
+                        row.style.height = '0';
+                        row.style.opacity = '0';
+                    });
                     
                     setTimeout(() => {
-                        trackRow.remove();
-                        // Renumber the rows
-                        document.querySelectorAll('table tbody tr').forEach((row, index) => {
-                            row.querySelector('td:first-child').textContent = index + 1;
-                        });
+                        trackRows.forEach(row => row.remove());
+                        PlaylistUtils.renumberTrackRows();
                     }, 300);
                 }, 100);
                 
@@ -954,6 +988,290 @@ class TrackManager {
     }
 }
 
+// Bulk imports run in the background, poll their progress until they finish
+const IMPORT_POLL_MS = 2000;
+
+window.importTracks = async function(input) {
+    const file = input.files[0];
+    const playlistId = document.querySelector('[data-playlist-id]')?.dataset.playlistId;
+    if (!file || !playlistId) return;
+
+    const formData = new FormData();
+    formData.append('file', file);
+    input.value = '';
+
+    try {
+        const { data: job } = await PlaylistUtils.fetchWithError(
+            `/playlists/${playlistId}/import/`,
+            { method: 'POST', body: formData }
+        );
+        PlaylistUtils.showToast(`Importing ${file.name}...`, 'info');
+        pollImport(job.id);
+    } catch (error) {
+        PlaylistUtils.showToast(error.message || "Failed to start import", "danger");
+    }
+};
+
+async function pollImport(jobId) {
+    try {
+        const { data: job } = await PlaylistUtils.fetchWithError(`/imports/${jobId}/`);
+        if (!job.finished) {
+            setTimeout(() => pollImport(jobId), IMPORT_POLL_MS);
+            return;
+        }
+        if (job.status === 'failed') {
+            PlaylistUtils.showToast(`Import failed after ${job.added} tracks: ${job.error}`, 'danger');
+        } else {
+            const unreadable = job.failed ? `, ${job.failed} unreadable` : '';
+            PlaylistUtils.showToast(
+                `Imported ${job.added} tracks, skipped ${job.skipped}, ${job.unresolved} not found${unreadable}`
+            );
+        }
+        const trackList = document.getElementById('trackListBody');
+        if (trackList && job.added) {
+            const response = await fetch(`/playlists/${job.playlist_id}/tracks/`);
+            if (response.ok) PlaylistUtils.replaceTrackList(await response.text());
+            PlaylistUtils.applyPlaylistUpdate({ snapshot_id: job.snapshot_id });
+        }
+    } catch (error) {
+        PlaylistUtils.showToast(error.message || "Lost track of the import", "danger");
+    }
+}
+
+// Remove the checked duplicates by position, then reload the track list and scan again
+window.removeDuplicates = async function(event) {
+    event.preventDefault();
+    const playlistId = document.querySelector('[data-playlist-id]')?.dataset.playlistId;
+    const checked = event.target.querySelectorAll('input[name="duplicate"]:checked');
+    if (!playlistId || !checked.length) return;
+    if (!confirm(`Remove ${checked.length} selected tracks?`)) return;
+
+    const button = event.target.querySelector('button[type="submit"]');
+    PlaylistUtils.setButtonLoading(button, true, 'Removing...');
+    const items = Array.from(checked, input => ({ uri: input.dataset.uri, position: Number(input.value) }));
+    try {
+        const { data } = await PlaylistUtils.fetchWithError(
+            `/playlists/${playlistId}/duplicates/remove/`,
+            {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ items })
+            }
+        );
+        PlaylistUtils.showToast(`Removed ${data.removed} tracks`);
+        PlaylistUtils.applyPlaylistUpdate(data);
+        const response = await fetch(`/playlists/${playlistId}/tracks/`);
+        if (response.ok) PlaylistUtils.replaceTrackList(await response.text());
+    } catch (error) {
+        PlaylistUtils.showToast(error.message || "Failed to remove duplicates", "danger");
+    } finally {
+        PlaylistUtils.setButtonLoading(button, false);
+        // Positions are stale either way, scan again with the same options
+        htmx.trigger(document.querySelector('#duplicates form[hx-get]'), 'submit');
+    }
+};
+
+// Follow other people's edits to the open playlist over Server-Sent Events, or by polling its
+// version where a stream can't be held
+const VERSION_POLL_MS = 15000;
+
+// Move the page to a playlist version seen elsewhere, returns whether the track list was reloaded
+async function showPlaylistVersion(view, snapshotId, stats) {
+    // Our own writes have already moved the page to their snapshot
+    if (snapshotId === view.dataset.snapshotId) {
+        if (stats) PlaylistUtils.applyPlaylistUpdate({ stats });
+        return false;
+    }
+    const response = await fetch(`/playlists/${view.dataset.playlistId}/tracks/`);
+    if (!response.ok) return false;
+    PlaylistUtils.replaceTrackList(await response.text());
+    PlaylistUtils.applyPlaylistUpdate({ snapshot_id: snapshotId, stats });
+    return true;
+}
+
+async function pollPlaylistVersion(view, etag = null) {
+    if (!document.hidden) {
+        try {
+            // Unchanged versions come back as an empty 304
+            const response = await fetch(`/playlists/${view.dataset.playlistId}/version/`, {
+                cache: 'no-store',
+                headers: etag ? { 'If-None-Match': etag } : {}
+            });
+            if (response.status === 200) {
+                etag = response.headers.get('ETag');
+                const { data } = await response.json();
+                if (await showPlaylistVersion(view, data.snapshot_id, data.stats)) {
+                    PlaylistUtils.showToast('Playlist updated', 'info');
+                }
+            }
+        } catch (error) {
+            console.error('Checking the playlist version failed:', error);
+        }
+    }
+    setTimeout(() => pollPlaylistVersion(view, etag), VERSION_POLL_MS);
+}
+
+function followPlaylistChanges() {
+    const view = document.querySelector('.playlist-view');
+    if (!view) return;
+    if (!window.EventSource) {
+        pollPlaylistVersion(view);
+        return;
+    }
+    const source = new EventSource(
+        `/playlists/${view.dataset.playlistId}/events/?snapshot_id=${encodeURIComponent(view.dataset.snapshotId || '')}`
+    );
+    let added = 0;
+    let removed = 0;
+
+    source.addEventListener('added', (event) => { added += JSON.parse(event.data).uris.length; });
+    source.addEventListener('removed', (event) => { removed += JSON.parse(event.data).uris.length; });
+    source.addEventListener('snapshot', async (event) => {
+        const data = JSON.parse(event.data);
+        const counts = [added && `${added} added`, removed && `${removed} removed`].filter(Boolean);
+        added = removed = 0;
+        if (await showPlaylistVersion(view, data.snapshot_id)) {
+            PlaylistUtils.showToast(`Playlist updated${counts.length ? `: ${counts.join(', ')}` : ''}`, 'info');
+        }
+    });
+    // The browser reconnects on its own after a dropped stream, but gives up when the server
+    // refuses one, e.g. while too many people are watching
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) pollPlaylistVersion(view);
+    };
+}
+
+// Load the rest of a long track list while scrolling. Only a window of pages is kept in the DOM:
+// pages scrolled far out of view are swapped for spacer height, and fetched again when scrolled
+// back to. Those fetches are revalidated by ETag, so they usually come from the browser's cache.
+const TRACK_PAGE_SIZE = 100;
+const MAX_RENDERED_PAGES = 5;
+const TRACK_PAGE_MARGIN = '800px 0px';
+
+class TrackListScroller {
+    constructor(view) {
+        this.view = view;
+        this.body = document.getElementById('trackListBody');
+        this.top = document.getElementById('trackListTop');
+        this.bottom = document.getElementById('trackListBottom');
+        this.observer = new IntersectionObserver((entries) => {
+            entries.forEach(entry => {
+                if (!entry.isIntersecting) return;
+                if (entry.target === this.top) this.loadBefore();
+                else this.loadAfter();
+            });
+        }, { rootMargin: TRACK_PAGE_MARGIN });
+        this.reset(this.body.dataset.nextOffset ?? null);
+        this.observer.observe(this.top);
+        this.observer.observe(this.bottom);
+    }
+
+    // Start over from the rows in the page, which are the first page of the playlist
+    reset(nextOffset) {
+        const rows = Array.from(this.body.querySelectorAll('tr.track-row'));
+        if (nextOffset === undefined) nextOffset = rows.length >= TRACK_PAGE_SIZE ? rows.length : null;
+        this.pages = rows.length ? [{ offset: 0, rows }] : [];
+        // Pages dropped from either end of the window, nearest last
+        this.above = [];
+        this.below = [];
+        this.nextOffset = nextOffset === null ? null : Number(nextOffset);
+        this.loading = false;
+        // Pages requested before a reset belong to the old rows
+        this.generation = (this.generation || 0) + 1;
+        this.body.dataset.start = 0;
+        this.setSpacer(this.top, 0);
+        this.setSpacer(this.bottom, 0);
+    }
+
+    setSpacer(spacer, height) {
+        spacer.dataset.height = height;
+        // The bottom spacer must keep some height to be observed
+        spacer.querySelector('td').style.height = `${Math.max(height, 1)}px`;
+    }
+
+    drop(page, spacer) {
+        const height = page.rows.reduce((total, row) => total + row.offsetHeight, 0);
+        page.rows.forEach(row => row.remove());
+        this.setSpacer(spacer, Number(spacer.dataset.height) + height);
+        return { offset: page.offset, height };
+    }
+
+    // Observing again reports the current intersection, in case the spacer is still in view
+    recheck(spacer) {
+        this.observer.unobserve(spacer);
+        this.observer.observe(spacer);
+    }
+
+    async fetchPage(offset) {
+        this.loading = true;
+        try {
+            const response = await fetch(`/playlists/${this.view.dataset.playlistId}/tracks/page/?offset=${offset}`);
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const snapshotId = response.headers.get('X-Snapshot-Id');
+            const html = await response.text();
+            // The playlist changed under the rows already shown, so their positions are stale
+            if (snapshotId && snapshotId !== this.view.dataset.snapshotId) {
+                await showPlaylistVersion(this.view, snapshotId);
+                return null;
+            }
+            const template = document.createElement('template');
+            template.innerHTML = html;
+            return {
+                rows: Array.from(template.content.querySelectorAll('tr.track-row')),
+                nextOffset: response.headers.get('X-Next-Offset'),
+            };
+        } catch (error) {
+            console.error('Loading more tracks failed:', error);
+            return null;
+        } finally {
+            this.loading = false;
+        }
+    }
+
+    async loadAfter() {
+        if (this.loading) return;
+        const dropped = this.below.at(-1);
+        const offset = dropped ? dropped.offset : this.nextOffset;
+        if (offset === null) return;
+        const generation = this.generation;
+        const page = await this.fetchPage(offset);
+        if (!page || generation !== this.generation) return;
+        if (dropped) {
+            this.below.pop();
+            this.setSpacer(this.bottom, Number(this.bottom.dataset.height) - dropped.height);
+        } else {
+            this.nextOffset = page.nextOffset === null ? null : Number(page.nextOffset);
+        }
+        this.body.append(...page.rows);
+        this.pages.push({ offset, rows: page.rows });
+        if (this.pages.length > MAX_RENDERED_PAGES) this.above.push(this.drop(this.pages.shift(), this.top));
+        this.body.dataset.start = this.pages[0].offset;
+        this.recheck(this.bottom);
+    }
+
+    async loadBefore() {
+        const dropped = this.above.at(-1);
+        if (this.loading || !dropped) return;
+        const generation = this.generation;
+        const page = await this.fetchPage(dropped.offset);
+        if (!page || generation !== this.generation) return;
+        this.above.pop();
+        this.setSpacer(this.top, Number(this.top.dataset.height) - dropped.height);
+        this.body.prepend(...page.rows);
+        this.pages.unshift({ offset: dropped.offset, rows: page.rows });
+        if (this.pages.length > MAX_RENDERED_PAGES) this.below.push(this.drop(this.pages.pop(), this.bottom));
+        this.body.dataset.start = dropped.offset;
+        this.recheck(this.top);
+    }
+}
+
+// Track removals made through HTMX announce themselves with an HX-Trigger event
+document.body?.addEventListener('trackRemoved', (event) => {
+    document.querySelectorAll(`tr[data-track-id="${event.detail.trackId}"]`).forEach(row => row.remove());
+    PlaylistUtils.renumberTrackRows();
+    PlaylistUtils.applyPlaylistUpdate({ snapshot_id: event.detail.snapshotId });
+});
+
 // Initialize on DOM load
 document.addEventListener('DOMContentLoaded', () => {
     const playlistManager = new PlaylistManager();
@@ -961,6 +1279,14 @@ document.addEventListener('DOMContentLoaded', () => {
     window.playlistCreator = new CreatePlaylist(); // Make it globally accessible
     new SetFeaturedPlaylist();
     new TrackManager();
+    // Streamed pages only know their full stats once the last track row has been sent
+    const streamedStats = document.getElementById('streamedStats');
+    if (streamedStats) PlaylistUtils.applyPlaylistUpdate({ stats: JSON.parse(streamedStats.textContent) });
+    followPlaylistChanges();
+    const view = document.querySelector('.playlist-view');
+    if (view && document.getElementById('trackListTop') && window.IntersectionObserver) {
+        window.trackListScroller = new TrackListScroller(view);
+    }
 });
 
 // Export for global access
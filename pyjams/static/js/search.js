@@ -49,8 +49,36 @@ document.addEventListener('DOMContentLoaded', function() {
         `;
     }
 
-    // Add track to playlist function
-    window.addTrackToPlaylist = async function(trackId, playlistId) {
+    // Clicks are queued per playlist and flushed together, so picking several tracks in a row
+    // costs one bulk request instead of one request per track
+    const ADD_DEBOUNCE_MS = 300;
+    const pendingAdds = new Map();
+
+    window.addTrackToPlaylist = function(trackId, playlistId) {
+        let pending = pendingAdds.get(playlistId);
+        if (!pending) {
+            pending = { trackIds: new Set(), timer: null };
+            pendingAdds.set(playlistId, pending);
+        }
+        pending.trackIds.add(trackId);
+        clearTimeout(pending.timer);
+        pending.timer = setTimeout(() => flushPendingAdds(playlistId), ADD_DEBOUNCE_MS);
+    };
+
+    async function flushPendingAdds(playlistId) {
+        const pending = pendingAdds.get(playlistId);
+        pendingAdds.delete(playlistId);
+        if (!pending || pending.trackIds.size === 0) return;
+
+        const trackIds = [...pending.trackIds];
+        if (trackIds.length === 1) {
+            await addSingleTrack(trackIds[0], playlistId);
+        } else {
+            await addTrackBatch(trackIds, playlistId);
+        }
+    }
+
+    async function addSingleTrack(trackId, playlistId) {
         try {
             const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
             const formData = new FormData();
@@ -68,13 +96,55 @@ document.addEventListener('DOMContentLoaded', function() {
             const data = await response.json();
             if (response.ok) {
                 PyJams.showSuccess(data.message || 'Track added successfully');
+                // Patch the track list in place when adding to the playlist being viewed
+                const view = document.querySelector(`.playlist-view[data-playlist-id="${playlistId}"]`);
+                const trackList = document.getElementById('trackListBody');
+                if (view && trackList && data.html) {
+                    trackList.insertAdjacentHTML('beforeend', data.html);
+                    if (data.snapshot_id) view.dataset.snapshotId = data.snapshot_id;
+                }
             } else {
                 throw new Error(data.error || 'Failed to add track');
             }
         } catch (error) {
             PyJams.showError(error.message || 'Failed to add track');
         }
-    };
+    }
+
+    async function addTrackBatch(trackIds, playlistId) {
+        try {
+            const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+            const response = await fetch(`/playlists/${playlistId}/tracks/add/bulk/`, {
+                method: 'POST',
+                headers: {
+                    'X-CSRFToken': csrfToken,
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ track_uris: trackIds })
+            });
+
+            const data = await response.json();
+            if (!response.ok && !(data.added && data.added.length)) {
+                throw new Error(data.error || data.message || 'Failed to add tracks');
+            }
+            if (data.failed && data.failed.length) {
+                PyJams.showWarning(data.message);
+            } else {
+                PyJams.showSuccess(data.message || 'Tracks added successfully');
+            }
+
+            // Reload the track list fragment when the batch went to the playlist being viewed
+            const view = document.querySelector(`.playlist-view[data-playlist-id="${playlistId}"]`);
+            const trackList = document.getElementById('trackListBody');
+            if (view && trackList && data.added && data.added.length) {
+                const fragment = await fetch(`/playlists/${playlistId}/tracks/`);
+                if (fragment.ok) trackList.innerHTML = await fragment.text();
+                if (data.snapshot_id) view.dataset.snapshotId = data.snapshot_id;
+            }
+        } catch (error) {
+            PyJams.showError(error.message || 'Failed to add tracks');
+        }
+    }
 
     // Add track preview functionality
     window.previewTrack = function(trackId, previewUrl) {
@@ -98,9 +168,90 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    async function runSearch(query) {
+        try {
+            searchSpinner?.classList.remove('d-none');
+            const response = await fetch(`${searchUrl}?q=${encodeURIComponent(query)}`);
+            const data = await response.json();
+            
+            if (searchResults) {
+                searchResults.innerHTML = data.tracks.map(track => 
+                    renderTrackItem(track, data.playlists)
+                ).join('');
+                
+                searchResults.style.display = 'block';
+                
+                // Initialize dropdowns
+                document.querySelectorAll('.dropdown-toggle').forEach(dropdown => {
+                    new bootstrap.Dropdown(dropdown);
+                });
+            }
+            
+        } catch (error) {
+            console.error('Error:', error);
+            if (searchResults) {
+                searchResults.innerHTML = `
+                    <div class="list-group-item bg-dark text-light text-center py-4">
+                        <i class="fas fa-exclamation-circle fa-2x mb-3 text-danger"></i>
+                        <p class="mb-0">Error searching tracks</p>
+                    </div>`;
+            }
+        } finally {
+            searchSpinner?.classList.add('d-none');
+        }
+    }
+
+    // Partial queries are completed from the server's local index; Spotify is only searched once a
+    // query is committed with Enter or by picking a suggestion
+    const suggestUrl = searchInput?.dataset.suggestUrl || '/search/autocomplete/';
+    const SUGGEST_DEBOUNCE_MS = 100;
+    const suggestionCache = new Map();
+    let suggestionList = null;
+
+    if (searchInput) {
+        suggestionList = document.createElement('datalist');
+        suggestionList.id = `${searchInput.id}Suggestions`;
+        searchInput.after(suggestionList);
+        searchInput.setAttribute('list', suggestionList.id);
+    }
+
+    async function showSuggestions(query) {
+        let suggestions = suggestionCache.get(query);
+        if (!suggestions) {
+            try {
+                const response = await fetch(`${suggestUrl}?q=${encodeURIComponent(query)}`);
+                if (!response.ok) return;
+                suggestions = (await response.json()).data.suggestions;
+                suggestionCache.set(query, suggestions);
+            } catch (error) {
+                console.error('Error:', error);
+                return;
+            }
+        }
+        // The user may have typed on while the request was in flight
+        if (searchInput.value.trim() !== query) return;
+        suggestionList.replaceChildren(...suggestions.map(suggestion => {
+            const option = document.createElement('option');
+            option.value = suggestion.text;
+            option.label = suggestion.kind;
+            return option;
+        }));
+    }
+
+    function commitSearch(query) {
+        clearTimeout(searchTimeout);
+        if (query.length < 2) return;
+        // Pages declaring an htmx search on the input let htmx make the request
+        if (searchInput.hasAttribute('hx-get')) {
+            searchInput.dispatchEvent(new CustomEvent('search-commit'));
+        } else {
+            runSearch(query);
+        }
+    }
+
     // Setup search input event listeners
     if (searchInput) {
-        searchInput.addEventListener('input', function() {
+        searchInput.addEventListener('input', function(e) {
             clearTimeout(searchTimeout);
             const query = this.value.trim();
             
@@ -109,38 +260,19 @@ document.addEventListener('DOMContentLoaded', function() {
                 return;
             }
 
-            searchTimeout = setTimeout(async () => {
-                try {
-                    searchSpinner?.classList.remove('d-none');
-                    const response = await fetch(`${searchUrl}?q=${encodeURIComponent(query)}`);
-                    const data = await response.json();
-                    
-                    if (searchResults) {
-                        searchResults.innerHTML = data.tracks.map(track => 
-                            renderTrackItem(track, data.playlists)
-                        ).join('');
-                        
-                        searchResults.style.display = 'block';
-                        
-                        // Initialize dropdowns
-                        document.querySelectorAll('.dropdown-toggle').forEach(dropdown => {
-                            new bootstrap.Dropdown(dropdown);
-                        });
-                    }
-                    
-                } catch (error) {
-                    console.error('Error:', error);
-                    if (searchResults) {
-                        searchResults.innerHTML = `
-                            <div class="list-group-item bg-dark text-light text-center py-4">
-                                <i class="fas fa-exclamation-circle fa-2x mb-3 text-danger"></i>
-                                <p class="mb-0">Error searching tracks</p>
-                            </div>`;
-                    }
-                } finally {
-                    searchSpinner?.classList.add('d-none');
-                }
-            }, 300);
+            // Picking a datalist option fires an input event without a typing input type
+            if (!e.inputType || e.inputType === 'insertReplacementText') {
+                commitSearch(query);
+                return;
+            }
+            searchTimeout = setTimeout(() => showSuggestions(query), SUGGEST_DEBOUNCE_MS);
+        });
+
+        searchInput.addEventListener('keydown', function(e) {
+            if (e.key === 'Enter') {
+                e.preventDefault();
+                commitSearch(this.value.trim());
+            }
         });
     }
 
@@ -1,4 +1,50 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from unittest.mock import Mock, patch
+
+from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from spotipy.exceptions import SpotifyException
+
+from pyjams import views
+from pyjams.models import (
+    ArtistPlaylist,
+    FeaturedPlaylist,
+    ImportJob,
+    PlaylistBand,
+    PlaylistManager,
+    PlaylistSignature,
+    PlaylistSnapshot,
+    SuggestionVote,
+    TrackSuggestion,
+    User,
+)
+from pyjams.utils import autocomplete, cache as pyjams_cache, minhash, suggestions
+from pyjams.utils.analytics import get_report
+from pyjams.utils.artists import index_playlist_artists
+from pyjams.utils.autocomplete import PrefixIndex
+from pyjams.utils.background import BackgroundTasks
+from pyjams.utils.imports import IMPORT_STALE_AFTER, fail_stale_imports, run_import
+from pyjams.utils.mutations import MutationResult
+from pyjams.utils.suggestions import VoteBuffer
+from pyjams.utils.sync import SyncResult, sync_playlist
+from pyjams.utils.templates import (
+    CachedFragment,
+    cache_track_list,
+    fragment_response,
+    get_cached_track_list,
+    render_chunked,
+)
+from pyjams.utils.tracks import PlaylistStats, cache_tracks, get_playlist_stats, set_playlist_stats
 
 # Create your tests here.
 
@@ -11,3 +57,968 @@ class ExampleTest(TestCase):
     def test_index_page(self) -> None:
         response = self.client.get("/")
         self.assertContains(response, "PyJams - Home", status_code=200)
+
+
+class FeaturedPlaylistCacheTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="creator", spotify_id="creator-spotify-id")
+
+    def test_community_featured_is_cached(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            FeaturedPlaylist.objects.create(spotify_id="playlist-0001", name="One", creator=self.user)
+        FeaturedPlaylist.get_community_featured_page()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(FeaturedPlaylist.get_community_featured_page().items), 1)
+
+    def test_save_and_bulk_update_invalidate(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            FeaturedPlaylist.set_site_featured("playlist-0001", "First", None, None, self.user)
+        site_featured = FeaturedPlaylist.get_site_featured()
+        assert site_featured is not None
+        self.assertEqual(site_featured.name, "First")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FeaturedPlaylist.set_site_featured("playlist-0002", "Second", None, None, self.user)
+        site_featured = FeaturedPlaylist.get_site_featured()
+        assert site_featured is not None
+        self.assertEqual(site_featured.name, "Second")
+        self.assertEqual(FeaturedPlaylist.get_active_spotify_ids(), frozenset({"playlist-0002"}))
+
+
+class FeaturedPlaylistPaginationTest(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create(username="creator", spotify_id="creator-spotify-id")
+        featured_date = timezone.now()
+        for i in range(5):
+            # Identical timestamps force the id tiebreaker to keep pages disjoint
+            FeaturedPlaylist.objects.create(
+                spotify_id=f"playlist-{i:04d}", name=f"Playlist {i}", creator=user, featured_date=featured_date
+            )
+
+    def test_pages_cover_every_row_once(self) -> None:
+        seen: list[str] = []
+        cursor = None
+        while True:
+            page = FeaturedPlaylist.get_community_featured_page(cursor=cursor, limit=2)
+            seen.extend(p.spotify_id for p in page.items)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, [f"playlist-{i:04d}" for i in reversed(range(5))])
+
+    def test_invalid_cursor(self) -> None:
+        with self.assertRaises(ValueError):
+            FeaturedPlaylist.get_community_featured_page(cursor="not-a-cursor")
+
+
+class PlaylistSnapshotTest(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create(username="creator", spotify_id="creator-spotify-id")
+        self.playlist = FeaturedPlaylist.objects.create(spotify_id="playlist-0001", name="One", creator=user)
+
+    def test_deltas_decode_and_diff(self) -> None:
+        versions = [[f"track{i}" for i in range(50)]]
+        versions.append(versions[0][:10] + ["new"] + versions[0][20:])
+        versions.append(versions[1][5:] + versions[1][:5])
+        recorded = [PlaylistSnapshot.record(self.playlist, f"s{i}", v) for i, v in enumerate(versions)]
+
+        self.assertEqual([s.is_keyframe for s in recorded], [True, False, False])
+        for snapshot, version in zip(recorded, versions, strict=True):
+            self.assertEqual(snapshot.spotify_ids(), version)
+
+        diff = recorded[1].diff(recorded[0])
+        self.assertEqual(diff.added, ["new"])
+        self.assertEqual(sorted(diff.removed), [f"track{i}" for i in range(10, 20)])
+        self.assertTrue(recorded[2].diff(recorded[1]).reordered)
+
+    def test_prune_keeps_survivors_decodable(self) -> None:
+        for i in range(6):
+            PlaylistSnapshot.record(self.playlist, f"s{i}", [f"track{j}" for j in range(i + 1)])
+        self.assertEqual(PlaylistSnapshot.prune(self.playlist, keep=3), 3)
+
+        oldest = PlaylistSnapshot.objects.filter(playlist=self.playlist).last()
+        self.assertTrue(oldest.is_keyframe)
+        self.assertEqual(oldest.spotify_ids(), ["track0", "track1", "track2", "track3"])
+
+
+def track_uri(name: str) -> str:
+    """A well-formed track URI, Spotify ids are 22 base62 characters."""
+    return f"spotify:track:{name:0>22}"
+
+
+class ImportJobTest(TestCase):
+    class FakeSpotify:
+        def __init__(self) -> None:
+            self.batches: list[list[str]] = []
+
+        def playlist(self, playlist_id: str, fields: str | None = None) -> dict[str, Any]:
+            return {"snapshot_id": "s0"}
+
+        def playlist_items(self, playlist_id: str, **kwargs: Any) -> dict[str, Any]:
+            return {"items": [{"track": {"uri": track_uri("existing")}}], "next": None}
+
+        def search(self, q: str, type: str, limit: int) -> dict[str, Any]:
+            found = (
+                [{"id": "fromisrc", "uri": track_uri("fromisrc"), "duration_ms": 1000}]
+                if q == "isrc:USRC17607839"
+                else []
+            )
+            return {"tracks": {"items": found}}
+
+        def playlist_add_items(self, playlist_id: str, items: list[str]) -> dict[str, Any]:
+            self.batches.append(list(items))
+            return {"snapshot_id": f"s{len(self.batches)}"}
+
+    def import_rows(self, rows: list[str]) -> tuple[ImportJob, "ImportJobTest.FakeSpotify"]:
+        user, _ = User.objects.get_or_create(username="manager", spotify_id="manager-spotify-id")
+        job = ImportJob.objects.create(user=user, playlist_id="playlist-0001")
+        spotify = self.FakeSpotify()
+        run_import(job, spotify, io.BytesIO("\n".join(rows).encode()))
+        job.refresh_from_db()
+        return job, spotify
+
+    def test_csv_import_resolves_dedupes_and_batches(self) -> None:
+        rows = ["isrc,track_uri", "US-RC1-76-07839,", f",{track_uri('existing')}", "ZZZZZ0000000,"]
+        rows += [f",{track_uri(f't{i}')}" for i in range(150)] + [f",{track_uri('t0')}"]
+
+        job, spotify = self.import_rows(rows)
+
+        self.assertEqual([len(batch) for batch in spotify.batches], [100, 51])
+        self.assertEqual(spotify.batches[0][0], track_uri("fromisrc"))
+        self.assertEqual((job.rows, job.added, job.skipped, job.unresolved), (154, 151, 2, 1))
+        self.assertEqual(job.snapshot_id, "s2")
+
+    def test_malformed_json_lines_are_counted_as_failed(self) -> None:
+        rows = [f'{{"uri": "{track_uri("a")}"}}', '{"uri": "spotify:track:', "[1, 2]", '{"isrc": "USRC17607839"}']
+
+        job, spotify = self.import_rows(rows)
+
+        self.assertEqual(spotify.batches, [[track_uri("a"), track_uri("fromisrc")]])
+        self.assertEqual((job.rows, job.added, job.failed), (4, 2, 2))
+
+    def test_rows_that_cant_name_a_track_are_counted_as_failed(self) -> None:
+        link = f"https://open.spotify.com/track/{track_uri('b').split(':')[-1]}?si=x"
+        job, spotify = self.import_rows(["not a track", track_uri("a"), link, "spotify:track:short"])
+
+        self.assertEqual(spotify.batches, [[track_uri("a"), track_uri("b")]])
+        self.assertEqual((job.rows, job.added, job.failed), (4, 2, 2))
+
+    def test_single_column_header_is_not_a_track(self) -> None:
+        job, spotify = self.import_rows(["isrc", "USRC17607839"])
+
+        self.assertEqual(spotify.batches, [[track_uri("fromisrc")]])
+        self.assertEqual((job.rows, job.added, job.failed), (1, 1, 0))
+
+    def test_columns_are_matched_by_suffix(self) -> None:
+        for header in ("name,spotify_uri", "Track Name,Track URI"):
+            with self.subTest(header=header):
+                job, spotify = self.import_rows([header, f"One,{track_uri('a')}", "Two,nope"])
+
+                self.assertEqual(spotify.batches, [[track_uri("a")]])
+                self.assertEqual((job.rows, job.added, job.failed), (2, 1, 1))
+
+    def test_non_utf8_files_are_read(self) -> None:
+        rows = ["name,track_uri", f"Café,{track_uri('a')}"]
+        user = User.objects.create(username="manager", spotify_id="manager-spotify-id")
+        job = ImportJob.objects.create(user=user, playlist_id="playlist-0001")
+        spotify = self.FakeSpotify()
+
+        run_import(job, spotify, io.BytesIO("\n".join(rows).encode("latin-1")))
+
+        self.assertEqual(spotify.batches, [[track_uri("a")]])
+
+    def test_header_without_a_track_column_fails_before_adding(self) -> None:
+        user = User.objects.create(username="manager", spotify_id="manager-spotify-id")
+        job = ImportJob.objects.create(user=user, playlist_id="playlist-0001")
+        spotify = self.FakeSpotify()
+
+        with self.assertRaisesMessage(ValueError, "No track URI or ISRC column"):
+            run_import(job, spotify, io.BytesIO(b"name,artist\nOne,Someone"))
+        self.assertEqual(spotify.batches, [])
+
+    def test_stale_imports_are_failed(self) -> None:
+        user = User.objects.create(username="manager", spotify_id="manager-spotify-id")
+        stale = ImportJob.objects.create(user=user, playlist_id="playlist-0001", status="running")
+        active = ImportJob.objects.create(user=user, playlist_id="playlist-0001", status="running")
+        ImportJob.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - IMPORT_STALE_AFTER)
+
+        self.assertEqual(fail_stale_imports(), 1)
+
+        stale.refresh_from_db()
+        active.refresh_from_db()
+        self.assertEqual((stale.status, active.status), ("failed", "running"))
+        self.assertIsNotNone(stale.finished_at)
+
+
+class FeaturedPlaylistSearchTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="creator", spotify_id="creator-spotify-id")
+
+    def make(self, i: int, name: str, description: str = "", **kwargs: Any) -> FeaturedPlaylist:
+        return FeaturedPlaylist.objects.create(
+            spotify_id=f"playlist-{i:04d}", name=name, description=description, creator=self.user, **kwargs
+        )
+
+    def test_ranked_prefix_search(self) -> None:
+        self.make(1, "Chill evening", "songs for jazz lovers")
+        self.make(2, "Jazz classics")
+        self.make(3, "Jazz inactive", is_active=False)
+        self.make(4, "Rock anthems")
+
+        playlists, has_next = FeaturedPlaylist.search("jaz")
+        self.assertEqual([p.name for p in playlists], ["Jazz classics", "Chill evening"])
+        self.assertFalse(has_next)
+
+        first, has_next = FeaturedPlaylist.search("jazz", limit=1)
+        second, _ = FeaturedPlaylist.search("jazz", page=2, limit=1)
+        self.assertTrue(has_next)
+        self.assertEqual([first[0].name, second[0].name], ["Jazz classics", "Chill evening"])
+
+    def test_index_follows_updates(self) -> None:
+        playlist = self.make(1, "Old name")
+        with self.captureOnCommitCallbacks(execute=True):
+            playlist.name = "Brand new"
+            playlist.save()
+        self.assertEqual(FeaturedPlaylist.search("old"), ([], False))
+        self.assertEqual(FeaturedPlaylist.search("brand")[0], [playlist])
+
+    def test_similar_names_survive_typos(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make(1, "Radiohead")
+            self.make(2, "Radio hits")
+            self.make(3, "Radiohead inactive", is_active=False)
+
+        matches = FeaturedPlaylist.similar_to("radiohaed")
+        self.assertEqual(
+            [(p.name, round(score, 2)) for p, score in matches], [("Radiohead", 0.43), ("Radio hits", 0.31)]
+        )
+        self.assertEqual(len(FeaturedPlaylist.similar_to("radiohaed", threshold=0.4)), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make(4, "Radiohed")
+        self.assertEqual(FeaturedPlaylist.similar_to("radiohaed", limit=1)[0][0].name, "Radiohed")
+
+
+class AutocompleteTest(SimpleTestCase):
+    def test_prefix_index_ranks_and_merges(self) -> None:
+        index = PrefixIndex(merge_threshold=2)
+        index.add("Blue Monday", "track", 1)
+        index.add("Blur", "artist", 5)
+        index.add("Black Sabbath", "artist", 3)
+        index.add("blue   monday", "query", 5)
+
+        ranked = [(s.text, s.kind, s.weight) for s in index.suggest("BL")]
+        self.assertEqual(ranked, [("Blue Monday", "track", 6), ("Blur", "artist", 5), ("Black Sabbath", "artist", 3)])
+        self.assertEqual([s.text for s in index.suggest("blur", limit=1)], ["Blur"])
+        self.assertEqual(index.suggest("x"), [])
+
+        index.discard("Blur", "playlist")
+        self.assertIn("blur", index)
+        index.discard("Blur", "artist")
+        index.discard("Black Sabbath", "artist")
+        self.assertEqual([s.text for s in index.suggest("b")], ["Blue Monday"])
+
+    def test_eviction_keeps_heaviest(self) -> None:
+        index = PrefixIndex(merge_threshold=1, max_keys=2)
+        for weight, name in enumerate(["abba", "abc", "able"]):
+            index.add(name, "artist", weight)
+        self.assertEqual([s.text for s in index.suggest("ab")], ["able", "abc"])
+
+    def test_weights_are_renormalized(self) -> None:
+        index = PrefixIndex()
+        index.add("old", "track")
+        later = time.time() + autocomplete.AUTOCOMPLETE_HALF_LIFE * (autocomplete.AUTOCOMPLETE_RENORMALIZE_AFTER + 1)
+        with patch.object(autocomplete.time, "time", return_value=later):
+            index.add("older", "track")
+            index.add("older", "track")
+            index.add("oldest", "track", hits=3)
+        self.assertEqual([s.text for s in index.suggest("old")], ["oldest", "older", "old"])
+        self.assertEqual([s.weight for s in index.suggest("olde")], [3, 2])
+
+
+class AutocompleteSourcesTest(TestCase):
+    def setUp(self) -> None:
+        for name, value in (
+            ("suggestions", PrefixIndex()),
+            ("_featured_names", (0, frozenset())),
+            ("_query_searchers", OrderedDict()),
+        ):
+            patcher: Any = patch.object(autocomplete, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = User.objects.create(username="creator", spotify_id="creator-spotify-id")
+
+    def test_popular_queries_and_featured_names(self) -> None:
+        for searcher in range(autocomplete.POPULAR_QUERY_MIN_COUNT - 1):
+            autocomplete.record_query("lofi beats", str(searcher))
+        # Searching again doesn't make a query popular
+        autocomplete.record_query("lofi beats", "0")
+        self.assertEqual(autocomplete.autocomplete("lof"), [])
+        autocomplete.record_query("Lofi Beats", "someone else")
+        self.assertEqual([s.kind for s in autocomplete.autocomplete("lof")], ["query"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            playlist = FeaturedPlaylist.objects.create(spotify_id="p1", name="Lofi study", creator=self.user)
+        self.assertEqual([s.text for s in autocomplete.autocomplete("lofi s")], ["Lofi study"])
+        with self.captureOnCommitCallbacks(execute=True):
+            playlist.delete()
+        self.assertEqual(autocomplete.autocomplete("lofi s"), [])
+
+    def test_candidate_queries_are_bounded(self) -> None:
+        with patch.object(autocomplete, "POPULAR_QUERY_CANDIDATES", 2):
+            for query in ("first", "second", "third"):
+                autocomplete.record_query(query, "fan")
+        self.assertEqual(list(autocomplete._query_searchers), ["second", "third"])
+
+
+class BackgroundTasksTest(TestCase):
+    def test_tasks_run_after_commit_once_per_waiting_key(self) -> None:
+        tasks = BackgroundTasks("test")
+        release = threading.Event()
+        ran: list[str] = []
+
+        def fail(name: str) -> None:
+            ran.append(name)
+            raise RuntimeError("boom")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            # Keeps the single worker busy while the rest are queued
+            tasks.run_after_commit(release.wait, 5)
+            tasks.run_after_commit(ran.append, "first", key=1)
+            tasks.run_after_commit(ran.append, "again", key=1)
+            tasks.run_after_commit(fail, "other", key=2)
+            self.assertEqual(ran, [])
+        with self.assertLogs("pyjams.utils.background", "ERROR") as logs:
+            release.set()
+            tasks._executor.shutdown(wait=True)
+
+        self.assertEqual(ran, ["first", "other"])
+        self.assertIn("task fail for 2 failed: boom", logs.output[0])
+
+
+class ArtistIndexTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="creator", spotify_id="creator-spotify-id")
+        self.first = FeaturedPlaylist.objects.create(spotify_id="p1", name="First", creator=self.user)
+        self.second = FeaturedPlaylist.objects.create(spotify_id="p2", name="Second", creator=self.user)
+
+    def item(self, added_by: str, *artists: str) -> dict[str, Any]:
+        return {"added_by": {"id": added_by}, "track": {"artists": [{"id": a, "name": a.title()} for a in artists]}}
+
+    class FakeSpotify:
+        def __init__(self, items: list[dict[str, Any]]) -> None:
+            self.items = items
+
+        def playlist_items(self, playlist_id: str, **kwargs: Any) -> dict[str, Any]:
+            return {"items": self.items, "next": None}
+
+    def test_index_counts_and_usage(self) -> None:
+        items = [self.item("ann", "bowie"), self.item("ann", "bowie", "queen"), self.item("bob", "bowie")]
+        self.assertEqual(index_playlist_artists(self.FakeSpotify(items), self.first), 3)
+        index_playlist_artists(self.FakeSpotify([self.item("bob", "bowie")]), self.second)
+
+        usage = ArtistPlaylist.usage("bowie")
+        assert usage is not None
+        self.assertEqual(usage.artist_name, "Bowie")
+        self.assertEqual(usage.playlists, [(self.first, 3), (self.second, 1)])
+        self.assertEqual(usage.added_by, [("ann", 2), ("bob", 2)])
+
+        # Rebuilding replaces the rows, dropping artists no longer in the playlist
+        index_playlist_artists(self.FakeSpotify([self.item("ann", "queen"), self.item("ann", "queen")]), self.first)
+        self.assertEqual(ArtistPlaylist.usage("bowie").playlists, [(self.second, 1)])  # type: ignore[union-attr]
+        self.assertEqual(ArtistPlaylist.objects.get(artist_id="queen").track_count, 2)
+
+        self.second.is_active = False
+        self.second.save()
+        self.assertIsNone(ArtistPlaylist.usage("bowie"))
+
+    def test_command_backfills_unindexed_playlists(self) -> None:
+        index_playlist_artists(self.FakeSpotify([self.item("ann", "queen")]), self.first)
+        fake = self.FakeSpotify([self.item("bob", "bowie")])
+
+        with patch("pyjams.management.commands.index_artists.Spotify", return_value=fake):
+            call_command("index_artists", stdout=io.StringIO())
+
+        self.assertEqual(ArtistPlaylist.usage("queen").playlists, [(self.first, 1)])  # type: ignore[union-attr]
+        self.assertEqual(ArtistPlaylist.usage("bowie").playlists, [(self.second, 1)])  # type: ignore[union-attr]
+
+
+class PlaylistSignatureTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="creator", spotify_id="creator-spotify-id")
+
+    def make(self, i: int, track_ids: list[str]) -> FeaturedPlaylist:
+        playlist = FeaturedPlaylist.objects.create(spotify_id=f"p{i}", name=f"Playlist {i}", creator=self.user)
+        self.assertTrue(PlaylistSignature.update_for(playlist, "s1", track_ids))
+        return playlist
+
+    def test_similar_playlists_via_lsh(self) -> None:
+        tracks = [f"t{i}" for i in range(100)]
+        base = self.make(1, tracks)
+        close = self.make(2, tracks[:90] + [f"x{i}" for i in range(10)])
+        closer = self.make(3, tracks[:95])
+        self.make(4, [f"y{i}" for i in range(100)])
+
+        similar = PlaylistSignature.similar_to(base)
+        self.assertEqual([p for p, _ in similar], [closer, close])
+        self.assertGreater(similar[0][1], 0.8)
+        self.assertFalse(PlaylistSignature.update_for(base, "s1", []))
+
+        # A new snapshot replaces the signature and its bands
+        self.assertTrue(PlaylistSignature.update_for(closer, "s2", [f"y{i}" for i in range(100)]))
+        self.assertEqual(PlaylistBand.objects.filter(playlist=closer).count(), minhash.LSH_BANDS)
+        self.assertEqual([p for p, _ in PlaylistSignature.similar_to(base, limit=1)], [close])
+
+        self.assertTrue(PlaylistSignature.update_for(base, "s2", []))
+        self.assertEqual(PlaylistSignature.similar_to(base), [])
+
+
+class AnalyticsReportTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="mod", spotify_id="moderator-spotify-id", role="moderator")
+
+    def playlist(self, i: int, track_ids: list[str], featured_type: str = "community") -> None:
+        playlist = FeaturedPlaylist.objects.create(
+            spotify_id=f"p{i}", name=f"Playlist {i}", creator=self.user, featured_type=featured_type
+        )
+        PlaylistSnapshot.record(playlist, "s1", track_ids)
+
+    def test_report(self) -> None:
+        cache_tracks(
+            [
+                {
+                    "id": "a",
+                    "duration_ms": 60_000,
+                    "explicit": True,
+                    "popularity": 10,
+                    "artists": [{"id": "x", "name": "X"}],
+                },
+                {
+                    "id": "b",
+                    "duration_ms": 180_000,
+                    "explicit": False,
+                    "popularity": 50,
+                    "artists": [{"id": "x", "name": "X"}, {"id": "y", "name": "Y"}],
+                },
+                {
+                    "id": "c",
+                    "duration_ms": 900_000,
+                    "explicit": False,
+                    "popularity": 90,
+                    "artists": [{"id": "y", "name": "Y"}],
+                },
+            ]
+        )
+        self.playlist(1, ["a", "b"])
+        self.playlist(2, ["b", "c", "d"])
+        self.playlist(3, ["c"], featured_type="site")
+
+        report = get_report(refresh=True)
+        self.assertEqual((report["playlists"], report["tracks"], report["tracks_with_metadata"]), (3, 4, 3))
+        self.assertEqual(report["playlist_entries"], 6)
+        self.assertAlmostEqual(report["explicit_ratio"], 1 / 3)
+        self.assertEqual(report["duration"]["percentiles_ms"]["p50"], 180_000)
+        self.assertEqual([b["tracks"] for b in report["duration"]["histogram"]], [0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 1])
+        self.assertEqual(report["popularity_percentiles"]["p50"], 50)
+        self.assertEqual(
+            report["top_artists"],
+            [{"name": "Y", "tracks": 2, "playlists": 3}, {"name": "X", "tracks": 2, "playlists": 2}],
+        )
+        overlap = report["community_overlap"]
+        self.assertEqual((overlap["playlists"], overlap["pairs"], overlap["overlapping_pairs"]), (2, 1, 1))
+        self.assertEqual(overlap["top"][0]["shared_tracks"], 1)
+        self.assertAlmostEqual(overlap["top"][0]["jaccard"], 1 / 4)
+
+    def test_community_playlists_without_shared_tracks(self) -> None:
+        self.playlist(1, [])
+        self.playlist(2, ["a"])
+        self.playlist(3, ["a", "a"], featured_type="site")
+
+        report = get_report(refresh=True)
+        self.assertEqual(report["playlist_entries"], 2)
+        overlap = report["community_overlap"]
+        self.assertEqual((overlap["pairs"], overlap["overlapping_pairs"], overlap["top"]), (1, 0, []))
+        self.assertEqual(overlap["mean_jaccard"], 0.0)
+
+
+class SuggestionVoteTest(TestCase):
+    def setUp(self) -> None:
+        self.users = [User.objects.create(username=f"voter{i}", spotify_id=f"voter-spotify-{i}") for i in range(3)]
+        self.playlist = FeaturedPlaylist.objects.create(spotify_id="p1", name="Queue", creator=self.users[0])
+        buffer = VoteBuffer(flush_interval=None)
+        patcher = patch.object(suggestions, "votes", buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(suggestions._queues.clear)
+        self.buffer = buffer
+
+    def suggest(self, name: str) -> TrackSuggestion:
+        track = {"uri": f"spotify:track:{name}", "name": name.title(), "artists": [{"name": "Band"}]}
+        with self.captureOnCommitCallbacks(execute=True):
+            return suggestions.suggest_track(self.playlist, self.users[0], track)
+
+    def ranked(self) -> list[tuple[str, int]]:
+        return [(s.track_name, s.score) for s in suggestions.get_queue(self.playlist.pk).page(0, 10)]
+
+    def test_votes_rank_immediately_and_flush_in_batches(self) -> None:
+        first, second = self.suggest("first"), self.suggest("second")
+        self.assertEqual(self.ranked(), [("First", 0), ("Second", 0)])
+
+        with self.assertNumQueries(len(self.users)):
+            for user in self.users:
+                suggestions.cast_vote(second, user.pk, 1)
+        # Changing a vote only moves the score by the difference, and clicks collapse per user
+        self.assertEqual(suggestions.cast_vote(second, self.users[0].pk, -1), 1)
+        self.assertEqual(suggestions.cast_vote(first, self.users[1].pk, 1), 1)
+        # Equal scores keep the oldest suggestion first
+        self.assertEqual(self.ranked(), [("First", 1), ("Second", 1)])
+        self.assertEqual(suggestions.user_votes(self.users[0].pk, [first.pk, second.pk]), {second.pk: -1})
+        self.assertFalse(SuggestionVote.objects.exists())
+        self.assertEqual(len(self.buffer), 4)
+
+        self.buffer.flush()
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(SuggestionVote.objects.count(), 4)
+        second.refresh_from_db()
+        self.assertEqual(second.score, 1)
+
+        # A retracted vote is deleted, and a reloaded queue matches the live one
+        suggestions.cast_vote(second, self.users[0].pk, 0)
+        self.buffer.flush()
+        self.assertEqual(SuggestionVote.objects.filter(suggestion=second).count(), 2)
+        live = self.ranked()
+        suggestions._queues.clear()
+        self.assertEqual(self.ranked(), live)
+        self.assertEqual(live, [("Second", 2), ("First", 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            suggestions.review_suggestion(second, self.users[0], accepted=True)
+        self.assertEqual(self.ranked(), [("First", 1)])
+        self.assertIsNone(suggestions.cast_vote(second, self.users[1].pk, 1))
+
+    def test_rankings_follow_written_scores_and_other_workers(self) -> None:
+        first, second = self.suggest("first"), self.suggest("second")
+        queue = suggestions.get_queue(self.playlist.pk)
+        # Two clicks that both read no stored vote only count once
+        self.assertEqual(self.buffer.add(second.pk, self.users[0].pk, 1, stored=0, queue=queue), 1)
+        self.assertEqual(self.buffer.add(second.pk, self.users[0].pk, 1, stored=0, queue=queue), 1)
+
+        # A drifted ranking is corrected by the next write
+        queue.adjust(first.pk, 5)
+        suggestions.cast_vote(first, self.users[1].pk, 1)
+        self.buffer.flush()
+        self.assertIs(suggestions.get_queue(self.playlist.pk), queue)
+        self.assertEqual(self.ranked(), [("First", 1), ("Second", 1)])
+
+        # Votes written by another worker make this one load the ranking again
+        SuggestionVote.apply({(second.pk, self.users[2].pk): 1})
+        pyjams_cache.bump_generation(f"suggestions:{self.playlist.pk}")
+        self.assertEqual(self.ranked(), [("Second", 2), ("First", 1)])
+
+    def test_flush_is_a_few_statements(self) -> None:
+        queued = [self.suggest(f"track{i}") for i in range(20)]
+        voters = [User.objects.create(username=f"fan{i}", spotify_id=f"fan-spotify-{i}") for i in range(10)]
+        votes = {(suggestion.pk, voter.pk): 1 for suggestion in queued for voter in voters}
+        with self.assertNumQueries(7):
+            scores = SuggestionVote.apply(votes)
+        self.assertEqual(set(scores.values()), {10})
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self) -> None:
+        self.admin = User.objects.create(username="admin", spotify_id="admin-spotify-id", role="admin")
+        self.playlist = FeaturedPlaylist.objects.create(spotify_id="p1", name="Managed", creator=self.admin)
+        self.factory = RequestFactory()
+
+    def get_managers(self, etag: str | None = None) -> Any:
+        headers = {"If-None-Match": etag} if etag else {}
+        request = self.factory.get("/managers/", headers=headers)
+        request.user = self.admin
+        return views.get_playlist_managers(request, self.playlist.pk)
+
+    def test_unchanged_managers_are_not_modified(self) -> None:
+        PlaylistManager.add_manager(self.playlist.pk, self.admin.pk)
+        first = self.get_managers()
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        # Only the version query runs before answering
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_managers(first["ETag"]).status_code, 304)
+
+        PlaylistManager.remove_manager(self.playlist.pk, self.admin.pk)
+        changed = self.get_managers(first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+
+
+class TrackWriteViewTest(TestCase):
+    def setUp(self) -> None:
+        self.track = {
+            "id": "t1",
+            "uri": "spotify:track:t1",
+            "name": "Song",
+            "duration_ms": 60_000,
+            "artists": [],
+            "album": {},
+        }
+        self.uris = ["spotify:track:t1", "spotify:track:t2", "spotify:track:t1"]
+        self.manager = User.objects.create(username="manager", spotify_id="manager-spotify-id", role="admin")
+        self.stats: PlaylistStats = {"snapshot_id": "snap-1", "followers": 0, "track_count": 10, "duration_ms": 600_000}
+        set_playlist_stats("p1", self.stats)
+
+    def post(self, view: Any, result: MutationResult, hx: bool = False) -> Any:
+        request = RequestFactory().post(
+            "/playlists/p1/tracks/", {"track_id": "t1", "occurrences": 50}, headers={"HX-Request": "true"} if hx else {}
+        )
+        request.user = self.manager
+        request.session = {}
+        request._messages = CookieStorage(request)
+        with (
+            patch.object(views, "get_spotify"),
+            patch.object(views, "get_track", return_value=self.track),
+            patch.object(
+                views, "get_playlist_track_uris", return_value=("snap-1", ["spotify:track:t1", "x", "spotify:track:t1"])
+            ),
+            patch.object(views.playlist_writes, "submit", return_value=result) as submit,
+        ):
+            response = view(request, "p1")
+        self.submit = submit
+        return response
+
+    def test_add_track_renders_row_and_stats(self) -> None:
+        response = self.post(views.add_track, MutationResult(ok=True, snapshot_id="snap-2"), hx=True)
+        self.assertEqual(self.submit.call_args.args[1:], ("p1", "add", "spotify:track:t1"))
+        self.assertContains(response, '<tbody hx-swap-oob="beforeend:#trackListBody">')
+        self.assertContains(response, "<td>11</td>")
+        self.assertContains(response, 'data-stat="duration">11 min')
+        self.assertEqual(
+            get_playlist_stats("p1"),
+            {"snapshot_id": "snap-2", "followers": 0, "track_count": 11, "duration_ms": 660_000},
+        )
+
+    def test_add_superseded_by_a_later_remove_shows_nothing(self) -> None:
+        result = MutationResult(ok=True, snapshot_id="snap-2", superseded=True)
+        response = self.post(views.add_track, result, hx=True)
+        self.assertNotContains(response, "trackListBody")
+        self.assertNotContains(response, "playlistStats")
+        self.assertEqual(get_playlist_stats("p1"), self.stats)
+
+        data = json.loads(self.post(views.add_track, result).content)
+        self.assertEqual((data["html"], data["stats"]), ("", None))
+        self.assertEqual(data["message"], "Track was removed again by a later change")
+
+    def test_remove_track_counts_occurrences_itself(self) -> None:
+        response = self.post(views.remove_track, MutationResult(ok=True, snapshot_id="snap-2"))
+        data = json.loads(response.content)
+        # Both occurrences on Spotify, whatever the client claimed
+        self.assertEqual(data["stats"]["track_count"], 8)
+        self.assertEqual(data["stats"]["duration"], "8 min")
+        self.assertEqual(data["snapshot_id"], "snap-2")
+
+    def test_bulk_add_reports_a_partial_failure(self) -> None:
+        spotify = Mock()
+        spotify.playlist.return_value = {"snapshot_id": "snap-1"}
+        spotify.playlist_items.return_value = {"items": [], "next": None}
+        spotify.playlist_add_items.side_effect = [{"snapshot_id": "snap-2"}, SpotifyException(429, -1, "Rate limited")]
+        uris = "\n".join(f"spotify:track:{i}" for i in range(150))
+        request = RequestFactory().post("/playlists/p1/tracks/add/bulk/", {"track_uris": uris})
+        request.user = self.manager
+        request.session = {}
+        with patch.object(views, "get_spotify", return_value=spotify):
+            response = views.add_tracks(request, "p1")
+
+        self.assertEqual(response.status_code, 207)
+        data = json.loads(response.content)
+        self.assertEqual((len(data["added"]), len(data["failed"])), (100, 50))
+        self.assertEqual(data["stats"]["track_count"], 110)
+        self.assertEqual(data["snapshot_id"], "snap-2")
+
+    def test_remove_duplicates_counts_each_position_once(self) -> None:
+        FeaturedPlaylist.objects.create(spotify_id="p1", name="Featured", creator=self.manager)
+        cache_tracks([self.track])
+        items = [{"uri": "spotify:track:t1", "position": 2}] * 2
+        request = RequestFactory().post(
+            "/playlists/p1/duplicates/", json.dumps({"items": items}), content_type="application/json"
+        )
+        request.user = self.manager
+        request.session = {}
+        request._messages = CookieStorage(request)
+        with (
+            patch.object(views, "get_spotify"),
+            patch.object(views, "remove_positions", return_value=SyncResult(snapshot_id="snap-2", removed=1)),
+        ):
+            response = views.remove_duplicates(request, "p1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            get_playlist_stats("p1"),
+            {"snapshot_id": "snap-2", "followers": 0, "track_count": 9, "duration_ms": 540_000},
+        )
+
+    def test_failed_write_leaves_stats_alone(self) -> None:
+        response = self.post(views.remove_track, MutationResult(ok=False, error="Rate limited"))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(get_playlist_stats("p1"), self.stats)
+
+
+class SyncPlaylistTest(SimpleTestCase):
+    def plan(self, current: list[str], target: list[str], allow_replace: bool) -> Any:
+        spotify = Mock()
+        spotify.playlist.return_value = {"snapshot_id": f"snap-{len(current)}-{allow_replace}"}
+        spotify.playlist_items.return_value = {"items": [{"track": {"uri": uri}} for uri in current], "next": None}
+        return sync_playlist(spotify, "p1", target, dry_run=True, allow_replace=allow_replace)
+
+    def test_small_diffs_are_never_replaced(self) -> None:
+        current = [f"spotify:track:{i}" for i in range(80)]
+        target = ["spotify:track:new", *current[10:40], *current[:5], *current[50:]]
+        result = self.plan(current, target, allow_replace=True)
+        self.assertFalse(result.replaced)
+        self.assertGreater(result.requests, 1)
+
+    def test_replacing_is_opt_in(self) -> None:
+        current = [f"spotify:track:{i}" for i in range(80)]
+        target = current[::-1]
+        self.assertFalse(self.plan(current, target, allow_replace=False).replaced)
+        replaced = self.plan(current, target, allow_replace=True)
+        self.assertTrue(replaced.replaced)
+        self.assertEqual(replaced.requests, 1)
+
+
+class TrackPageTest(TestCase):
+    def setUp(self) -> None:
+        self.admin = User.objects.create(username="admin", spotify_id="admin-spotify-id", role="admin")
+        FeaturedPlaylist.objects.create(spotify_id="p1", name="Long", creator=self.admin)
+        self.spotify = Mock()
+        self.spotify.playlist_items.side_effect = lambda playlist_id, limit, offset: {
+            "items": [
+                {"track": {"id": f"t{i}", "name": f"Song {i}", "duration_ms": 1000, "artists": [], "album": {}}}
+                for i in range(offset, min(offset + limit, 150))
+            ],
+            "next": "more" if offset + limit < 150 else None,
+        }
+
+    def get_page(self, offset: str, etag: str | None = None) -> Any:
+        headers = {"If-None-Match": etag} if etag else {}
+        request = RequestFactory().get("/playlists/p1/tracks/page/", {"offset": offset}, headers=headers)
+        request.user = self.admin
+        request.session = {}
+        with (
+            patch.object(views, "get_spotify", return_value=self.spotify),
+            patch.object(views, "get_playlist_version", return_value="snap-1"),
+        ):
+            return views.playlist_track_page(request, "p1")
+
+    def test_pages_are_numbered_and_linked(self) -> None:
+        first = self.get_page("0")
+        self.assertEqual(first["X-Next-Offset"], "100")
+        self.assertEqual(first["X-Snapshot-Id"], "snap-1")
+        last = self.get_page("100")
+        self.assertNotIn("X-Next-Offset", last)
+        self.assertContains(last, "<td>101</td>")
+        self.assertContains(last, 'data-track-id="t149"')
+
+        self.assertEqual(self.get_page("100", last["ETag"]).status_code, 304)
+        self.assertEqual(self.spotify.playlist_items.call_count, 2)
+        self.assertEqual(self.get_page("-1").status_code, 400)
+
+    def test_version_is_only_served_for_featured_playlists(self) -> None:
+        def get_version(playlist_id: str) -> Any:
+            request = RequestFactory().get(f"/playlists/{playlist_id}/version/")
+            request.user = self.admin
+            request.session = {}
+            with (
+                patch.object(views, "get_spotify", return_value=self.spotify),
+                patch.object(views, "get_playlist_version", return_value="snap-1") as version,
+            ):
+                return views.playlist_version(request, playlist_id), version
+
+        response, version = get_version("p1")
+        self.assertEqual(json.loads(response.content)["data"]["snapshot_id"], "snap-1")
+        response, version = get_version("someone-elses")
+        self.assertEqual(response.status_code, 404)
+        version.assert_not_called()
+
+
+class StreamedPlaylistTest(TestCase):
+    def test_failed_page_ends_the_stream_with_an_error_row(self) -> None:
+        admin = User.objects.create(username="admin", spotify_id="admin-spotify-id", role="admin")
+        FeaturedPlaylist.objects.create(spotify_id="p1", name="Long", creator=admin)
+        item = {"track": {"id": "t0", "name": "Song 0", "duration_ms": 1000, "artists": [], "album": {}}}
+        playlist = {
+            "id": "p1",
+            "name": "Long",
+            "snapshot_id": "snap-1",
+            "followers": {"total": 0},
+            "tracks": {"total": 2},
+            "owner": {"id": "admin-spotify-id", "display_name": "admin"},
+            "images": [],
+        }
+
+        def items(*args: Any, **kwargs: Any) -> Any:
+            raise RuntimeError("Rate limited")
+            yield
+
+        request = RequestFactory().get("/playlists/p1/", {"stream": "1"})
+        request.user = admin
+        request.session = {}
+        request._messages = CookieStorage(request)
+        with (
+            patch.object(views, "get_spotify"),
+            patch.object(views, "get_playlist_version", return_value="snap-1"),
+            patch.object(views, "get_playlist_info", return_value=(playlist, {"items": [item], "next": "more"})),
+            patch.object(views, "get_similar_playlists", return_value=[]),
+            patch.object(views, "iter_playlist_items", side_effect=items),
+            patch.object(views, "set_playlist_stats") as set_stats,
+        ):
+            response = views.playlist_details(request, "p1")
+            content = b"".join(response.streaming_content).decode()
+
+        self.assertNotIn("ETag", response)
+        self.assertIn('data-track-id="t0"', content)
+        self.assertIn("Loading tracks after #1 failed: Rate limited", content)
+        self.assertNotIn("streamedStats", content)
+        set_stats.assert_not_called()
+
+
+class PlaylistDetailsEtagTest(TestCase):
+    def setUp(self) -> None:
+        self.admin = User.objects.create(username="admin", spotify_id="admin-spotify-id", role="admin")
+        FeaturedPlaylist.objects.create(spotify_id="p1", name="Long", creator=self.admin)
+
+    def etag(self, csrf_secret: str, message: str | None = None) -> str | None:
+        request = RequestFactory().get("/playlists/p1/")
+        request.user = self.admin
+        request.session = {}
+        request.META["CSRF_COOKIE"] = csrf_secret
+        request._messages = CookieStorage(request)
+        if message:
+            messages.info(request, message)
+        with (
+            patch.object(views, "get_spotify"),
+            patch.object(views, "get_playlist_version", return_value="snap-1"),
+        ):
+            return views._playlist_details_etag(request, "p1")
+
+    def test_etag_follows_the_csrf_secret_and_skips_pending_messages(self) -> None:
+        first = self.etag("secret-1")
+        self.assertEqual(first, self.etag("secret-1"))
+        self.assertNotEqual(first, self.etag("secret-2"))
+        self.assertIsNone(self.etag("secret-1", message="Track added"))
+
+
+class PrefetchTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="fan", spotify_id="fan-spotify-id")
+        self.version = "v1"
+        self.renders: list[str] = []
+
+        @views.prefetchable(lambda request: None if messages.get_messages(request) else self.version)
+        def page(request: Any) -> HttpResponse:
+            self.renders.append(request.path)
+            response = HttpResponse(f"render {len(self.renders)}")
+            response["ETag"] = f'"{self.version}"'
+            return response
+
+        self.page = page
+
+    def get(self, message: str | None = None, **headers: str) -> HttpResponse:
+        request = RequestFactory().get("/playlists/p1/", headers=headers)
+        request.user = self.user
+        request._messages = CookieStorage(request)
+        if message:
+            messages.info(request, message)
+        return self.page(request)
+
+    def test_prefetched_page_is_served_once(self) -> None:
+        prefetched = self.get(**{"X-PyJams-Prefetch": "1"})
+        self.assertEqual(prefetched.status_code, 204)
+        self.assertIn("no-store", prefetched["Cache-Control"])
+
+        opened = self.get()
+        self.assertEqual(opened.content, b"render 1")
+        self.assertEqual(opened["ETag"], '"v1"')
+        self.assertEqual(len(self.renders), 1)
+        # Used up by the navigation
+        self.assertEqual(self.get().content, b"render 2")
+
+    def test_changed_pages_and_pending_messages_are_rendered_again(self) -> None:
+        self.get(**{"X-PyJams-Prefetch": "1"})
+        self.version = "v2"
+        self.assertEqual(self.get().content, b"render 2")
+
+        self.assertEqual(self.get("Track added", **{"X-PyJams-Prefetch": "1"}).status_code, 204)
+        self.assertEqual(len(self.renders), 2)
+        self.get(**{"X-PyJams-Prefetch": "1"})
+        self.assertEqual(self.get("Track added").content, b"render 4")
+
+
+class TrackListFragmentTest(SimpleTestCase):
+    def test_cached_fragment_keeps_compressed_copies(self) -> None:
+        items = [{"track": {"id": "t1", "name": "Song", "duration_ms": 1000, "artists": [], "album": {}}}]
+        fragment = cache_track_list("p1", "snap-1", items, is_manager=False)
+        self.assertIn('data-track-id="t1"', fragment["html"])
+        self.assertEqual(gzip.decompress(fragment["gzip"]).decode(), fragment["html"])
+        self.assertEqual(get_cached_track_list("p1", "snap-1", is_manager=False), fragment)
+        self.assertIsNone(get_cached_track_list("p1", "snap-2", is_manager=False))
+
+    def test_response_is_negotiated_by_accept_encoding(self) -> None:
+        fragment: CachedFragment = {"html": "<tr></tr>", "gzip": b"gzip-bytes", "br": b"br-bytes"}
+        without_br: CachedFragment = {**fragment, "br": None}
+        cases = [
+            ("gzip, deflate, br", fragment, b"br-bytes", "br"),
+            ("gzip", fragment, b"gzip-bytes", "gzip"),
+            ("br", without_br, b"<tr></tr>", None),
+            ("br;q=0, gzip", fragment, b"gzip-bytes", "gzip"),
+            ("x-gzip, gzip;q=0", fragment, b"<tr></tr>", None),
+            ("", fragment, b"<tr></tr>", None),
+        ]
+        for accept_encoding, served, content, encoding in cases:
+            with self.subTest(accept_encoding=accept_encoding):
+                request = RequestFactory().get("/", headers={"Accept-Encoding": accept_encoding})
+                response = fragment_response(request, served)
+                self.assertEqual(response.content, content)
+                self.assertEqual(response.get("Content-Encoding"), encoding)
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+
+
+CHUNKED_PAGE = "<h1>{{ title }}</h1>{{ rows }}<p>{{ footer }}</p>"
+
+
+@override_settings(
+    TEMPLATES=[
+        {
+            "BACKEND": "django.template.backends.django.DjangoTemplates",
+            "OPTIONS": {
+                "loaders": [
+                    (
+                        "django.template.loaders.locmem.Loader",
+                        {"page.html": CHUNKED_PAGE},
+                    )
+                ]
+            },
+        }
+    ]
+)
+class RenderChunkedTest(SimpleTestCase):
+    def test_slots_fill_in_page_order_once_reached(self) -> None:
+        started = []
+
+        def rows() -> Any:
+            started.append("rows")
+            yield "<tr>1</tr>"
+            yield "<tr>2</tr>"
+
+        def footer() -> Any:
+            started.append("footer")
+            yield "done"
+
+        chunks = render_chunked(
+            RequestFactory().get("/"), "page.html", {"title": "Mix"}, {"footer": footer, "rows": rows}
+        )
+        self.assertEqual(next(chunks), "<h1>Mix</h1>")
+        self.assertEqual(started, [])
+        self.assertEqual(next(chunks), "<tr>1</tr>")
+        self.assertEqual(started, ["rows"])
+        self.assertEqual("".join(chunks), "<tr>2</tr><p>done</p>")
+        self.assertEqual(started, ["rows", "footer"])
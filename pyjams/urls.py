@@ -23,10 +23,15 @@ app_patterns = [
                     path("callback/", views.spotify_callback, name="spotify_callback"),
                     path("auth/logout/", views.logout, name="logout"),
                     path("profile/", views.profile, name="profile"),
+                    path("moderation/analytics/", views.analytics, name="analytics"),
                     # Playlists
                     path("playlists/", views.manage_playlists, name="playlists"),
                     path("playlists/create/", views.create_playlist, name="create_playlist"),
                     path("playlists/search/", views.search_playlists, name="search_playlists"),
+                    path("playlists/featured/community/", views.community_featured, name="community_featured"),
+                    path("playlists/featured/history/", views.site_featured_history, name="site_featured_history"),
+                    path("playlists/featured/export/", views.export_featured, name="export_featured"),
+                    path("playlists/featured/search/", views.search_featured, name="search_featured"),
                     path("playlists/<str:playlist_id>/", views.playlist_details, name="playlist_details"),
                     # Featured playlists
                     path(
@@ -51,11 +56,59 @@ app_patterns = [
                         views.remove_playlist_manager,
                         name="remove_playlist_manager",
                     ),
+                    # Suggestions
+                    path(
+                        "playlists/<int:playlist_id>/suggestions/",
+                        views.suggestion_queue,
+                        name="suggestion_queue",
+                    ),
+                    path("playlists/<int:playlist_id>/suggestions/add/", views.add_suggestion, name="add_suggestion"),
+                    path("suggestions/<int:suggestion_id>/vote/", views.vote_suggestion, name="vote_suggestion"),
+                    path(
+                        "suggestions/<int:suggestion_id>/review/", views.moderate_suggestion, name="moderate_suggestion"
+                    ),
+                    path("imports/<int:job_id>/", views.import_status, name="import_status"),
+                    path("artists/<str:artist_id>/playlists/", views.artist_playlists, name="artist_playlists"),
                     # Search
                     path("search/", views.search, name="search"),
+                    path("search/fuzzy/", views.fuzzy_search, name="fuzzy_search"),
+                    path("search/autocomplete/", views.autocomplete_search, name="autocomplete_search"),
                     # Tracks
+                    path("playlists/<str:playlist_id>/tracks/", views.playlist_tracks, name="playlist_tracks"),
+                    path(
+                        "playlists/<str:playlist_id>/tracks/page/",
+                        views.playlist_track_page,
+                        name="playlist_track_page",
+                    ),
+                    path("playlists/<str:playlist_id>/events/", views.playlist_events, name="playlist_events"),
+                    path("playlists/<str:playlist_id>/version/", views.playlist_version, name="playlist_version"),
                     path("playlists/<str:playlist_id>/tracks/add/", views.add_track, name="add_track"),
+                    path("playlists/<str:playlist_id>/tracks/add/bulk/", views.add_tracks, name="add_tracks"),
+                    path("playlists/<str:playlist_id>/tracks/sync/", views.sync_tracks, name="sync_tracks"),
+                    path("playlists/<str:playlist_id>/export/", views.export_playlist, name="export_playlist"),
+                    path("playlists/<str:playlist_id>/import/", views.import_tracks, name="import_tracks"),
+                    path("playlists/<str:playlist_id>/history/", views.playlist_history, name="playlist_history"),
+                    path(
+                        "playlists/<str:playlist_id>/history/<int:snapshot_pk>/diff/",
+                        views.snapshot_diff,
+                        name="snapshot_diff",
+                    ),
+                    path(
+                        "playlists/<str:playlist_id>/history/<int:snapshot_pk>/rollback/",
+                        views.rollback_playlist,
+                        name="rollback_playlist",
+                    ),
                     path("playlists/<str:playlist_id>/tracks/remove/", views.remove_track, name="remove_track"),
+                    path(
+                        "playlists/<str:playlist_id>/duplicates/",
+                        views.playlist_duplicates,
+                        name="playlist_duplicates",
+                    ),
+                    path(
+                        "playlists/<str:playlist_id>/duplicates/remove/",
+                        views.remove_duplicates,
+                        name="remove_duplicates",
+                    ),
                     path("tracks/search/", views.search_tracks, name="search_tracks"),
                 ],
                 "pyjams",
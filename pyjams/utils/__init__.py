@@ -1,7 +1,22 @@
-from .handlers import spotify_error_handler
-from .messages import error, info, success, warning
-from .spotify import get_playlist_info, get_spotify
-from .templates import render_template
+"""Helpers shared by the views, models and management commands.
+
+The shortcuts below are imported on first use. Models import helpers from this package while the
+app registry is still loading, before the Spotify helpers can be imported.
+"""
+
+from importlib import import_module
+from typing import Any
+
+_SHORTCUTS = {
+    "error": "messages",
+    "get_playlist_info": "spotify",
+    "get_spotify": "spotify",
+    "info": "messages",
+    "render_template": "templates",
+    "spotify_error_handler": "handlers",
+    "success": "messages",
+    "warning": "messages",
+}
 
 __all__ = [
     "error",
@@ -13,3 +28,9 @@ __all__ = [
     "success",
     "warning",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _SHORTCUTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f".{_SHORTCUTS[name]}", __name__), name)
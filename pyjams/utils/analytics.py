@@ -0,0 +1,257 @@
+"""Site wide analytics over the tracks of active featured playlists.
+
+Track lists come from the latest stored snapshot of each playlist and track metadata from the
+track cache. Both are loaded once into flat NumPy columns: one row per track, one per (track,
+artist) and one per (playlist, track). Every aggregate after that is an array operation, so a
+report over hundreds of thousands of tracks takes about a second once loaded.
+
+Playlist overlap is counted from the (playlist, track) rows sorted by track, so only pairs of
+playlists that actually share a track are ever looked at.
+"""
+
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+from spotipy import Spotify
+
+from pyjams.models import FeaturedPlaylist, PlaylistSnapshot
+from pyjams.utils.spotify import chunked, get_playlist_track_uris
+from pyjams.utils.tracks import cache_tracks, get_cached_tracks, track_id_from_uri
+
+ANALYTICS_CACHE_KEY = "pyjams:analytics_report"
+ANALYTICS_CACHE_TIMEOUT = 60 * 60
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+# Tracks of ten minutes or longer share the last histogram bucket
+DURATION_HISTOGRAM_MINUTES = 10
+TOP_ARTISTS = 20
+TOP_OVERLAPS = 10
+# Spotify's limit for the several tracks endpoint
+TRACKS_PER_REQUEST = 50
+
+
+@dataclass
+class Catalog:
+    """Columnar view of every track in the active featured playlists."""
+
+    track_ids: list[str]
+    # One row per track, in track_ids order. Tracks without cached metadata have a duration of -1
+    duration_ms: np.ndarray
+    explicit: np.ndarray
+    # NaN when unknown
+    popularity: np.ndarray
+    # One row per (track, artist)
+    artist_track: np.ndarray
+    artist_code: np.ndarray
+    artist_names: list[str]
+    # One row per (playlist, track), indexes into playlists and track_ids
+    playlists: list[FeaturedPlaylist] = field(default_factory=list)
+    member_playlist: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    member_track: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+
+    @property
+    def known(self) -> np.ndarray:
+        """Mask of tracks with cached metadata."""
+        return self.duration_ms >= 0
+
+
+def _playlist_track_ids(spotify: Spotify | None) -> list[tuple[FeaturedPlaylist, list[str]]]:
+    playlists = list(FeaturedPlaylist.objects.filter(is_active=True).order_by("id"))
+    latest_ids = (
+        PlaylistSnapshot.objects.filter(playlist__in=playlists)
+        .values("playlist")
+        .annotate(latest=Max("id"))
+        .values_list("latest", flat=True)
+    )
+    latest = {
+        snapshot.playlist_id: snapshot
+        for snapshot in PlaylistSnapshot.objects.filter(id__in=list(latest_ids)).only("id", "playlist")
+    }
+    found = []
+    for playlist in playlists:
+        if playlist.pk in latest:
+            found.append((playlist, latest[playlist.pk].spotify_ids()))
+        elif spotify is not None:
+            _, uris = get_playlist_track_uris(spotify, playlist.spotify_id)
+            found.append((playlist, [track_id_from_uri(uri) for uri in uris if uri]))
+    return found
+
+
+def _track_metadata(track_ids: list[str], spotify: Spotify | None) -> dict[str, dict[str, Any]]:
+    known = get_cached_tracks(track_ids)
+    if spotify is not None:
+        for batch in chunked([track_id for track_id in track_ids if track_id not in known], TRACKS_PER_REQUEST):
+            tracks = [track for track in spotify.tracks(batch)["tracks"] if track]
+            cache_tracks(tracks)
+            known.update((track["id"], track) for track in tracks)
+    return known
+
+
+def load_catalog(spotify: Spotify | None = None) -> Catalog:
+    """Load the tracks of every active featured playlist into columns.
+
+    Args:
+        spotify: When given, playlists without a stored snapshot and tracks missing from the track
+            cache are fetched from Spotify. Otherwise they are left out.
+    """
+    memberships = _playlist_track_ids(spotify)
+    listed = np.array(list(chain.from_iterable(track_ids for _, track_ids in memberships)), dtype=str)
+    unique_ids, codes = np.unique(listed, return_inverse=True)
+    listed_in = np.repeat(np.arange(len(memberships)), [len(track_ids) for _, track_ids in memberships])
+    # A track listed twice in one playlist is a single membership
+    tracks = max(unique_ids.size, 1)
+    pairs = np.unique(listed_in * tracks + codes)
+
+    track_ids: list[str] = unique_ids.tolist()
+    metadata = _track_metadata(track_ids, spotify)
+    # Reading fields out of the cached track dicts is the one pass over tracks in Python, grouping
+    # happens in NumPy
+    rows = [metadata.get(track_id) or {} for track_id in track_ids]
+    credits = [
+        (index, artist.get("id") or artist["name"], artist["name"])
+        for index, track in enumerate(rows)
+        for artist in track.get("artists", [])
+    ]
+    _, first_credit, artist_code = np.unique(
+        np.array([key for _, key, _ in credits], dtype=str), return_index=True, return_inverse=True
+    )
+
+    return Catalog(
+        track_ids=track_ids,
+        duration_ms=np.fromiter((t.get("duration_ms", -1) for t in rows), dtype=np.int64, count=len(rows)),
+        explicit=np.fromiter((bool(t.get("explicit")) for t in rows), dtype=bool, count=len(rows)),
+        popularity=np.fromiter((t.get("popularity", np.nan) for t in rows), dtype=np.float64, count=len(rows)),
+        artist_track=np.array([index for index, _, _ in credits], dtype=np.int32),
+        artist_code=artist_code.astype(np.int32),
+        artist_names=[credits[i][2] for i in first_credit],
+        playlists=[playlist for playlist, _ in memberships],
+        member_playlist=(pairs // tracks).astype(np.int32),
+        member_track=(pairs % tracks).astype(np.int32),
+    )
+
+
+def _percentiles(values: np.ndarray) -> dict[str, float]:
+    if not values.size:
+        return {}
+    return {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES), strict=True)}
+
+
+def duration_summary(catalog: Catalog) -> dict[str, Any]:
+    durations = catalog.duration_ms[catalog.known]
+    minutes = np.minimum(durations // 60_000, DURATION_HISTOGRAM_MINUTES)
+    histogram = np.bincount(minutes, minlength=DURATION_HISTOGRAM_MINUTES + 1)
+    return {
+        "mean_ms": float(durations.mean()) if durations.size else 0.0,
+        "total_ms": int(durations.sum()),
+        "percentiles_ms": _percentiles(durations),
+        "histogram": [{"minutes": int(m), "tracks": int(c)} for m, c in enumerate(histogram)],
+    }
+
+
+def top_artists(catalog: Catalog, limit: int = TOP_ARTISTS) -> list[dict[str, Any]]:
+    """Artists with the most distinct tracks, with the number of playlists each appears in."""
+    artists = len(catalog.artist_names)
+    if not artists:
+        return []
+    tracks = np.bincount(catalog.artist_code, minlength=artists)
+
+    # Expand every (playlist, track) membership into one row per artist of the track, using the
+    # (track, artist) rows sorted by track as a CSR structure
+    order = np.argsort(catalog.artist_track, kind="stable")
+    codes = catalog.artist_code[order]
+    per_track = np.bincount(catalog.artist_track, minlength=len(catalog.track_ids))
+    starts = np.concatenate(([0], np.cumsum(per_track)[:-1]))
+    lengths = per_track[catalog.member_track]
+    expanded_playlist = np.repeat(catalog.member_playlist.astype(np.int64), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    expanded_code = codes[np.repeat(starts[catalog.member_track], lengths) + offsets]
+    pairs = np.unique(expanded_playlist * artists + expanded_code)
+    playlists = np.bincount(pairs % artists, minlength=artists)
+
+    top = np.lexsort((-playlists, -tracks))[:limit]
+    return [{"name": catalog.artist_names[i], "tracks": int(tracks[i]), "playlists": int(playlists[i])} for i in top]
+
+
+def community_overlap(catalog: Catalog, limit: int = TOP_OVERLAPS) -> dict[str, Any]:
+    """Track overlap between every pair of community playlists.
+
+    Only pairs sharing a track are ever materialised: memberships are sorted by track, and each
+    pass pairs every row with the row ``distance`` places later when both hold the same track.
+    Passes stop once no track is in more than ``distance`` playlists.
+    """
+    community = np.array([p.featured_type == "community" for p in catalog.playlists], dtype=bool)
+    rows = np.flatnonzero(community)
+    count = rows.size
+    summary: dict[str, Any] = {"playlists": int(count), "pairs": count * (count - 1) // 2}
+    if count < 2:
+        return {**summary, "overlapping_pairs": 0, "mean_jaccard": 0.0, "top": []}
+
+    keep = community[catalog.member_playlist]
+    row_of = np.full(len(catalog.playlists), -1, dtype=np.int64)
+    row_of[rows] = np.arange(count)
+    member_row = row_of[catalog.member_playlist[keep]]
+    member_track = catalog.member_track[keep]
+    sizes = np.bincount(member_row, minlength=count)
+
+    order = np.lexsort((member_row, member_track))
+    member_row, member_track = member_row[order], member_track[order]
+    keys = [np.empty(0, dtype=np.int64)]
+    candidates = np.arange(member_track.size - 1)
+    distance = 1
+    while candidates.size:
+        candidates = candidates[candidates + distance < member_track.size]
+        candidates = candidates[member_track[candidates] == member_track[candidates + distance]]
+        # Rows are sorted within each track, so the first playlist is always the lower one
+        keys.append(member_row[candidates] * count + member_row[candidates + distance])
+        distance += 1
+    pair_keys, together = np.unique(np.concatenate(keys), return_counts=True)
+    a, b = pair_keys // count, pair_keys % count
+    jaccard = together / (sizes[a] + sizes[b] - together)
+
+    top = np.argsort(-jaccard, kind="stable")[:limit]
+    playlists = [catalog.playlists[i] for i in rows]
+    return {
+        **summary,
+        "overlapping_pairs": int(pair_keys.size),
+        # Pairs without shared tracks count as zero
+        "mean_jaccard": float(jaccard.sum() / summary["pairs"]),
+        "top": [
+            {
+                "first": playlists[a[i]].get_display_name(),
+                "second": playlists[b[i]].get_display_name(),
+                "shared_tracks": int(together[i]),
+                "jaccard": float(jaccard[i]),
+            }
+            for i in top
+        ],
+    }
+
+
+def build_report(catalog: Catalog) -> dict[str, Any]:
+    known = catalog.known
+    popularity = catalog.popularity[known & ~np.isnan(catalog.popularity)]
+    return {
+        "generated_at": timezone.now().isoformat(),
+        "playlists": len(catalog.playlists),
+        "tracks": len(catalog.track_ids),
+        "tracks_with_metadata": int(np.count_nonzero(known)),
+        "playlist_entries": int(catalog.member_track.size),
+        "duration": duration_summary(catalog),
+        "explicit_ratio": float(catalog.explicit[known].mean()) if known.any() else 0.0,
+        "popularity_percentiles": _percentiles(popularity),
+        "top_artists": top_artists(catalog),
+        "community_overlap": community_overlap(catalog),
+    }
+
+
+def get_report(refresh: bool = False, spotify: Spotify | None = None) -> dict[str, Any]:
+    """Get the analytics report, from cache unless ``refresh`` is set."""
+    report = None if refresh else cache.get(ANALYTICS_CACHE_KEY)
+    if report is None:
+        report = build_report(load_catalog(spotify))
+        cache.set(ANALYTICS_CACHE_KEY, report, ANALYTICS_CACHE_TIMEOUT)
+    return report
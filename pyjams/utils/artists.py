@@ -0,0 +1,57 @@
+"""Artist to featured playlist index.
+
+Each featured playlist is read once, fetching only the artists and adder of every item, and its
+artist counts replace that playlist's rows in ``ArtistPlaylist``. Indexing runs in the background
+after a playlist is featured, synced or edited, so no request waits on the extra read. A playlist
+already waiting to be indexed isn't queued again, so a burst of edits costs one read. Playlists
+featured before the index existed are filled in by the ``index_artists`` command.
+"""
+
+from spotipy import Spotify
+
+from pyjams.models import ArtistCounts, ArtistPlaylist, FeaturedPlaylist
+from pyjams.utils.background import BackgroundTasks
+from pyjams.utils.spotify import iter_playlist_items
+
+ARTIST_ITEM_FIELDS = "items(added_by.id,track(artists(id,name))),next"
+
+_tasks = BackgroundTasks("artists")
+
+
+def count_playlist_artists(spotify: Spotify, playlist_id: str) -> ArtistCounts:
+    """Count the tracks of every artist in a playlist, per user who added them."""
+    counts: ArtistCounts = {}
+    for item in iter_playlist_items(spotify, playlist_id, fields=ARTIST_ITEM_FIELDS):
+        added_by = (item.get("added_by") or {}).get("id") or ""
+        for artist in (item.get("track") or {}).get("artists") or []:
+            # Local files have artists without ids
+            if not artist.get("id"):
+                continue
+            key = (artist["id"], added_by)
+            _, count = counts.get(key, ("", 0))
+            counts[key] = (artist["name"], count + 1)
+    return counts
+
+
+def index_playlist_artists(spotify: Spotify, playlist: FeaturedPlaylist) -> int:
+    """Rebuild the artist index rows of one featured playlist, returning how many there are now."""
+    counts = count_playlist_artists(spotify, playlist.spotify_id)
+    ArtistPlaylist.replace_for(playlist, counts)
+    return len(counts)
+
+
+def _index_in_background(spotify: Spotify, featured_id: int) -> None:
+    playlist = FeaturedPlaylist.objects.filter(pk=featured_id).first()
+    if playlist is not None:
+        index_playlist_artists(spotify, playlist)
+
+
+def schedule_artist_index(spotify: Spotify, playlist: FeaturedPlaylist) -> None:
+    """Queue a rebuild of a featured playlist's artist index, once the current transaction commits."""
+    _tasks.run_after_commit(_index_in_background, spotify, playlist.pk, key=playlist.pk)
+
+
+def schedule_artist_index_for(spotify: Spotify, playlist_id: str) -> None:
+    """Queue a rebuild of the artist index after a write to a playlist, if it is featured."""
+    for playlist in FeaturedPlaylist.objects.filter(spotify_id=playlist_id, is_active=True):
+        schedule_artist_index(spotify, playlist)
@@ -0,0 +1,213 @@
+"""Prefix autocomplete for the search box.
+
+Suggestions are names this worker already knows: tracks and artists seen in Spotify results,
+featured playlists, and queries several different people have searched for. They are kept as a sorted array
+of normalized keys, so the suggestions for a prefix are a bisect followed by a short scan. New
+names go to a small sorted buffer that is merged into the array once it fills up, which keeps
+additions cheap without re-sorting everything.
+
+Weights decay with a half-life: every hit adds ``2 ** (age / half-life)`` rather than one, so
+recent popularity outranks old popularity without rescaling stored weights on every hit. Once the age
+reaches ``AUTOCOMPLETE_RENORMALIZE_AFTER`` half-lives, every stored weight is scaled down and the age
+starts again from zero, which keeps the numbers well within float range.
+"""
+
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from pyjams.models import FeaturedPlaylist
+from pyjams.utils import cache as pyjams_cache
+
+SuggestionKind = Literal["track", "artist", "playlist", "query"]
+
+AUTOCOMPLETE_LIMIT = 8
+# New keys are buffered and merged into the sorted array in batches of this size
+AUTOCOMPLETE_MERGE_THRESHOLD = 256
+# Keys kept per worker, the lowest weighted are dropped once this is exceeded
+AUTOCOMPLETE_MAX_KEYS = 100_000
+# Keys matching a prefix that are ranked, very short prefixes stop scanning after this many
+AUTOCOMPLETE_SCAN_LIMIT = 1_000
+AUTOCOMPLETE_HALF_LIFE = 60 * 60 * 24
+# Half-lives after which stored weights are rescaled, a hit is then worth 2 ** 32 times an old one
+AUTOCOMPLETE_RENORMALIZE_AFTER = 32
+# A query is only suggested to others once this many different people have searched for it
+POPULAR_QUERY_MIN_COUNT = 3
+# Queries not yet popular that are remembered per worker, the least recently searched are forgotten
+POPULAR_QUERY_CANDIDATES = 4096
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _SPACES.sub(" ", text.casefold()).strip()
+
+
+@dataclass
+class Suggestion:
+    text: str
+    kind: SuggestionKind
+    weight: float
+
+
+class PrefixIndex:
+    """Sorted-array prefix index with a merge buffer for incremental updates."""
+
+    def __init__(
+        self, merge_threshold: int = AUTOCOMPLETE_MERGE_THRESHOLD, max_keys: int = AUTOCOMPLETE_MAX_KEYS
+    ) -> None:
+        self.merge_threshold = merge_threshold
+        self.max_keys = max_keys
+        self._keys: list[str] = []
+        self._pending: list[str] = []
+        self._suggestions: dict[str, Suggestion] = {}
+        self._epoch = time.time()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._suggestions)
+
+    def __contains__(self, text: str) -> bool:
+        return normalize(text) in self._suggestions
+
+    def _merge(self) -> None:
+        self._keys = list(heapq.merge(self._keys, self._pending))
+        self._pending.clear()
+        if len(self._keys) > self.max_keys:
+            keep = set(heapq.nlargest(self.max_keys, self._keys, key=lambda key: self._suggestions[key].weight))
+            for key in self._keys:
+                if key not in keep:
+                    del self._suggestions[key]
+            self._keys = [key for key in self._keys if key in keep]
+
+    def _recency_weight(self) -> float:
+        """Weight of one hit now, must be called with the lock held."""
+        now = time.time()
+        half_lives = (now - self._epoch) / AUTOCOMPLETE_HALF_LIFE
+        if half_lives >= AUTOCOMPLETE_RENORMALIZE_AFTER:
+            # Move the epoch to now, scaling stored weights so they keep their order
+            scale = 2**-half_lives
+            for suggestion in self._suggestions.values():
+                suggestion.weight *= scale
+            self._epoch, half_lives = now, 0
+        return 2**half_lives
+
+    def add(self, text: str, kind: SuggestionKind, weight: float | None = None, hits: int = 1) -> None:
+        """Add a suggestion, or bump its weight when it is already known.
+
+        Args:
+            weight: Added to the current weight, defaults to the weight of ``hits`` hits now
+            hits: Number of hits to count when no weight is given
+        """
+        key = normalize(text)
+        if not key:
+            return
+        with self._lock:
+            weight = self._recency_weight() * hits if weight is None else weight
+            suggestion = self._suggestions.get(key)
+            if suggestion is not None:
+                suggestion.weight += weight
+                return
+            self._suggestions[key] = Suggestion(text.strip(), kind, weight)
+            insort(self._pending, key)
+            if len(self._pending) >= self.merge_threshold:
+                self._merge()
+
+    def discard(self, text: str, kind: SuggestionKind) -> None:
+        """Drop a suggestion, unless it is known as a different kind too."""
+        key = normalize(text)
+        with self._lock:
+            suggestion = self._suggestions.get(key)
+            if suggestion is None or suggestion.kind != kind:
+                return
+            del self._suggestions[key]
+            for keys in (self._pending, self._keys):
+                position = bisect_left(keys, key)
+                if position < len(keys) and keys[position] == key:
+                    del keys[position]
+                    return
+
+    def _scan(self, keys: list[str], prefix: str) -> list[str]:
+        matches: list[str] = []
+        for key in keys[bisect_left(keys, prefix) :]:
+            if not key.startswith(prefix) or len(matches) == AUTOCOMPLETE_SCAN_LIMIT:
+                break
+            matches.append(key)
+        return matches
+
+    def suggest(self, prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> list[Suggestion]:
+        """Get the highest weighted suggestions starting with ``prefix``."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            keys = self._scan(self._keys, prefix) + self._scan(self._pending, prefix)
+            return heapq.nlargest(limit, (self._suggestions[key] for key in keys), key=lambda s: s.weight)
+
+
+suggestions = PrefixIndex()
+
+_query_searchers: OrderedDict[str, set[str]] = OrderedDict()
+_query_searchers_lock = threading.Lock()
+_featured_names: tuple[int, frozenset[str]] = (0, frozenset())
+_featured_lock = threading.Lock()
+
+
+def record_query(query: str, searcher: str) -> None:
+    """Note a query that went to Spotify, suggesting it once enough different people have searched it.
+
+    Args:
+        searcher: Identifies who searched, repeated searches by one person count once
+    """
+    key = normalize(query)
+    if not key:
+        return
+    if query in suggestions:
+        suggestions.add(query, "query")
+        return
+    with _query_searchers_lock:
+        searchers = _query_searchers.pop(key, set())
+        searchers.add(searcher)
+        if len(searchers) < POPULAR_QUERY_MIN_COUNT:
+            _query_searchers[key] = searchers
+            while len(_query_searchers) > POPULAR_QUERY_CANDIDATES:
+                _query_searchers.popitem(last=False)
+            return
+    suggestions.add(query, "query", hits=len(searchers))
+
+
+def remember_tracks(tracks: list[dict[str, Any]]) -> None:
+    """Suggest the names and artists of tracks seen in Spotify results."""
+    for track in tracks:
+        if track and track.get("name"):
+            suggestions.add(track["name"], "track")
+            for artist in track.get("artists", []):
+                suggestions.add(artist["name"], "artist")
+
+
+def sync_featured_names() -> None:
+    """Bring featured playlist names up to date, adding and dropping only what changed."""
+    global _featured_names
+    generation = pyjams_cache.get_generation(pyjams_cache.FEATURED_NAMESPACE)
+    if _featured_names[0] == generation:
+        return
+    with _featured_lock:
+        known_generation, known = _featured_names
+        if known_generation == generation:
+            return
+        names = frozenset(FeaturedPlaylist.objects.filter(is_active=True).values_list("name", flat=True))
+        for name in known - names:
+            suggestions.discard(name, "playlist")
+        for name in names - known:
+            suggestions.add(name, "playlist")
+        _featured_names = (generation, names)
+
+
+def autocomplete(prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> list[Suggestion]:
+    sync_featured_names()
+    return suggestions.suggest(prefix, limit)
@@ -0,0 +1,63 @@
+"""Work handed to a thread pool once the current transaction commits.
+
+Requests queue follow-up work (indexing, signature updates, imports) here so they can return
+straight away. Each pool is small and lives as long as the web process, so its threads close their
+database connection after every task and log anything a task lets escape.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks:
+    """A named thread pool for work that runs after the current transaction commits.
+
+    Args:
+        name: Used for thread names and log messages
+        workers: Tasks run at once
+    """
+
+    def __init__(self, name: str, workers: int = 1) -> None:
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"pyjams-{name}")
+        # Keys of tasks waiting to start
+        self._queued: set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def _run(self, key: Hashable | None, fn: Callable[..., object], args: tuple[Any, ...]) -> None:
+        if key is not None:
+            # Changes made from here on need another run, so the key may be queued again
+            with self._lock:
+                self._queued.discard(key)
+        try:
+            fn(*args)
+        except Exception as e:
+            subject = f" for {key}" if key is not None else ""
+            logger.error(f"Background {self.name} task {fn.__name__}{subject} failed: {e!s}", exc_info=True)
+        finally:
+            # Pool threads outlive the task, don't leave its database connection open
+            connection.close()
+
+    def run_after_commit(self, fn: Callable[..., object], *args: Any, key: Hashable | None = None) -> None:
+        """Run ``fn(*args)`` in the pool once the current transaction commits.
+
+        Args:
+            key: Skip the task if one with the same key is already waiting to start
+        """
+
+        def submit() -> None:
+            if key is not None:
+                with self._lock:
+                    if key in self._queued:
+                        return
+                    self._queued.add(key)
+            self._executor.submit(self._run, key, fn, args)
+
+        transaction.on_commit(submit)
@@ -0,0 +1,66 @@
+"""Generation-counter based caching helpers.
+
+Cached values are stored under keys that embed a per-namespace generation number. Bumping the
+generation makes every key of that namespace unreachable at once, so invalidation is a single
+atomic ``incr`` that every worker sharing the cache backend observes, without enumerating keys.
+Orphaned entries simply expire on their own timeout.
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+
+T = TypeVar("T")
+
+FEATURED_NAMESPACE = "featured"
+
+
+def _generation_key(namespace: str) -> str:
+    return f"pyjams:generation:{namespace}"
+
+
+def _initial_generation() -> int:
+    # Seed from the clock so a counter that gets evicted never restarts at a value whose keys
+    # may still be sitting in the cache.
+    return int(time.time() * 1000)
+
+
+def get_generation(namespace: str) -> int:
+    """Get the current generation number for a cache namespace."""
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _initial_generation(), timeout=None)
+        generation = cache.get(key, _initial_generation())
+    return int(generation)
+
+
+def bump_generation(namespace: str) -> int:
+    """Invalidate every cached value in a namespace by moving to a new generation."""
+    key = _generation_key(namespace)
+    try:
+        return int(cache.incr(key))
+    except ValueError:
+        # Counter missing (never set or evicted): any fresh seed is newer than what was stored
+        cache.add(key, _initial_generation(), timeout=None)
+        return get_generation(namespace)
+
+
+def invalidate(namespace: str) -> None:
+    """Bump a namespace generation once the current transaction (if any) commits."""
+    transaction.on_commit(lambda: bump_generation(namespace))
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    """Build a generation-scoped cache key."""
+    suffix = ":".join(str(part) for part in parts)
+    return f"pyjams:{namespace}:{get_generation(namespace)}:{suffix}"
+
+
+def get_or_set(namespace: str, key: str, default: Callable[[], T], timeout: Any = DEFAULT_TIMEOUT) -> T:
+    """Return the cached value for ``key`` in ``namespace``, computing it on a miss."""
+    return cache.get_or_set(make_key(namespace, key), default, timeout)
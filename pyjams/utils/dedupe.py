@@ -0,0 +1,112 @@
+"""Finding duplicate tracks in a playlist.
+
+The playlist is read once, a page at a time. Every item is looked up in one hash map per kind of
+key: its track id, and optionally its ISRC (the same recording on another release) and its
+normalized title and artists. The first item seen with a key is kept, later ones join its group as
+duplicates.
+"""
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from spotipy import Spotify
+
+from pyjams.utils.spotify import iter_playlist_items
+
+DuplicateReason = Literal["track", "isrc", "title"]
+
+_LOOSENESS: dict[DuplicateReason, int] = {"track": 0, "isrc": 1, "title": 2}
+
+DEDUPE_ITEM_FIELDS = "items(track(id,uri,name,is_local,external_ids(isrc),artists(name))),next"
+
+# Trailing "(feat. ...)", "[Remastered]", " - 2011 Remaster" and the like
+_TITLE_SUFFIX = re.compile(r"\s*(\(.*?\)|\[.*?\]|\s-\s.*)$")
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+@dataclass
+class DuplicateItem:
+    position: int
+    uri: str
+    name: str
+    artists: list[str]
+
+
+@dataclass
+class DuplicateGroup:
+    """Occurrences of one track. The first is kept, the rest are the duplicates."""
+
+    reason: DuplicateReason
+    items: list[DuplicateItem] = field(default_factory=list)
+
+    @property
+    def keep(self) -> DuplicateItem:
+        return self.items[0]
+
+    @property
+    def duplicates(self) -> list[DuplicateItem]:
+        return self.items[1:]
+
+
+def normalize_title(name: str, artists: Iterable[str]) -> str:
+    """Reduce a title and its artists to a key that ignores case, punctuation and version suffixes."""
+    title = name
+    while (stripped := _TITLE_SUFFIX.sub("", title)) != title and stripped:
+        title = stripped
+    words = [_NON_WORD.sub(" ", part.casefold()).strip() for part in (title, *sorted(artists))]
+    return "|".join(words)
+
+
+def find_duplicates(
+    items: Iterable[dict[str, Any]], by_isrc: bool = False, by_title: bool = False
+) -> list[DuplicateGroup]:
+    """Group duplicate playlist items in a single pass.
+
+    Args:
+        items: Playlist items in playlist order
+        by_isrc: Also treat tracks sharing an ISRC as duplicates
+        by_title: Also treat tracks with the same normalized title and artists as duplicates
+
+    Returns:
+        Groups with at least one duplicate, in order of their first occurrence
+    """
+    groups: list[DuplicateGroup] = []
+    seen: dict[tuple[DuplicateReason, str], int] = {}
+    for position, item in enumerate(items):
+        track = item.get("track")
+        # Local files have no id and can't be removed by URI reliably
+        if not track or not track.get("id") or track.get("is_local"):
+            continue
+        artists = [artist["name"] for artist in track.get("artists", [])]
+        keys: list[tuple[DuplicateReason, str]] = [("track", track["id"])]
+        isrc = (track.get("external_ids") or {}).get("isrc")
+        if by_isrc and isrc:
+            keys.append(("isrc", isrc.upper()))
+        if by_title and track.get("name"):
+            keys.append(("title", normalize_title(track["name"], artists)))
+
+        entry = DuplicateItem(position=position, uri=track["uri"], name=track.get("name", ""), artists=artists)
+        match = next((key for key in keys if key in seen), None)
+        if match is None:
+            index = len(groups)
+            groups.append(DuplicateGroup(reason="track", items=[entry]))
+        else:
+            index = seen[match]
+            group = groups[index]
+            group.items.append(entry)
+            # A group is only as exact as the loosest key that joined it
+            if _LOOSENESS[match[0]] > _LOOSENESS[group.reason]:
+                group.reason = match[0]
+        for key in keys:
+            seen.setdefault(key, index)
+    return [group for group in groups if len(group.items) > 1]
+
+
+def scan_playlist(
+    spotify: Spotify, playlist_id: str, by_isrc: bool = False, by_title: bool = False
+) -> list[DuplicateGroup]:
+    """Find the duplicate tracks of a playlist, reading it one page at a time."""
+    items = iter_playlist_items(spotify, playlist_id, fields=DEDUPE_ITEM_FIELDS)
+    return find_duplicates(items, by_isrc=by_isrc, by_title=by_title)
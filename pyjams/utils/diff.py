@@ -0,0 +1,194 @@
+"""Diff two playlist track sequences into the operations Spotify's playlist API understands.
+
+The longest common subsequence of the current and target sequences stays where it is. Every other
+current track is either surplus (removed) or out of place (moved next to its new neighbour). Target
+tracks left over after that are inserted. Removals, moves and inserts are then grouped into runs, so
+a resync costs one request per contiguous change rather than one per track.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict, deque
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from itertools import count
+
+# Spotify accepts at most this many tracks per playlist write
+BATCH_LIMIT = 100
+
+
+@dataclass(frozen=True)
+class PlaylistDiff:
+    # Positions in the current sequence to drop, ascending
+    removals: list[int] = field(default_factory=list)
+    # Target position -> current position, for tracks that stay in place relative to each other
+    kept: dict[int, int] = field(default_factory=dict)
+    # Target position -> current position, for tracks that have to move
+    moved: dict[int, int] = field(default_factory=dict)
+    # Target positions with no counterpart in the current sequence
+    inserted: list[int] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.removals or self.moved or self.inserted)
+
+
+@dataclass(frozen=True)
+class Remove:
+    # (uri, position) pairs, highest position first so earlier removals never shift later ones
+    positions: list[tuple[str, int]]
+
+
+@dataclass(frozen=True)
+class Move:
+    range_start: int
+    range_length: int
+    insert_before: int
+
+
+@dataclass(frozen=True)
+class Insert:
+    uris: list[str]
+    position: int
+
+
+Operation = Remove | Move | Insert
+# A pair of the common subsequence, linked to the pair before it
+_Chain = tuple[int, int, "_Chain | None"]
+
+
+def longest_common_subsequence(a: Sequence[str | None], b: Sequence[str]) -> list[tuple[int, int]]:
+    """Find a longest common subsequence as ``(index in a, index in b)`` pairs.
+
+    Uses the Hunt-Szymanski reduction to a longest increasing subsequence over matching positions,
+    which runs in ``O((n + r) log n)`` for ``r`` matching pairs. Playlists rarely repeat a track, so
+    ``r`` stays close to ``n``. ``None`` entries in ``a`` never match.
+    """
+    positions: dict[str, list[int]] = defaultdict(list)
+    for j, value in enumerate(b):
+        positions[value].append(j)
+
+    # tails[k] is the smallest b index ending a common subsequence of length k + 1, and nodes[k]
+    # the chain of pairs that achieves it
+    tails: list[int] = []
+    nodes: list[_Chain] = []
+    for i, uri in enumerate(a):
+        if uri is None:
+            continue
+        # Walk matches right to left so one element of a can't extend its own chain
+        for j in reversed(positions.get(uri, ())):
+            k = bisect_left(tails, j)
+            node = (i, j, nodes[k - 1] if k else None)
+            if k == len(tails):
+                tails.append(j)
+                nodes.append(node)
+            else:
+                tails[k] = j
+                nodes[k] = node
+
+    pairs: list[tuple[int, int]] = []
+    chain = nodes[-1] if nodes else None
+    while chain is not None:
+        pairs.append((chain[0], chain[1]))
+        chain = chain[2]
+    pairs.reverse()
+    return pairs
+
+
+def diff_tracks(current: Sequence[str | None], target: Sequence[str]) -> PlaylistDiff:
+    """Classify every position of both sequences as kept, moved, removed or inserted.
+
+    ``None`` marks an unavailable item in the current playlist. It can't be addressed by URI, so it
+    is left where it is.
+    """
+    kept = {j: i for i, j in longest_common_subsequence(current, target)}
+    kept_current = set(kept.values())
+
+    spare: dict[str, deque[int]] = defaultdict(deque)
+    for i, uri in enumerate(current):
+        if uri is not None and i not in kept_current:
+            spare[uri].append(i)
+
+    moved: dict[int, int] = {}
+    inserted: list[int] = []
+    for j, uri in enumerate(target):
+        if j in kept:
+            continue
+        if spare[uri]:
+            moved[j] = spare[uri].popleft()
+        else:
+            inserted.append(j)
+
+    removals = sorted(i for indexes in spare.values() for i in indexes)
+    return PlaylistDiff(removals=removals, kept=kept, moved=moved, inserted=inserted)
+
+
+def plan_removals(
+    current: Sequence[str | None], positions: Iterable[int], batch_size: int = BATCH_LIMIT
+) -> list[Remove]:
+    """Batch positional removals, highest positions first so no batch shifts the next one."""
+    ordered = sorted(set(positions))
+    return [
+        Remove([(current[i], i) for i in reversed(ordered[max(0, start - batch_size) : start])])
+        for start in range(len(ordered), 0, -batch_size)
+    ]
+
+
+def plan_sync(current: Sequence[str | None], target: Sequence[str], batch_size: int = BATCH_LIMIT) -> list[Operation]:
+    """Turn ``current`` into ``target`` with as few batched operations as possible.
+
+    Positions in each operation refer to the playlist as left by the operations before it, matching
+    how Spotify applies consecutive writes.
+    """
+    diff = diff_tracks(current, target)
+    operations: list[Operation] = []
+
+    operations.extend(plan_removals(current, diff.removals, batch_size))
+
+    # Simulate the playlist as tokens: current positions for existing items, negative ids for inserts
+    removed = set(diff.removals)
+    state = [i for i in range(len(current)) if i not in removed]
+    token_for = {**diff.kept, **diff.moved}
+    inserted = set(diff.inserted)
+    new_tokens = count(-1, -1)
+
+    def after(token: int | None) -> int:
+        return state.index(token) + 1 if token is not None else 0
+
+    # Invariant: the target tracks placed so far sit in target order ahead of every kept track
+    # still to come, so each moved or inserted run only has to land right after its predecessor
+    previous: int | None = None
+    j = 0
+    while j < len(target):
+        if j in inserted:
+            run = j
+            while run < len(target) and run in inserted and run - j < batch_size:
+                run += 1
+            position = after(previous)
+            tokens = [next(new_tokens) for _ in range(run - j)]
+            state[position:position] = tokens
+            operations.append(Insert(list(target[j:run]), position))
+            previous = tokens[-1]
+            j = run
+        elif j in diff.moved:
+            source = state.index(token_for[j])
+            length = 1
+            while (
+                j + length in diff.moved
+                and source + length < len(state)
+                and state[source + length] == token_for[j + length]
+            ):
+                length += 1
+            destination = after(previous)
+            if destination != source:
+                block = state[source : source + length]
+                del state[source : source + length]
+                at = destination if destination < source else destination - length
+                state[at:at] = block
+                operations.append(Move(source, length, destination))
+            previous = token_for[j + length - 1]
+            j += length
+        else:
+            previous = token_for[j]
+            j += 1
+
+    return operations
@@ -34,3 +34,21 @@ def spotify_error_handler(view_func: ViewFunc) -> Callable[..., HttpResponse]:
             return redirect("pyjams:index")
 
     return wrapper
+
+
+def accepts_encoding(request: HttpRequest, coding: str) -> bool:
+    """Whether the client's ``Accept-Encoding`` allows a content coding, honouring ``q=0`` and ``*``."""
+    qualities = {}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        name, *params = (piece.strip() for piece in part.split(";"))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name.lower()] = quality
+    return qualities.get(coding, qualities.get("*", 0.0)) > 0
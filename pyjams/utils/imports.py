@@ -0,0 +1,261 @@
+"""Background bulk imports of tracks into a playlist.
+
+An uploaded file is copied to disk and handed to a small thread pool, so the request that started
+the import returns straight away. The file is then read one line at a time, ISRCs are resolved
+through Spotify search (cached, since the same recording turns up in many imports), tracks already
+in the playlist are skipped and the rest are added ``SPOTIFY_BATCH_LIMIT`` at a time, through the
+playlist's write lock so they don't interleave with other edits. Progress is saved on the job after
+every batch.
+
+Jobs only live as long as the web process running them. One that has stopped saving progress was cut
+off by a restart, and is marked failed on startup or when it is next polled.
+"""
+
+import codecs
+import csv
+import json
+import logging
+import re
+import tempfile
+from collections.abc import Iterable, Iterator
+from datetime import timedelta
+from itertools import chain
+from typing import IO, Literal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import UploadedFile
+from django.db.models import QuerySet
+from django.utils import timezone
+from spotipy import Spotify
+
+from pyjams.models import ImportJob
+from pyjams.utils.artists import schedule_artist_index_for
+from pyjams.utils.background import BackgroundTasks
+from pyjams.utils.mutations import playlist_writes
+from pyjams.utils.spotify import SPOTIFY_BATCH_LIMIT, get_playlist_track_uris
+from pyjams.utils.tracks import (
+    adjust_playlist_stats,
+    cache_tracks,
+    get_cached_tracks,
+    normalize_track_uri,
+    track_id_from_uri,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows that can't be parsed, or name something that can't be a track, are passed on as "invalid" to
+# be counted as failed
+ValueKind = Literal["uri", "isrc", "invalid"]
+
+# Imports are network bound, two at a time keeps a single web worker responsive
+IMPORT_WORKERS = 2
+ISRC_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Misses are cached for less time, the recording may show up on Spotify later
+ISRC_MISS_CACHE_TIMEOUT = 60 * 60
+# Running jobs save progress at least every SPOTIFY_BATCH_LIMIT rows
+IMPORT_STALE_AFTER = timedelta(minutes=10)
+
+URI_COLUMNS = ("track_uri", "uri", "track_id", "id", "url")
+ISRC_COLUMNS = ("isrc",)
+# Also matched at the end of a header name, e.g. "spotify_uri" or "Track URL". Not "id", which
+# would pick up columns like "album_id".
+SUFFIX_COLUMNS = ("uri", "url", "isrc")
+ISRC_PATTERN = re.compile(r"^[A-Z]{2}[A-Z0-9]{3}\d{7}$")
+TRACK_ID_PATTERN = re.compile(r"^[0-9A-Za-z]{22}$")
+
+_tasks = BackgroundTasks("import", workers=IMPORT_WORKERS)
+
+
+def _track_uri(value: str) -> tuple[ValueKind, str]:
+    """A track URI for a URI, link or id, or "invalid" when it can't name a Spotify track."""
+    value = value.strip()
+    if TRACK_ID_PATTERN.match(track_id_from_uri(value)):
+        return "uri", normalize_track_uri(value)
+    return "invalid", value
+
+
+def _isrc(value: str) -> tuple[ValueKind, str]:
+    isrc = value.strip().upper().replace("-", "")
+    return ("isrc", isrc) if ISRC_PATTERN.match(isrc) else ("invalid", value)
+
+
+def _classify(value: str) -> tuple[ValueKind, str] | None:
+    value = value.strip()
+    if not value:
+        return None
+    if ISRC_PATTERN.match(value.upper().replace("-", "")):
+        return "isrc", value.upper().replace("-", "")
+    return _track_uri(value)
+
+
+def _column_name(header: str) -> str:
+    return re.sub(r"[\s-]+", "_", header.strip().lower())
+
+
+def _find_column(fields: dict[str, str], columns: tuple[str, ...]) -> str | None:
+    for column in columns:
+        if fields.get(column):
+            return fields[column]
+    for column in columns:
+        if column in SUFFIX_COLUMNS:
+            for name, value in fields.items():
+                if name.endswith(f"_{column}") and value:
+                    return value
+    return None
+
+
+def _is_header(line: str) -> bool:
+    names = [_column_name(name) for name in next(csv.reader([line]), [])]
+    return any(
+        name == column or (column in SUFFIX_COLUMNS and name.endswith(f"_{column}"))
+        for name in names
+        for column in (*URI_COLUMNS, *ISRC_COLUMNS)
+    )
+
+
+def _from_record(record: dict[str, str]) -> tuple[ValueKind, str] | None:
+    fields = {_column_name(key): value for key, value in record.items() if key and value}
+    if isrc := _find_column(fields, ISRC_COLUMNS):
+        return _isrc(isrc)
+    if uri := _find_column(fields, URI_COLUMNS):
+        return _track_uri(uri)
+    return None
+
+
+def _from_json(line: str) -> tuple[ValueKind, str] | None:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return "invalid", line
+    if not isinstance(record, dict):
+        return "invalid", line
+    return _from_record({key: value for key, value in record.items() if isinstance(value, str)})
+
+
+def iter_import_values(lines: Iterable[str]) -> Iterator[tuple[ValueKind, str] | None]:
+    """Parse an import file line by line.
+
+    Accepts JSON Lines objects, CSV (or a single column) with a header naming a URI or ISRC column,
+    or one track URI, link, id or ISRC per line. Yields None for rows that carry nothing usable, and
+    an ``"invalid"`` value for rows that don't parse or can't name a track.
+
+    Raises:
+        ValueError: If the file has a CSV header without a URI or ISRC column
+    """
+    lines = iter(lines)
+    first = next(lines, "")
+    stripped = first.strip()
+    if stripped.startswith("{"):
+        for line in chain([first], lines):
+            yield _from_json(line) if line.strip() else None
+    elif _is_header(stripped):
+        for record in csv.DictReader(chain([first], lines)):
+            yield _from_record(record)
+    elif "," in stripped:
+        raise ValueError(f"No track URI or ISRC column in the header: {stripped}")
+    else:
+        for line in chain([first], lines):
+            yield _classify(line)
+
+
+def resolve_isrc(spotify: Spotify, isrc: str) -> str | None:
+    """Find the Spotify track URI for an ISRC, remembering the answer."""
+    key = f"pyjams:isrc:{isrc}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached or None
+    tracks = spotify.search(q=f"isrc:{isrc}", type="track", limit=1)["tracks"]["items"]
+    if not tracks:
+        cache.set(key, "", ISRC_MISS_CACHE_TIMEOUT)
+        return None
+    cache_tracks(tracks)
+    cache.set(key, tracks[0]["uri"], ISRC_CACHE_TIMEOUT)
+    return tracks[0]["uri"]
+
+
+def run_import(job: ImportJob, spotify: Spotify, source: IO[bytes]) -> None:
+    """Import every track listed in ``source`` into the job's playlist."""
+    job.status = "running"
+    job.save(update_fields=["status", "updated_at"])
+    progress = ["rows", "added", "skipped", "unresolved", "failed", "snapshot_id", "updated_at"]
+
+    job.snapshot_id, current = get_playlist_track_uris(spotify, job.playlist_id)
+    seen = set(current)
+    pending: list[str] = []
+
+    def flush() -> None:
+        if pending:
+            with playlist_writes.exclusive(job.playlist_id):
+                job.snapshot_id = spotify.playlist_add_items(job.playlist_id, pending)["snapshot_id"]
+            job.added += len(pending)
+            known = get_cached_tracks([track_id_from_uri(uri) for uri in pending])
+            duration = sum(track["duration_ms"] for track in known.values())
+            adjust_playlist_stats(job.playlist_id, job.snapshot_id, len(pending), duration)
+            pending.clear()
+        job.save(update_fields=progress)
+
+    # Spreadsheet exports are often Latin-1. Ids and ISRCs are ASCII, so replacing what doesn't decode
+    # only changes names and titles
+    lines = codecs.iterdecode(source, "utf-8-sig", errors="replace")
+    for parsed in iter_import_values(lines):
+        job.rows += 1
+        uri = None
+        if parsed is not None:
+            kind, value = parsed
+            if kind == "invalid":
+                job.failed += 1
+                continue
+            uri = resolve_isrc(spotify, value) if kind == "isrc" else value
+        if uri is None:
+            job.unresolved += 1
+        elif uri in seen:
+            job.skipped += 1
+        else:
+            seen.add(uri)
+            pending.append(uri)
+            if len(pending) == SPOTIFY_BATCH_LIMIT:
+                flush()
+                continue
+        # Show progress through long runs of rows that add nothing, so the job doesn't look stale
+        if job.rows % SPOTIFY_BATCH_LIMIT == 0:
+            job.save(update_fields=progress)
+    flush()
+    if job.added:
+        schedule_artist_index_for(spotify, job.playlist_id)
+
+
+def _run_in_background(job_id: int, spotify: Spotify, source: IO[bytes]) -> None:
+    job = ImportJob.objects.get(pk=job_id)
+    try:
+        run_import(job, spotify, source)
+        job.status = "done"
+    except Exception as e:
+        logger.error(f"Import {job_id} failed: {e!s}", exc_info=True)
+        job.status, job.error = "failed", str(e)
+    finally:
+        source.close()
+        job.finished_at = timezone.now()
+        job.save()
+
+
+def fail_stale_imports(jobs: QuerySet[ImportJob] | None = None) -> int:
+    """Mark imports that stopped saving progress as failed, returning how many there were."""
+    jobs = ImportJob.objects.all() if jobs is None else jobs
+    now = timezone.now()
+    return jobs.filter(status__in=("pending", "running"), updated_at__lt=now - IMPORT_STALE_AFTER).update(
+        status="failed", error="The import was interrupted by a server restart", finished_at=now
+    )
+
+
+def start_import(job: ImportJob, spotify: Spotify, upload: UploadedFile) -> None:
+    """Queue an import job.
+
+    The upload is copied to a temporary file first, since Django removes uploaded files once the
+    request finishes.
+    """
+    # Closed by the background task once it has read the file
+    spool = tempfile.TemporaryFile()  # noqa: SIM115
+    for chunk in upload.chunks():
+        spool.write(chunk)
+    spool.seek(0)
+    _tasks.run_after_commit(_run_in_background, job.pk, spotify, spool)
@@ -0,0 +1,194 @@
+"""Searchable index of a user's whole Spotify playlist library.
+
+The library is fetched once, every page in parallel, and kept in the shared cache as a compact list
+of entries. Each worker builds a token index from those entries the first time it needs it, so a
+search is a couple of dictionary and bisect lookups rather than Spotify calls. A refresh first reads
+only the first page: when the total and the snapshot ids on it are unchanged the cached library is
+kept, otherwise the library is fetched again. Changes further down can't be seen from the first page,
+so a library older than ``LIBRARY_MAX_AGE`` is always fetched again on refresh.
+"""
+
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypedDict
+
+from django.core.cache import cache
+from spotipy import Spotify
+
+# Spotify's maximum page size for the current user's playlists
+LIBRARY_PAGE_SIZE = 50
+LIBRARY_FETCH_WORKERS = 4
+LIBRARY_CACHE_TIMEOUT = 60 * 10
+# Refreshes keep the cached library alive, this bounds how long it can miss changes beyond page one
+LIBRARY_MAX_AGE = 60 * 30
+LIBRARY_SEARCH_LIMIT = 20
+# Built indexes kept per worker, least recently used are dropped first
+LIBRARY_INDEXES_PER_WORKER = 64
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class LibraryEntry(TypedDict):
+    id: str
+    name: str
+    description: str
+    image_url: str | None
+    tracks_total: int
+    owner: str
+    is_public: bool
+    snapshot_id: str
+
+
+class Library(TypedDict):
+    # Changes whenever the library is fetched again
+    version: str
+    # When the whole library was last fetched
+    fetched_at: float
+    total: int
+    entries: list[LibraryEntry]
+
+
+def _entry(playlist: dict[str, Any]) -> LibraryEntry:
+    return {
+        "id": playlist["id"],
+        "name": playlist["name"],
+        "description": playlist.get("description") or "",
+        "image_url": playlist["images"][0]["url"] if playlist.get("images") else None,
+        "tracks_total": playlist["tracks"]["total"],
+        "owner": playlist["owner"]["display_name"],
+        "is_public": bool(playlist.get("public")),
+        "snapshot_id": playlist["snapshot_id"],
+    }
+
+
+def fetch_library(spotify: Spotify, first_page: dict[str, Any] | None = None) -> Library:
+    """Fetch every playlist of the current user, requesting the remaining pages concurrently."""
+    first_page = first_page or spotify.current_user_playlists(limit=LIBRARY_PAGE_SIZE)
+    total = first_page["total"]
+    offsets = range(LIBRARY_PAGE_SIZE, total, LIBRARY_PAGE_SIZE)
+    with ThreadPoolExecutor(max_workers=LIBRARY_FETCH_WORKERS) as executor:
+        pages = executor.map(
+            lambda offset: spotify.current_user_playlists(limit=LIBRARY_PAGE_SIZE, offset=offset), offsets
+        )
+        items = [*first_page["items"], *(item for page in pages for item in page["items"])]
+    return {
+        "version": uuid.uuid4().hex,
+        "fetched_at": time.time(),
+        "total": total,
+        "entries": [_entry(item) for item in items if item],
+    }
+
+
+class LibraryIndex:
+    """Prefix search over the words of playlist names and descriptions."""
+
+    def __init__(self, entries: list[LibraryEntry]) -> None:
+        self.entries = entries
+        postings: dict[str, set[int]] = {}
+        self._name_postings: dict[str, set[int]] = {}
+        for position, entry in enumerate(entries):
+            for token in _TOKEN.findall(entry["name"].lower()):
+                postings.setdefault(token, set()).add(position)
+                self._name_postings.setdefault(token, set()).add(position)
+            for token in _TOKEN.findall(entry["description"].lower()):
+                postings.setdefault(token, set()).add(position)
+        self._postings = postings
+        self._tokens = sorted(postings)
+
+    def _matching(self, prefix: str, postings: dict[str, set[int]]) -> set[int]:
+        matches: set[int] = set()
+        start = bisect_left(self._tokens, prefix)
+        for token in self._tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= postings.get(token, set())
+        return matches
+
+    def search(self, query: str, limit: int | None = LIBRARY_SEARCH_LIMIT) -> list[LibraryEntry]:
+        """Find playlists where every word of ``query`` starts a word of the name or description.
+
+        Name matches come first, otherwise library order is kept.
+        """
+        terms = _TOKEN.findall(query.lower())
+        if not terms:
+            return []
+        hits = set.intersection(*(self._matching(term, self._postings) for term in terms))
+        in_name = set.intersection(*(self._matching(term, self._name_postings) for term in terms))
+        ranked = sorted(hits, key=lambda position: (position not in in_name, position))
+        return [self.entries[position] for position in ranked[:limit]]
+
+
+_indexes: OrderedDict[tuple[str, str], LibraryIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _cache_key(user_id: str) -> str:
+    return f"pyjams:library:{user_id}"
+
+
+def _version_key(user_id: str) -> str:
+    return f"pyjams:library_version:{user_id}"
+
+
+def _store(user_id: str, library: Library) -> None:
+    cache.set_many({_cache_key(user_id): library, _version_key(user_id): library["version"]}, LIBRARY_CACHE_TIMEOUT)
+
+
+def _cached_index(user_id: str, version: str) -> LibraryIndex | None:
+    with _indexes_lock:
+        index = _indexes.get((user_id, version))
+        if index is not None:
+            _indexes.move_to_end((user_id, version))
+        return index
+
+
+def _build_index(user_id: str, library: Library) -> LibraryIndex:
+    index = _cached_index(user_id, library["version"])
+    if index is None:
+        index = LibraryIndex(library["entries"])
+        with _indexes_lock:
+            _indexes[(user_id, library["version"])] = index
+            while len(_indexes) > LIBRARY_INDEXES_PER_WORKER:
+                _indexes.popitem(last=False)
+    return index
+
+
+def get_library_version(user_id: str) -> str | None:
+    """Version of the user's cached library, None when nothing is cached."""
+    return cache.get(_version_key(user_id))
+
+
+def get_library_index(spotify: Spotify, user_id: str, refresh: bool = False) -> LibraryIndex:
+    """Get the search index of a user's playlist library, fetching the library when needed.
+
+    Args:
+        spotify: Client of the user
+        user_id: Spotify id of the user
+        refresh: Check Spotify for changes even when a cached library exists
+    """
+    if not refresh:
+        # Only the small version key is read when this worker already indexed the current library
+        version = get_library_version(user_id)
+        index = _cached_index(user_id, version) if version else None
+        if index is not None:
+            return index
+
+    library: Library | None = cache.get(_cache_key(user_id))
+    if library is None:
+        library = fetch_library(spotify)
+        _store(user_id, library)
+    elif refresh:
+        first_page = spotify.current_user_playlists(limit=LIBRARY_PAGE_SIZE)
+        cached = {entry["id"]: entry["snapshot_id"] for entry in library["entries"][:LIBRARY_PAGE_SIZE]}
+        current = {item["id"]: item["snapshot_id"] for item in first_page["items"] if item}
+        expired = time.time() - library.get("fetched_at", 0) > LIBRARY_MAX_AGE
+        if expired or first_page["total"] != library["total"] or cached != current:
+            library = fetch_library(spotify, first_page)
+        # Either way the library is known to be current again
+        _store(user_id, library)
+    return _build_index(user_id, library)
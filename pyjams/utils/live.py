@@ -0,0 +1,310 @@
+"""Live playlist change feeds, served as Server-Sent Events.
+
+Every viewer of a playlist subscribes to that playlist's feed. One background loop per process
+watches the playlists that have subscribers: it asks Spotify for each snapshot id every
+``LIVE_POLL_INTERVAL`` seconds and only reads the track list when the snapshot has changed. Each
+change is diffed against the previous track list once, then fanned out to every subscriber.
+
+Writes made through this app are announced straight away, from the ``playlist_synced`` signal.
+Gunicorn may run several worker processes and a viewer's stream lives in only one of them, so
+announcements also go to the shared cache. Every loop checks it each ``LIVE_SHARED_INTERVAL``
+seconds and passes on versions written by other workers.
+
+A stream holds one of the worker's threads while it is open. Streams are capped at the
+``LIVE_MAX_STREAMS`` setting, well below gunicorn's ``threads``, and closed after
+``LIVE_STREAM_SECONDS``. Viewers over the cap poll the playlist version instead. Browsers reconnect
+with the id of the last event they saw, and the last ``LIVE_REPLAY`` events of each feed are
+replayed to them.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from queue import Empty, SimpleQueue
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from spotipy import Spotify
+
+from pyjams.utils.spotify import get_playlist_track_uris
+
+logger = logging.getLogger(__name__)
+
+LIVE_POLL_INTERVAL = 5.0
+# Seconds between checks of the shared cache for writes made by other workers
+LIVE_SHARED_INTERVAL = 1.0
+# Announced writes stay in the shared cache until every worker has checked Spotify since
+LIVE_SHARED_SECONDS = 2 * LIVE_POLL_INTERVAL
+LIVE_STREAM_SECONDS = 60
+LIVE_HEARTBEAT_SECONDS = 15
+# How long a browser waits before reconnecting, in milliseconds
+LIVE_RETRY_MS = 3000
+# Events kept per feed for reconnecting browsers
+LIVE_REPLAY = 50
+# Feeds without subscribers are kept this long, so a reconnecting browser can still catch up
+LIVE_IDLE_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    id: int
+    event: str
+    data: dict[str, Any]
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.event}\ndata: {json.dumps(self.data)}\n\n"
+
+
+@dataclass
+class PlaylistFeed:
+    spotify: Spotify
+    snapshot_id: str
+    # None until the track list has been read once
+    uris: list[str | None] | None = None
+    subscribers: set[SimpleQueue[LiveEvent]] = field(default_factory=set)
+    recent: deque[LiveEvent] = field(default_factory=lambda: deque(maxlen=LIVE_REPLAY))
+    last_event_id: int = 0
+    next_poll: float = 0.0
+    idle_since: float | None = None
+    # Last version announced in the shared cache that this feed has seen
+    shared_snapshot_id: str = ""
+
+
+@dataclass
+class Subscription:
+    playlist_id: str
+    queue: SimpleQueue[LiveEvent]
+    # Events missed since the browser's last event id
+    replay: list[LiveEvent]
+
+
+def _changes(previous: list[str | None], current: list[str | None]) -> tuple[list[str], list[str]]:
+    """Track URIs added and removed between two versions, counting repeated tracks."""
+    before = Counter(uri for uri in previous if uri)
+    after = Counter(uri for uri in current if uri)
+    return list((after - before).elements()), list((before - after).elements())
+
+
+def _shared_key(playlist_id: str) -> str:
+    return f"pyjams:live:{playlist_id}"
+
+
+class LiveBroker:
+    """In-process pub/sub of playlist changes, fed by a single change detection loop.
+
+    Args:
+        fetch: Returns a playlist's snapshot id and track URIs, should be cheap when unchanged
+        poll_interval: Seconds between checks of each watched playlist. None to only check on
+            ``poll()``, without a background loop.
+        max_streams: Subscribers allowed at once, the ``LIVE_MAX_STREAMS`` setting by default
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Spotify, str], tuple[str, list[str | None]]] = get_playlist_track_uris,
+        poll_interval: float | None = LIVE_POLL_INTERVAL,
+        max_streams: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._fetch = fetch
+        self.poll_interval = poll_interval
+        self.max_streams = max_streams
+        self._clock = clock
+        self._feeds: dict[str, PlaylistFeed] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def stream_count(self) -> int:
+        with self._lock:
+            return sum(len(feed.subscribers) for feed in self._feeds.values())
+
+    def subscribe(
+        self, playlist_id: str, spotify: Spotify, snapshot_id: str = "", last_event_id: str | None = None
+    ) -> Subscription | None:
+        """Start receiving a playlist's changes. None when too many streams are already open.
+
+        Args:
+            spotify: Client the loop may use to watch the playlist
+            snapshot_id: Version the subscriber is showing, changes after it will be announced
+            last_event_id: Id of the last event a reconnecting subscriber received
+        """
+        max_streams = settings.LIVE_MAX_STREAMS if self.max_streams is None else self.max_streams
+        queue: SimpleQueue[LiveEvent] = SimpleQueue()
+        shared = cache.get(_shared_key(playlist_id))
+        with self._lock:
+            if sum(len(feed.subscribers) for feed in self._feeds.values()) >= max_streams:
+                return None
+            feed = self._feeds.get(playlist_id)
+            if feed is None:
+                # Versions announced before the feed existed are left to the Spotify check
+                feed = self._feeds[playlist_id] = PlaylistFeed(
+                    spotify=spotify, snapshot_id=snapshot_id, shared_snapshot_id=shared["snapshot_id"] if shared else ""
+                )
+            # The newest client has the freshest token
+            feed.spotify = spotify
+            feed.subscribers.add(queue)
+            feed.idle_since = None
+            replay = []
+            if last_event_id and last_event_id.isdigit():
+                replay = [event for event in feed.recent if event.id > int(last_event_id)]
+            self._ensure_loop()
+        return Subscription(playlist_id, queue, replay)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            feed = self._feeds.get(subscription.playlist_id)
+            if feed is not None:
+                feed.subscribers.discard(subscription.queue)
+                if not feed.subscribers:
+                    feed.idle_since = self._clock()
+
+    def _emit(self, feed: PlaylistFeed, event: str, data: dict[str, Any]) -> None:
+        feed.last_event_id += 1
+        message = LiveEvent(feed.last_event_id, event, data)
+        feed.recent.append(message)
+        for queue in feed.subscribers:
+            queue.put(message)
+
+    def publish(
+        self,
+        playlist_id: str,
+        snapshot_id: str,
+        uris: list[str | None],
+        previous_uris: list[str | None] | None = None,
+    ) -> bool:
+        """Announce a new version of a playlist to its subscribers.
+
+        Args:
+            previous_uris: Tracks before the change, when the feed hasn't seen the previous version
+
+        Returns:
+            Whether anything was announced, False for unwatched playlists and known versions
+        """
+        with self._lock:
+            feed = self._feeds.get(playlist_id)
+            if feed is None:
+                return False
+            # Nothing to compare against yet, or nothing new: only remember the tracks
+            if not feed.snapshot_id or feed.snapshot_id == snapshot_id:
+                feed.snapshot_id = snapshot_id
+                feed.uris = list(uris)
+                return False
+            before = feed.uris if feed.uris is not None else previous_uris
+            if before is not None:
+                added, removed = _changes(before, uris)
+                if added:
+                    self._emit(feed, "added", {"uris": added})
+                if removed:
+                    self._emit(feed, "removed", {"uris": removed})
+            self._emit(
+                feed,
+                "snapshot",
+                {"snapshot_id": snapshot_id, "previous": feed.snapshot_id, "track_count": len(uris)},
+            )
+            feed.snapshot_id = snapshot_id
+            feed.uris = list(uris)
+            return True
+
+    def announce(
+        self, playlist_id: str, snapshot_id: str, uris: list[str | None], previous_uris: list[str | None]
+    ) -> None:
+        """Publish a write made in this process, here and to the loops of the other workers."""
+        cache.set(
+            _shared_key(playlist_id),
+            {"snapshot_id": snapshot_id, "uris": list(uris), "previous_uris": list(previous_uris)},
+            LIVE_SHARED_SECONDS,
+        )
+        with self._lock:
+            feed = self._feeds.get(playlist_id)
+            if feed is not None:
+                feed.shared_snapshot_id = snapshot_id
+        self.publish(playlist_id, snapshot_id, uris, previous_uris)
+
+    def _check_shared(self) -> None:
+        """Publish the versions other workers have announced for the watched playlists."""
+        with self._lock:
+            watched = [playlist_id for playlist_id, feed in self._feeds.items() if feed.subscribers]
+        if not watched:
+            return
+        found = cache.get_many([_shared_key(playlist_id) for playlist_id in watched])
+        for playlist_id in watched:
+            shared = found.get(_shared_key(playlist_id))
+            if shared is None:
+                continue
+            with self._lock:
+                feed = self._feeds.get(playlist_id)
+                if feed is None or feed.shared_snapshot_id == shared["snapshot_id"]:
+                    continue
+                feed.shared_snapshot_id = shared["snapshot_id"]
+            self.publish(playlist_id, shared["snapshot_id"], shared["uris"], shared["previous_uris"])
+
+    def poll(self) -> None:
+        """Check every watched playlist that is due, and drop feeds that have been idle too long."""
+        self._check_shared()
+        now = self._clock()
+        with self._lock:
+            for playlist_id, feed in list(self._feeds.items()):
+                if feed.idle_since is not None and now - feed.idle_since > LIVE_IDLE_SECONDS:
+                    del self._feeds[playlist_id]
+            due = [
+                (playlist_id, feed.spotify)
+                for playlist_id, feed in self._feeds.items()
+                if feed.subscribers and feed.next_poll <= now
+            ]
+            for playlist_id, _ in due:
+                self._feeds[playlist_id].next_poll = now + (self.poll_interval or 0)
+        # Spotify is asked outside the lock, so subscribers never wait on it
+        for playlist_id, spotify in due:
+            try:
+                snapshot_id, uris = self._fetch(spotify, playlist_id)
+            except Exception as e:
+                logger.warning(f"Checking playlist {playlist_id} for changes failed: {e!s}")
+                continue
+            self.publish(playlist_id, snapshot_id, uris)
+
+    def _run(self) -> None:
+        while True:
+            self.poll()
+            with self._lock:
+                if not self._feeds:
+                    self._thread = None
+                    return
+            # Spotify is only asked once a feed is due, in between only the shared cache is read
+            self._wakeup.wait(LIVE_SHARED_INTERVAL)
+            self._wakeup.clear()
+
+    def _ensure_loop(self) -> None:
+        # Called with the lock held
+        if self.poll_interval is None:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="pyjams-live", daemon=True)
+            self._thread.start()
+        else:
+            self._wakeup.set()
+
+    def stream(self, subscription: Subscription, duration: float = LIVE_STREAM_SECONDS) -> Iterator[str]:
+        """Yield Server-Sent Events for a subscription until ``duration`` has passed."""
+        deadline = self._clock() + duration
+        try:
+            yield f"retry: {LIVE_RETRY_MS}\n\n"
+            for event in subscription.replay:
+                yield event.encode()
+            while (remaining := deadline - self._clock()) > 0:
+                try:
+                    yield subscription.queue.get(timeout=min(remaining, LIVE_HEARTBEAT_SECONDS)).encode()
+                except Empty:
+                    # Comments keep proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+
+live_broker = LiveBroker()
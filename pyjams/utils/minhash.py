@@ -0,0 +1,59 @@
+"""MinHash signatures and LSH banding for finding similar playlists.
+
+A playlist's track set is summarised as ``MINHASH_PERMUTATIONS`` minimum hash values. The share of
+positions two signatures agree on estimates the Jaccard similarity of the two track sets. The
+signature is cut into ``LSH_BANDS`` bands; playlists sharing any whole band are candidates, which
+finds playlists above roughly ``(1 / LSH_BANDS) ** (1 / LSH_ROWS)`` similarity (about 0.42) with high
+probability while only ever comparing against a handful of candidates.
+"""
+
+import hashlib
+from collections.abc import Iterable
+
+import numpy as np
+
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+
+def _stable_hash(value: bytes) -> int:
+    # The builtin hash() of str and bytes is salted per process
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+# Each permutation is a multiply-add-shift hash: (a * x + b) mod 2**64 keeping the top 32 bits, with
+# odd a. uint64 arithmetic wraps, so numpy computes it directly. Signatures are stored, so the
+# parameters are derived deterministically rather than drawn from a random generator.
+_A = np.array([_stable_hash(f"a{i}".encode()) | 1 for i in range(MINHASH_PERMUTATIONS)], dtype=np.uint64)
+_B = np.array([_stable_hash(f"b{i}".encode()) for i in range(MINHASH_PERMUTATIONS)], dtype=np.uint64)
+
+
+def signature(items: Iterable[str]) -> np.ndarray | None:
+    """Get the MinHash signature of a set of ids. None for an empty set, which is similar to nothing."""
+    hashed = np.fromiter({_stable_hash(item.encode()) for item in items}, dtype=np.uint64)
+    if not hashed.size:
+        return None
+    # One row per permutation, one column per item
+    with np.errstate(over="ignore"):
+        values = (np.outer(_A, hashed) + _B[:, None]) >> np.uint64(32)
+    return values.min(axis=1)
+
+
+def to_bytes(sig: np.ndarray) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4").astype(np.uint64)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the sets behind two signatures."""
+    return float(np.count_nonzero(a == b)) / MINHASH_PERMUTATIONS
+
+
+def band_buckets(sig: np.ndarray) -> list[int]:
+    """Bucket of every band of a signature, as signed 63 bit integers for database storage."""
+    bands = sig.astype("<u4").reshape(LSH_BANDS, LSH_ROWS)
+    return [_stable_hash(band.tobytes()) >> 1 for band in bands]
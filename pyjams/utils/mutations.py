@@ -0,0 +1,230 @@
+"""Per-playlist write coalescing.
+
+Managers editing the same playlist at once would otherwise each make their own Spotify call, racing
+each other for ordering. Writes are instead queued per playlist: the first caller to arrive waits a
+short window, drains everything queued behind it and applies the lot as a few batched calls, in the
+order the writes were submitted. Every caller gets back the outcome of its own item.
+
+The queue is per process, so with several gunicorn workers each one coalesces only the writes it
+serves, and writes from different workers can still interleave. Removals are made against the last
+snapshot this process wrote, and a conflict with another worker's write is retried once against the
+current snapshot.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Literal
+
+from spotipy import Spotify
+from spotipy.exceptions import SpotifyException
+
+from pyjams.utils.spotify import SPOTIFY_BATCH_LIMIT, chunked
+
+MutationKind = Literal["add", "remove"]
+
+# How long the first writer waits for others to join its batch, and how long a writer waits for
+# its batch to be applied before giving up
+COALESCE_WINDOW = 0.05
+RESULT_TIMEOUT = 30
+# Spotify answers a removal against a stale snapshot with one of these
+SNAPSHOT_CONFLICT_STATUSES = frozenset({400, 409, 412})
+
+
+@dataclass
+class MutationResult:
+    ok: bool
+    snapshot_id: str | None = None
+    error: str | None = None
+    # Number of queued writes applied together with this one
+    batch_size: int = 1
+    # An add dropped because a later write in its batch removed the track again; the rest of the
+    # result is the removal's
+    superseded: bool = False
+
+
+@dataclass
+class Mutation:
+    kind: MutationKind
+    uri: str
+    spotify: Spotify
+    owner: str
+    future: Future[MutationResult] = field(default_factory=Future)
+    superseded: bool = False
+
+
+class _Turns:
+    """Exclusive access to a playlist, granted in the order tickets were taken.
+
+    A plain lock wakes its waiters in any order, which could apply a later batch before an earlier
+    one.
+    """
+
+    def __init__(self) -> None:
+        self._changed = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+
+    def take(self) -> int:
+        with self._changed:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            return ticket
+
+    @contextmanager
+    def hold(self, ticket: int) -> Iterator[None]:
+        with self._changed:
+            self._changed.wait_for(lambda: self._serving == ticket)
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._serving += 1
+                self._changed.notify_all()
+
+
+class PlaylistWriteQueue:
+    """Coalesce concurrent adds and removes on the same playlist into batched Spotify calls."""
+
+    def __init__(self, window: float = COALESCE_WINDOW, sleep: Callable[[float], None] = time.sleep) -> None:
+        self.window = window
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._pending: dict[str, list[Mutation]] = {}
+        self._turns: dict[str, _Turns] = {}
+        self._snapshots: dict[str, str] = {}
+
+    def submit(self, spotify: Spotify, playlist_id: str, kind: MutationKind, uri: str, owner: str) -> MutationResult:
+        """Queue a write and block until the batch containing it has been applied.
+
+        Args:
+            spotify: Client of the user making the write
+            playlist_id: Playlist to change
+            kind: ``"add"`` to append the track, ``"remove"`` to remove all its occurrences
+            uri: Track URI
+            owner: Identifies the user, writes are only merged with others from the same user
+
+        Returns:
+            The outcome for this write
+        """
+        mutation = Mutation(kind, uri, spotify, owner)
+        with self._lock:
+            queue = self._pending.get(playlist_id)
+            leader = queue is None
+            if queue is None:
+                queue = self._pending[playlist_id] = []
+            queue.append(mutation)
+
+        if leader:
+            self._sleep(self.window)
+            with self._lock:
+                batch = self._pending.pop(playlist_id)
+                ticket = self._turns.setdefault(playlist_id, _Turns()).take()
+            # Batches for one playlist are applied one at a time, in the order they were closed
+            with self._turns[playlist_id].hold(ticket):
+                self._flush(playlist_id, batch)
+
+        return mutation.future.result(timeout=RESULT_TIMEOUT)
+
+    @contextmanager
+    def exclusive(self, playlist_id: str) -> Iterator[None]:
+        """Hold off queued writes to a playlist while the caller changes it some other way."""
+        with self._lock:
+            turns = self._turns.setdefault(playlist_id, _Turns())
+            ticket = turns.take()
+        with turns.hold(ticket):
+            try:
+                yield
+            finally:
+                # Whatever the caller did, the snapshot we last wrote is no longer current
+                self._snapshots.pop(playlist_id, None)
+
+    def _flush(self, playlist_id: str, batch: list[Mutation]) -> None:
+        try:
+            for run in self._merge(batch):
+                self._apply(playlist_id, run, len(batch))
+        except Exception as e:
+            # Never leave a waiting request hanging, whatever went wrong
+            for mutation in batch:
+                if not mutation.future.done():
+                    mutation.future.set_result(MutationResult(ok=False, error=str(e), batch_size=len(batch)))
+
+    @staticmethod
+    def _merge(batch: list[Mutation]) -> list[list[Mutation]]:
+        """Split a batch into runs that can each be sent as one kind of call.
+
+        An add that is followed by a removal of the same track is dropped, since removing all
+        occurrences erases it anyway. It is resolved along with the removal, marked as superseded.
+        """
+        runs: list[list[Mutation]] = []
+        removed_later: set[str] = set()
+        kept: list[Mutation] = []
+        for mutation in reversed(batch):
+            if mutation.kind == "remove":
+                removed_later.add(mutation.uri)
+            elif mutation.uri in removed_later:
+                continue
+            kept.append(mutation)
+        kept.reverse()
+
+        for mutation in kept:
+            last = runs[-1][0] if runs else None
+            if last and last.kind == mutation.kind and last.owner == mutation.owner:
+                runs[-1].append(mutation)
+            else:
+                runs.append([mutation])
+
+        # Hand dropped adds to the removal that superseded them
+        kept_ids = {id(m) for m in kept}
+        for mutation in (m for m in batch if id(m) not in kept_ids):
+            for run in runs:
+                if run[0].kind == "remove" and any(m.uri == mutation.uri for m in run):
+                    mutation.superseded = True
+                    run.append(mutation)
+                    break
+        return runs
+
+    def _apply(self, playlist_id: str, run: list[Mutation], batch_size: int) -> None:
+        spotify = run[0].spotify
+        writes = [m for m in run if m.kind == run[0].kind]
+        try:
+            if run[0].kind == "add":
+                for chunk in chunked([m.uri for m in writes], SPOTIFY_BATCH_LIMIT):
+                    self._snapshots[playlist_id] = spotify.playlist_add_items(playlist_id, chunk)["snapshot_id"]
+            else:
+                uris = list(dict.fromkeys(m.uri for m in writes))
+                for chunk in chunked(uris, SPOTIFY_BATCH_LIMIT):
+                    self._remove(spotify, playlist_id, chunk)
+        except SpotifyException as e:
+            self._resolve(run, MutationResult(ok=False, error=str(e), batch_size=batch_size))
+            return
+        self._resolve(run, MutationResult(ok=True, snapshot_id=self._snapshots[playlist_id], batch_size=batch_size))
+
+    def _remove(self, spotify: Spotify, playlist_id: str, uris: list[str]) -> None:
+        """Remove tracks against the last snapshot we wrote, refreshing it once on conflict."""
+        snapshot_id = self._snapshots.get(playlist_id) or self._current_snapshot(spotify, playlist_id)
+        try:
+            result = spotify.playlist_remove_all_occurrences_of_items(playlist_id, uris, snapshot_id=snapshot_id)
+        except SpotifyException as e:
+            if e.http_status not in SNAPSHOT_CONFLICT_STATUSES:
+                raise
+            # Someone else changed the playlist since our last write
+            snapshot_id = self._current_snapshot(spotify, playlist_id)
+            result = spotify.playlist_remove_all_occurrences_of_items(playlist_id, uris, snapshot_id=snapshot_id)
+        self._snapshots[playlist_id] = result["snapshot_id"]
+
+    def _current_snapshot(self, spotify: Spotify, playlist_id: str) -> str:
+        snapshot_id = spotify.playlist(playlist_id, fields="snapshot_id")["snapshot_id"]
+        self._snapshots[playlist_id] = snapshot_id
+        return snapshot_id
+
+    @staticmethod
+    def _resolve(run: list[Mutation], result: MutationResult) -> None:
+        for mutation in run:
+            mutation.future.set_result(replace(result, superseded=True) if mutation.superseded else result)
+
+
+playlist_writes = PlaylistWriteQueue()
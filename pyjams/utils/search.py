@@ -0,0 +1,68 @@
+"""Full-text search over featured playlist names and descriptions.
+
+Production runs Postgres, where a GIN index over a weighted ``tsvector`` expression answers the
+search. Local development runs SQLite, where an FTS5 table kept in step by triggers does the same
+job. Both are created by migration ``0011``; the queries below repeat the indexed expression
+verbatim, since Postgres only uses an expression index for an identical expression.
+"""
+
+import re
+
+from django.db import connection
+
+FTS_TABLE = "pyjams_featuredplaylist_fts"
+# Name matches count for more than description matches
+PG_SEARCH_VECTOR = (
+    "(setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B'))"
+)
+FTS5_WEIGHTS = (10.0, 3.0)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query: str) -> list[str]:
+    """Split a user query into plain word tokens, dropping any search operators."""
+    return _TOKEN.findall(query.lower())
+
+
+def _has_fts_table() -> bool:
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def rank_featured(query: str, limit: int, offset: int = 0) -> list[tuple[int, float]] | None:
+    """Find active featured playlists matching every word of ``query``, best match first.
+
+    Every word also matches as a prefix, so results appear while the user is still typing.
+
+    Returns:
+        ``(id, rank)`` pairs, higher rank is better. None when the database has no full-text index,
+        in which case callers fall back to a plain substring filter.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            tsquery = " & ".join(f"{term}:*" for term in terms)
+            cursor.execute(
+                f"SELECT id, ts_rank({PG_SEARCH_VECTOR}, q) AS rank "
+                "FROM pyjams_featuredplaylist, to_tsquery('english', %s) q "
+                f"WHERE is_active AND {PG_SEARCH_VECTOR} @@ q "
+                "ORDER BY rank DESC, featured_date DESC, id DESC LIMIT %s OFFSET %s",
+                [tsquery, limit, offset],
+            )
+        elif connection.vendor == "sqlite" and _has_fts_table():
+            match = " ".join(f'"{term}"*' for term in terms)
+            # bm25 scores are lower for better matches, negate so both backends rank the same way
+            cursor.execute(
+                f"SELECT p.id, -bm25({FTS_TABLE}, %s, %s) AS rank "
+                f"FROM {FTS_TABLE} JOIN pyjams_featuredplaylist p ON p.id = {FTS_TABLE}.rowid "
+                f"WHERE {FTS_TABLE} MATCH %s AND p.is_active "
+                "ORDER BY rank DESC, p.featured_date DESC, p.id DESC LIMIT %s OFFSET %s",
+                [*FTS5_WEIGHTS, match, limit, offset],
+            )
+        else:
+            return None
+        return [(row_id, float(rank)) for row_id, rank in cursor.fetchall()]
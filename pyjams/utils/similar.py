@@ -0,0 +1,44 @@
+"""Keeping featured playlist MinHash signatures current.
+
+The sync engine updates a signature from the track list it has just written. Anything else that
+changes a playlist (edits in Spotify, single track adds) is noticed when the playlist page shows a
+newer snapshot than the stored signature, and the signature is recomputed in the background.
+"""
+
+from spotipy import Spotify
+
+from pyjams.models import FeaturedPlaylist, PlaylistSignature
+from pyjams.utils.background import BackgroundTasks
+from pyjams.utils.spotify import get_playlist_track_uris
+from pyjams.utils.tracks import track_id_from_uri
+
+SIMILAR_PLAYLISTS_LIMIT = 5
+
+# Repeated page views of a playlist with an update waiting don't queue the same work again
+_tasks = BackgroundTasks("signatures")
+
+
+def update_signature(spotify: Spotify, playlist: FeaturedPlaylist) -> bool:
+    """Recompute a playlist's signature if its snapshot has changed."""
+    snapshot_id, uris = get_playlist_track_uris(spotify, playlist.spotify_id)
+    return PlaylistSignature.update_for(playlist, snapshot_id, [track_id_from_uri(uri) for uri in uris if uri])
+
+
+def _update_in_background(spotify: Spotify, featured_id: int) -> None:
+    playlist = FeaturedPlaylist.objects.filter(pk=featured_id).first()
+    if playlist is not None:
+        update_signature(spotify, playlist)
+
+
+def schedule_signature_update(spotify: Spotify, playlist: FeaturedPlaylist) -> None:
+    """Queue a signature update, once the current transaction commits."""
+    _tasks.run_after_commit(_update_in_background, spotify, playlist.pk, key=playlist.pk)
+
+
+def get_similar_playlists(
+    spotify: Spotify, playlist: FeaturedPlaylist, snapshot_id: str, limit: int = SIMILAR_PLAYLISTS_LIMIT
+) -> list[tuple[FeaturedPlaylist, float]]:
+    """Featured playlists similar to ``playlist``, queueing a signature update when it is out of date."""
+    if not PlaylistSignature.objects.filter(playlist=playlist, snapshot_id=snapshot_id).exists():
+        schedule_signature_update(spotify, playlist)
+    return PlaylistSignature.similar_to(playlist, limit)
@@ -0,0 +1,109 @@
+"""Binary encoding of playlist track lists for snapshot history.
+
+Tracks are stored as interned integer ids rather than 22 character Spotify ids. A keyframe is the
+full list as little-endian ``uint32`` values, zlib compressed. Every other snapshot is a delta against
+the one before it: a varint stream of copy (a run of the previous list) and literal (new ids) ops.
+A typical edit of a large playlist encodes to a handful of bytes.
+"""
+
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+
+_COPY = 0
+_LITERAL = 1
+
+
+def encode_keyframe(ids: Sequence[int]) -> bytes:
+    """Encode a full track list."""
+    values = array("I", ids)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return zlib.compress(values.tobytes())
+
+
+def decode_keyframe(data: bytes) -> list[int]:
+    values = array("I")
+    values.frombytes(zlib.decompress(data))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode_delta(previous: Sequence[int], ids: Sequence[int]) -> bytes:
+    """Encode ``ids`` as copy and literal ops against ``previous``.
+
+    Matching is greedy: a copy run is extended while the next id follows on in ``previous``,
+    otherwise a new run starts at the first occurrence of the id. That finds every untouched,
+    moved or re-added block in one pass without a full sequence alignment.
+    """
+    first_position: dict[int, int] = {}
+    for position, track_id in enumerate(previous):
+        first_position.setdefault(track_id, position)
+
+    out = bytearray()
+    literals: list[int] = []
+    run_start = run_length = 0
+
+    def flush() -> None:
+        nonlocal run_length
+        if run_length:
+            _write_varint(out, run_length << 1 | _COPY)
+            _write_varint(out, run_start)
+            run_length = 0
+        if literals:
+            _write_varint(out, len(literals) << 1 | _LITERAL)
+            for value in literals:
+                _write_varint(out, value)
+            literals.clear()
+
+    for track_id in ids:
+        following = run_start + run_length
+        if run_length and following < len(previous) and previous[following] == track_id:
+            run_length += 1
+            continue
+        start = first_position.get(track_id)
+        if start is None:
+            if run_length:
+                flush()
+            literals.append(track_id)
+        else:
+            flush()
+            run_start, run_length = start, 1
+    flush()
+    return bytes(out)
+
+
+def decode_delta(previous: Sequence[int], data: bytes) -> list[int]:
+    ids: list[int] = []
+    offset = 0
+    while offset < len(data):
+        header, offset = _read_varint(data, offset)
+        length = header >> 1
+        if header & 1 == _COPY:
+            start, offset = _read_varint(data, offset)
+            ids.extend(previous[start : start + length])
+        else:
+            for _ in range(length):
+                value, offset = _read_varint(data, offset)
+                ids.append(value)
+    return ids
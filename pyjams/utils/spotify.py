@@ -1,6 +1,9 @@
+import threading
 import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
-from typing import Any, cast
+from typing import Any, TypeVar, cast
 
 import spotipy
 from django.conf import settings
@@ -8,14 +11,25 @@ from django.contrib.auth import authenticate, get_user_model, login
 from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth.models import AbstractUser
 from django.contrib.sessions.backends.base import SessionBase
+from django.core.cache import cache
 from django.http import HttpRequest
 from spotipy import Spotify
+from spotipy.exceptions import SpotifyException
 from spotipy.oauth2 import SpotifyOAuth
 
 # Define User type properly for type checking
 _UserModel = get_user_model()
 User = cast(type[AbstractUser], _UserModel)
 
+T = TypeVar("T")
+
+# Spotify accepts at most this many items per playlist write and returns at most this many per page
+SPOTIFY_BATCH_LIMIT = 100
+# Track URI lists are keyed by snapshot id, so they never go stale
+TRACK_URIS_CACHE_TIMEOUT = 60 * 60
+# Background clients refresh their token this many seconds before it runs out
+TOKEN_REFRESH_MARGIN = 60
+
 
 class SpotifyAuthenticationBackend(BaseBackend):
     def authenticate(
@@ -219,6 +233,35 @@ def get_spotify(session: SessionBase | None) -> spotipy.Spotify:
         raise TokenError(f"Failed to initialize Spotify client: {e!s}", should_logout=True)
 
 
+class BackgroundTokenManager:
+    """Spotipy auth manager that refreshes a copy of the session's token whenever it runs out."""
+
+    def __init__(self, token_info: dict[str, Any]) -> None:
+        self.token_info = dict(token_info)
+        self._lock = threading.Lock()
+
+    def get_access_token(self, as_dict: bool = False) -> str:
+        with self._lock:
+            expires_at = int(self.token_info.get("expires_at") or 0)
+            if expires_at - TOKEN_REFRESH_MARGIN < time.time():
+                refresh_token = self.token_info.get("refresh_token")
+                if not refresh_token:
+                    raise TokenError("No refresh token available")
+                # Spotify may not send a new refresh token, keep the old one then
+                self.token_info = {**self.token_info, **get_spotify_auth().refresh_access_token(refresh_token)}
+            return self.token_info["access_token"]
+
+
+def get_background_spotify(session: SessionBase) -> spotipy.Spotify:
+    """Get a Spotify client for work that outlives the request.
+
+    The client from `get_spotify` holds a fixed access token, which may expire before a long
+    running task is done. This one refreshes it as needed, without touching the session.
+    """
+    token_info = SpotifySessionManager(session).get_token()
+    return spotipy.Spotify(auth_manager=BackgroundTokenManager(token_info))
+
+
 def get_playlist_info(spotify: Spotify, playlist_id: str) -> tuple[dict, dict]:  # type: ignore
     """Get playlist and its tracks.
 
@@ -234,6 +277,98 @@ def get_playlist_info(spotify: Spotify, playlist_id: str) -> tuple[dict, dict]:
     return playlist, tracks
 
 
+def chunked(items: Sequence[T], size: int = SPOTIFY_BATCH_LIMIT) -> Iterator[list[T]]:
+    """Split a sequence into consecutive lists of at most ``size`` items."""
+    for start in range(0, len(items), size):
+        yield list(items[start : start + size])
+
+
+def iter_playlist_items(
+    spotify: Spotify,
+    playlist_id: str,
+    fields: str | None = None,
+    offset: int = 0,
+    page_size: int = SPOTIFY_BATCH_LIMIT,
+) -> Iterator[dict[str, Any]]:
+    """Yield playlist items page by page, starting at ``offset``.
+
+    Only one page is held at a time, so callers can stream arbitrarily large playlists.
+    """
+    while True:
+        page = spotify.playlist_items(playlist_id, fields=fields, limit=page_size, offset=offset)
+        items = page["items"]
+        yield from items
+        offset += len(items)
+        if not items or not page.get("next"):
+            return
+
+
+def get_playlist_track_uris(spotify: Spotify, playlist_id: str) -> tuple[str, list[str | None]]:
+    """Get a playlist's snapshot id and the URI at every position.
+
+    Positions holding unavailable items (e.g. removed episodes) are None. The list is cached
+    per snapshot, so repeated reads of an unchanged playlist cost a single small request.
+    """
+    snapshot_id = spotify.playlist(playlist_id, fields="snapshot_id")["snapshot_id"]
+    key = f"pyjams:track_uris:{playlist_id}:{snapshot_id}"
+    uris = cache.get(key)
+    if uris is None:
+        uris = [
+            item["track"]["uri"] if item.get("track") else None
+            for item in iter_playlist_items(spotify, playlist_id, fields="items(track(uri)),next")
+        ]
+        cache.set(key, uris, TRACK_URIS_CACHE_TIMEOUT)
+    return snapshot_id, uris
+
+
+@dataclass
+class BatchAddResult:
+    snapshot_id: str | None = None
+    added: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    requests: int = 0
+    error: str | None = None
+
+
+def add_tracks_in_batches(
+    spotify: Spotify, playlist_id: str, uris: Sequence[str], skip_existing: bool = True
+) -> BatchAddResult:
+    """Append tracks to a playlist in as few requests as Spotify allows.
+
+    URIs are de-duplicated (and, with ``skip_existing``, checked against the current snapshot)
+    before being submitted in order, ``SPOTIFY_BATCH_LIMIT`` at a time. Submission stops at the
+    first failed batch so the tracks that do land keep their relative order.
+    """
+    result = BatchAddResult()
+    existing: set[str | None] = set()
+    if skip_existing:
+        result.snapshot_id, current = get_playlist_track_uris(spotify, playlist_id)
+        existing = set(current)
+
+    pending: list[str] = []
+    seen: set[str] = set()
+    for uri in uris:
+        if uri in existing or uri in seen:
+            result.skipped.append(uri)
+            continue
+        seen.add(uri)
+        pending.append(uri)
+
+    for batch in chunked(pending):
+        result.requests += 1
+        try:
+            response = spotify.playlist_add_items(playlist_id, batch)
+        except SpotifyException as e:
+            result.failed = pending[len(result.added) :]
+            result.error = str(e)
+            break
+        result.snapshot_id = response["snapshot_id"]
+        result.added.extend(batch)
+
+    return result
+
+
 def refresh_token_if_expired(request: HttpRequest) -> None:
     """Refresh the Spotify token if expired.
 
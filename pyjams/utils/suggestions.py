@@ -0,0 +1,374 @@
+"""Track suggestion queues with buffered voting.
+
+Voting is the hot path: everyone looking at a popular playlist can click at once. A vote only
+touches memory. It moves the suggestion in the in-process ranking straight away, and is queued in
+a buffer keyed by (suggestion, user) so repeated clicks by one person collapse into their last
+value. The buffer is written by ``SuggestionVote.apply`` in batches, once enough votes are
+pending or shortly after the first one, so the database sees a few statements per batch instead
+of a row lock per click. The scores recounted by each write are copied back into the rankings.
+
+The pending suggestions of each featured playlist are kept as a list sorted by (-score, id),
+loaded once and then kept in step with every vote, so serving a ranked page is a slice.
+
+Every gunicorn worker keeps its own buffer and rankings. Each write of votes, new suggestion or
+review bumps a per-playlist generation in the shared cache, and a worker that finds its ranking of
+a playlist behind that generation loads it again from the database.
+"""
+
+import atexit
+import logging
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from django.db import connection, transaction
+
+from pyjams.models import FeaturedPlaylist, SuggestionVote, TrackSuggestion, User
+from pyjams.utils import cache as pyjams_cache
+
+logger = logging.getLogger(__name__)
+
+# Votes are written once this many are pending, or this many seconds after the first one
+VOTE_FLUSH_SIZE = 500
+VOTE_FLUSH_INTERVAL = 2.0
+# Playlists whose ranked queue is kept in memory, the least recently used are reloaded on demand
+QUEUE_CACHE_SIZE = 256
+VOTE_VALUES = (-1, 0, 1)
+
+
+@dataclass
+class QueuedSuggestion:
+    id: int
+    track_uri: str
+    track_name: str
+    artists: str
+    suggested_by: str
+    score: int
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, suggestion: TrackSuggestion) -> "QueuedSuggestion":
+        return cls(
+            id=suggestion.pk,
+            track_uri=suggestion.track_uri,
+            track_name=suggestion.track_name,
+            artists=suggestion.artists,
+            suggested_by=suggestion.suggested_by.display_name,
+            score=suggestion.score,
+            created_at=suggestion.created_at,
+        )
+
+
+class RankedQueue:
+    """Suggestions sorted by score, highest first, oldest first among equal scores."""
+
+    def __init__(self, suggestions: Iterable[QueuedSuggestion] = (), generation: int = 0) -> None:
+        self._items = {suggestion.id: suggestion for suggestion in suggestions}
+        self._order = sorted(self._rank(suggestion) for suggestion in self._items.values())
+        self._lock = threading.Lock()
+        # Shared cache generation of the playlist this queue was loaded at
+        self.generation = generation
+
+    @staticmethod
+    def _rank(suggestion: QueuedSuggestion) -> tuple[int, int]:
+        return (-suggestion.score, suggestion.id)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, suggestion_id: object) -> bool:
+        return suggestion_id in self._items
+
+    def _remove(self, suggestion_id: int) -> QueuedSuggestion | None:
+        suggestion = self._items.pop(suggestion_id, None)
+        if suggestion is not None:
+            del self._order[bisect_left(self._order, self._rank(suggestion))]
+        return suggestion
+
+    def add(self, suggestion: QueuedSuggestion) -> None:
+        with self._lock:
+            self._remove(suggestion.id)
+            self._items[suggestion.id] = suggestion
+            insort(self._order, self._rank(suggestion))
+
+    def remove(self, suggestion_id: int) -> QueuedSuggestion | None:
+        with self._lock:
+            return self._remove(suggestion_id)
+
+    def adjust(self, suggestion_id: int, delta: int) -> int | None:
+        """Move a suggestion by ``delta`` votes, returning its new score. None if it isn't queued."""
+        with self._lock:
+            suggestion = self._items.get(suggestion_id)
+            if suggestion is None:
+                return None
+            if delta:
+                del self._order[bisect_left(self._order, self._rank(suggestion))]
+                suggestion.score += delta
+                insort(self._order, self._rank(suggestion))
+            return suggestion.score
+
+    def set_score(self, suggestion_id: int, score: int) -> None:
+        with self._lock:
+            suggestion = self._items.get(suggestion_id)
+            if suggestion is not None:
+                del self._order[bisect_left(self._order, self._rank(suggestion))]
+                suggestion.score = score
+                insort(self._order, self._rank(suggestion))
+
+    def page(self, offset: int, limit: int) -> list[QueuedSuggestion]:
+        with self._lock:
+            return [self._items[suggestion_id] for _, suggestion_id in self._order[offset : offset + limit]]
+
+
+class VoteBuffer:
+    """Collects votes in memory and writes them in batches.
+
+    Args:
+        write: Writes a batch of ``(suggestion_id, user_id) -> value`` votes, returning the new
+            score of every suggestion it touched
+        flush_size: Pending votes that trigger an immediate write
+        flush_interval: Seconds after the first pending vote before a background write. None to
+            only write on ``flush()`` or when ``flush_size`` is reached.
+        settle: Receives the written scores of suggestions with no votes still pending
+    """
+
+    def __init__(
+        self,
+        write: Callable[[dict[tuple[int, int], int]], dict[int, int]] | None = None,
+        flush_size: int = VOTE_FLUSH_SIZE,
+        flush_interval: float | None = VOTE_FLUSH_INTERVAL,
+        settle: Callable[[dict[int, int]], Any] | None = None,
+    ) -> None:
+        self._write = write or _write_votes
+        self._settle = settle or _settle_scores
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending: dict[tuple[int, int], int] = {}
+        # The batch being written, still the latest word on those votes until the write finishes
+        self._writing: dict[tuple[int, int], int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def get(self, suggestion_id: int, user_id: int) -> int | None:
+        """The buffered vote of a user, None when everything they voted is already written."""
+        key = (suggestion_id, user_id)
+        with self._lock:
+            return self._pending.get(key, self._writing.get(key))
+
+    def add(
+        self, suggestion_id: int, user_id: int, value: int, stored: int = 0, queue: RankedQueue | None = None
+    ) -> int | None:
+        """Buffer a vote and move the suggestion in ``queue`` by the change it makes.
+
+        The change is from the user's buffered vote, or ``stored`` when none is buffered. Reading
+        the previous vote, buffering the new one and moving the suggestion happen under one lock, so
+        concurrent clicks and flushes never see half of it.
+
+        Returns:
+            The suggestion's new score in ``queue``, None without a queue or if it isn't queued
+        """
+        key = (suggestion_id, user_id)
+        with self._lock:
+            previous = self._pending.get(key, self._writing.get(key, stored))
+            self._pending[key] = value
+            score = queue.adjust(suggestion_id, value - previous) if queue is not None else None
+            full = len(self._pending) >= self.flush_size
+            if not full and self._timer is None and self.flush_interval is not None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return score
+
+    def flush(self) -> None:
+        """Write every pending vote. Votes that fail to write stay pending for the next flush."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._writing, self._pending = self._pending, {}
+            if not self._writing:
+                return
+            try:
+                scores = self._write(self._writing)
+            except Exception as e:
+                logger.error(f"Writing {len(self._writing)} suggestion votes failed: {e!s}", exc_info=True)
+                with self._lock:
+                    self._pending = {**self._writing, **self._pending}
+            else:
+                with self._lock:
+                    # Votes that came in during the write have moved rankings past these scores
+                    pending = {suggestion_id for suggestion_id, _ in self._pending}
+                    self._settle({key: score for key, score in scores.items() if key not in pending})
+            finally:
+                with self._lock:
+                    self._writing = {}
+
+    def _flush_in_background(self) -> None:
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+
+_queues: OrderedDict[int, RankedQueue] = OrderedDict()
+_queues_lock = threading.Lock()
+
+
+def _namespace(playlist_id: int) -> str:
+    return f"suggestions:{playlist_id}"
+
+
+def _loaded_queue(playlist_id: int) -> RankedQueue | None:
+    with _queues_lock:
+        return _queues.get(playlist_id)
+
+
+def _queue_changed(playlist_id: int) -> None:
+    """Tell other workers their ranking of a playlist is out of date.
+
+    This worker's ranking keeps up with the new generation only when nobody else changed the
+    playlist in between, otherwise it is reloaded too.
+    """
+    queue = _loaded_queue(playlist_id)
+    generation = pyjams_cache.bump_generation(_namespace(playlist_id))
+    if queue is not None and generation == queue.generation + 1:
+        queue.generation = generation
+
+
+def _write_votes(batch: dict[tuple[int, int], int]) -> dict[int, int]:
+    scores = SuggestionVote.apply(batch)
+    playlist_ids = TrackSuggestion.objects.filter(pk__in=scores).values_list("playlist_id", flat=True).distinct()
+    for playlist_id in playlist_ids:
+        _queue_changed(playlist_id)
+    return scores
+
+
+def _settle_scores(scores: dict[int, int]) -> None:
+    """Put recounted scores into the loaded rankings, correcting any drift."""
+    with _queues_lock:
+        queues = list(_queues.values())
+    for queue in queues:
+        for suggestion_id, score in scores.items():
+            queue.set_score(suggestion_id, score)
+
+
+votes = VoteBuffer()
+atexit.register(votes.flush)
+
+
+def _load_queue(playlist_id: int) -> RankedQueue:
+    # Buffered votes aren't in the stored scores yet
+    votes.flush()
+    generation = pyjams_cache.get_generation(_namespace(playlist_id))
+    pending = TrackSuggestion.objects.filter(playlist_id=playlist_id, status="pending").select_related("suggested_by")
+    return RankedQueue((QueuedSuggestion.from_model(suggestion) for suggestion in pending), generation)
+
+
+def get_queue(playlist_id: int) -> RankedQueue:
+    """Ranked pending suggestions of a featured playlist, loaded from the database when this worker
+    has none or another worker has changed them since."""
+    generation = pyjams_cache.get_generation(_namespace(playlist_id))
+    with _queues_lock:
+        queue = _queues.get(playlist_id)
+        if queue is not None and queue.generation >= generation:
+            _queues.move_to_end(playlist_id)
+            return queue
+    queue = _load_queue(playlist_id)
+    with _queues_lock:
+        current = _queues.get(playlist_id)
+        if current is None or current.generation < queue.generation:
+            _queues[playlist_id] = current = queue
+        _queues.move_to_end(playlist_id)
+        while len(_queues) > QUEUE_CACHE_SIZE:
+            _queues.popitem(last=False)
+    return current
+
+
+def suggest_track(playlist: FeaturedPlaylist, user: User, track: dict[str, Any]) -> TrackSuggestion:
+    """Propose a track for a playlist.
+
+    Raises:
+        IntegrityError: If the track has already been suggested for the playlist
+    """
+    suggestion = TrackSuggestion.objects.create(
+        playlist=playlist,
+        track_uri=track["uri"],
+        track_name=track.get("name", ""),
+        artists=", ".join(artist["name"] for artist in track.get("artists", [])),
+        suggested_by=user,
+    )
+    queued = QueuedSuggestion.from_model(suggestion)
+
+    def publish() -> None:
+        queue = _loaded_queue(playlist.pk)
+        if queue is not None:
+            queue.add(queued)
+        _queue_changed(playlist.pk)
+
+    transaction.on_commit(publish)
+    return suggestion
+
+
+def cast_vote(suggestion: TrackSuggestion, user_id: int, value: int) -> int | None:
+    """Vote on a pending suggestion. 1 is for, -1 against, 0 takes a vote back.
+
+    Returns:
+        The suggestion's new score, or None if it is no longer pending
+    """
+    if value not in VOTE_VALUES:
+        raise ValueError(f"Vote must be one of {VOTE_VALUES}")
+    queue = get_queue(suggestion.playlist_id)
+    if suggestion.pk not in queue:
+        return None
+    stored = 0
+    if votes.get(suggestion.pk, user_id) is None:
+        stored = (
+            SuggestionVote.objects.filter(suggestion=suggestion, user_id=user_id)
+            .values_list("value", flat=True)
+            .first()
+            or 0
+        )
+    return votes.add(suggestion.pk, user_id, value, stored, queue)
+
+
+def user_votes(user_id: int, suggestion_ids: Iterable[int]) -> dict[int, int]:
+    """Current votes of a user on some suggestions, buffered votes included."""
+    suggestion_ids = list(suggestion_ids)
+    found = dict(
+        SuggestionVote.objects.filter(user_id=user_id, suggestion_id__in=suggestion_ids).values_list(
+            "suggestion_id", "value"
+        )
+    )
+    for suggestion_id in suggestion_ids:
+        buffered = votes.get(suggestion_id, user_id)
+        if buffered is not None:
+            found[suggestion_id] = buffered
+    return {suggestion_id: value for suggestion_id, value in found.items() if value}
+
+
+def review_suggestion(suggestion: TrackSuggestion, reviewer: User, accepted: bool) -> None:
+    """Accept or reject a suggestion, taking it out of the queue."""
+    votes.flush()
+    suggestion.refresh_from_db(fields=["score"])
+    suggestion.status = "accepted" if accepted else "rejected"
+    suggestion.reviewed_by = reviewer
+    suggestion.save(update_fields=["status", "reviewed_by", "updated_at"])
+
+    def publish() -> None:
+        queue = _loaded_queue(suggestion.playlist_id)
+        if queue is not None:
+            queue.remove(suggestion.pk)
+        _queue_changed(suggestion.playlist_id)
+
+    transaction.on_commit(publish)
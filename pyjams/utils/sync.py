@@ -0,0 +1,167 @@
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from spotipy import Spotify
+
+from pyjams.signals import playlist_synced
+from pyjams.utils.diff import Move, Operation, Remove, plan_removals, plan_sync
+from pyjams.utils.mutations import playlist_writes
+from pyjams.utils.spotify import SPOTIFY_BATCH_LIMIT, chunked, get_playlist_track_uris
+
+# Rewriting a playlist resets every track's added_at and added_by, so it is only worth it when the
+# diff takes well over the requests of a rewrite
+REPLACE_MIN_OPERATIONS = 10
+REPLACE_FACTOR = 2
+
+
+class PlaylistChangedError(Exception):
+    """The playlist no longer holds the tracks a positional edit was planned against."""
+
+
+@dataclass
+class SyncResult:
+    snapshot_id: str
+    removed: int = 0
+    moved: int = 0
+    inserted: int = 0
+    requests: int = 0
+    # True when rewriting the whole playlist was cheaper than applying the diff
+    replaced: bool = False
+
+    @property
+    def changed(self) -> bool:
+        return self.replaced or bool(self.removed or self.moved or self.inserted)
+
+
+def _replace_cost(target: Sequence[str]) -> int:
+    return max(1, math.ceil(len(target) / SPOTIFY_BATCH_LIMIT))
+
+
+def _should_replace(operations: Sequence[Operation], target: Sequence[str]) -> bool:
+    return len(operations) > max(REPLACE_MIN_OPERATIONS, REPLACE_FACTOR * _replace_cost(target))
+
+
+def _apply(spotify: Spotify, playlist_id: str, snapshot_id: str, operation: Operation) -> dict[str, Any]:
+    if isinstance(operation, Remove):
+        items: dict[str, list[int]] = {}
+        for uri, position in operation.positions:
+            items.setdefault(uri, []).append(position)
+        return spotify.playlist_remove_specific_occurrences_of_items(
+            playlist_id,
+            [{"uri": uri, "positions": positions} for uri, positions in items.items()],
+            snapshot_id=snapshot_id,
+        )
+    if isinstance(operation, Move):
+        return spotify.playlist_reorder_items(
+            playlist_id,
+            range_start=operation.range_start,
+            insert_before=operation.insert_before,
+            range_length=operation.range_length,
+            snapshot_id=snapshot_id,
+        )
+    return spotify.playlist_add_items(playlist_id, operation.uris, position=operation.position)
+
+
+def sync_playlist(
+    spotify: Spotify, playlist_id: str, target: Sequence[str], dry_run: bool = False, allow_replace: bool = False
+) -> SyncResult:
+    """Bring a playlist to exactly the ``target`` track URIs, in order.
+
+    The current track list is diffed against the target and only the differences are written, as
+    batched removals, range moves and positional inserts.
+
+    Args:
+        spotify: Authenticated Spotify client
+        playlist_id: Playlist to change
+        target: Desired track URIs
+        dry_run: Only work out what would change
+        allow_replace: Rewrite the playlist from scratch instead when the diff takes over
+            ``REPLACE_FACTOR`` times as many requests, and at least ``REPLACE_MIN_OPERATIONS``.
+            Every track then loses when and by whom it was added.
+
+    Returns:
+        What was (or would be) changed and how many write requests it took
+
+    Raises:
+        SpotifyException: If a write fails part way, the playlist is left at the last good state
+    """
+    # Hold back queued single-track writes so they can't interleave with the positional edits
+    with playlist_writes.exclusive(playlist_id):
+        snapshot_id, current = get_playlist_track_uris(spotify, playlist_id)
+        operations = plan_sync(current, target)
+
+        result = SyncResult(snapshot_id=snapshot_id)
+        for operation in operations:
+            if isinstance(operation, Remove):
+                result.removed += len(operation.positions)
+            elif isinstance(operation, Move):
+                result.moved += operation.range_length
+            else:
+                result.inserted += len(operation.uris)
+
+        if allow_replace and _should_replace(operations, target):
+            result.replaced = True
+            result.requests = _replace_cost(target)
+        else:
+            result.requests = len(operations)
+        if dry_run:
+            return result
+
+        if result.replaced:
+            batches = list(chunked(list(target))) or [[]]
+            result.snapshot_id = spotify.playlist_replace_items(playlist_id, batches[0])["snapshot_id"]
+            for batch in batches[1:]:
+                result.snapshot_id = spotify.playlist_add_items(playlist_id, batch)["snapshot_id"]
+        else:
+            for operation in operations:
+                result.snapshot_id = _apply(spotify, playlist_id, result.snapshot_id, operation)["snapshot_id"]
+
+        # The playlist has changed whatever the receivers do, so their failures (logged by
+        # send_robust) must not fail the sync
+        playlist_synced.send_robust(
+            sender=None,
+            spotify=spotify,
+            playlist_id=playlist_id,
+            previous=snapshot_id,
+            snapshot_id=result.snapshot_id,
+            previous_uris=current,
+            track_uris=list(target),
+        )
+        return result
+
+
+def remove_positions(spotify: Spotify, playlist_id: str, items: Sequence[tuple[str, int]]) -> SyncResult:
+    """Remove exactly the given occurrences of tracks, in as few batched requests as possible.
+
+    Unlike removing a track URI, which drops every occurrence of it, only the listed positions go.
+
+    Args:
+        items: ``(uri, position)`` pairs, as shown to the user
+
+    Raises:
+        PlaylistChangedError: If any position no longer holds the expected track
+    """
+    with playlist_writes.exclusive(playlist_id):
+        snapshot_id, current = get_playlist_track_uris(spotify, playlist_id)
+        if any(not 0 <= position < len(current) or current[position] != uri for uri, position in items):
+            raise PlaylistChangedError("The playlist has changed since it was checked, please check it again")
+
+        result = SyncResult(snapshot_id=snapshot_id)
+        for operation in plan_removals(current, [position for _, position in items]):
+            result.snapshot_id = _apply(spotify, playlist_id, result.snapshot_id, operation)["snapshot_id"]
+            result.removed += len(operation.positions)
+            result.requests += 1
+
+        removed = {position for _, position in items}
+        playlist_synced.send_robust(
+            sender=None,
+            spotify=spotify,
+            playlist_id=playlist_id,
+            previous=snapshot_id,
+            snapshot_id=result.snapshot_id,
+            previous_uris=current,
+            track_uris=[uri for position, uri in enumerate(current) if position not in removed and uri],
+        )
+        return result
@@ -1,11 +1,36 @@
+import gzip
+import uuid
+from collections.abc import Callable, Iterator
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, TypedDict
 
 from django.conf import settings
-from django.http import HttpRequest
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
 from django.template.response import TemplateResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.safestring import SafeString, mark_safe
+
+from .handlers import accepts_encoding
+from .tracks import format_track_items
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli ships with whitenoise[brotli]
+    brotli = None
+
+# Fragments are keyed by snapshot id, which changes on every edit, so entries never go stale and
+# only need to expire to reclaim space.
+TRACK_LIST_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class CachedFragment(TypedDict):
+    html: str
+    gzip: bytes
+    br: bytes | None
 
 
 def get_templates_dir() -> Path:
@@ -31,3 +56,87 @@ def render_template(request: HttpRequest, template_name: str, context: dict[str,
         template_name=template_name,
         context=context,
     )
+
+
+def track_list_cache_key(playlist_id: str, snapshot_id: str, is_manager: bool) -> str:
+    return f"pyjams:track_list:{playlist_id}:{snapshot_id}:{int(is_manager)}"
+
+
+def get_cached_track_list(playlist_id: str, snapshot_id: str, is_manager: bool) -> CachedFragment | None:
+    """Get a previously rendered track list fragment for this playlist snapshot."""
+    return cache.get(track_list_cache_key(playlist_id, snapshot_id, is_manager))
+
+
+def cache_track_list(
+    playlist_id: str, snapshot_id: str, items: list[dict[str, Any]], is_manager: bool
+) -> CachedFragment:
+    """Render the track list fragment and store it with precompressed variants."""
+    html = render_track_rows(items, is_manager)
+    encoded = html.encode()
+    fragment: CachedFragment = {
+        "html": html,
+        "gzip": gzip.compress(encoded, compresslevel=6),
+        "br": brotli.compress(encoded) if brotli else None,
+    }
+    cache.set(track_list_cache_key(playlist_id, snapshot_id, is_manager), fragment, TRACK_LIST_CACHE_TIMEOUT)
+    return fragment
+
+
+def render_track_rows(items: list[dict[str, Any]], is_manager: bool, offset: int = 0) -> str:
+    """Render track rows, numbered from ``offset + 1``."""
+    return render_to_string(
+        "components/track_list.html", {"tracks": format_track_items(items), "is_manager": is_manager, "offset": offset}
+    )
+
+
+def render_track_list(playlist_id: str, snapshot_id: str, items: list[dict[str, Any]], is_manager: bool) -> SafeString:
+    """Render the track list fragment, reusing the cached copy for an unchanged snapshot."""
+    fragment = get_cached_track_list(playlist_id, snapshot_id, is_manager)
+    if fragment is None:
+        fragment = cache_track_list(playlist_id, snapshot_id, items, is_manager)
+    return mark_safe(fragment["html"])
+
+
+def fragment_response(request: HttpRequest, fragment: CachedFragment) -> HttpResponse:
+    """Serve a cached fragment, using a precompressed variant when the client accepts one."""
+    if fragment["br"] and accepts_encoding(request, "br"):
+        response = HttpResponse(fragment["br"])
+        response["Content-Encoding"] = "br"
+    elif accepts_encoding(request, "gzip"):
+        response = HttpResponse(fragment["gzip"])
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(fragment["html"])
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
+def render_chunked(
+    request: HttpRequest,
+    template_name: str,
+    context: dict[str, Any],
+    slots: dict[str, Callable[[], Iterator[str]]],
+) -> Iterator[str]:
+    """Render a page up front, then yield it in pieces with each slot filled as it is reached.
+
+    The template is rendered once, with a marker as the value of every slot variable. Everything
+    up to the first marker can be sent straight away, and each slot's generator is only started
+    once the page has been sent up to it, so slow content streams in place.
+
+    Args:
+        slots: Context variable names mapped to functions returning the chunks to put there
+    """
+    markers = {name: f"<!--slot:{name}:{uuid.uuid4().hex}-->" for name in slots}
+    html = render_to_string(template_name, {**context, **{n: mark_safe(m) for n, m in markers.items()}}, request)
+    # Slots in page order, each marker must appear exactly once
+    ordered = sorted(slots, key=lambda name: html.index(markers[name]))
+
+    def chunks() -> Iterator[str]:
+        rest = html
+        for name in ordered:
+            before, rest = rest.split(markers[name], 1)
+            yield before
+            yield from slots[name]()
+        yield rest
+
+    return chunks()
@@ -0,0 +1,158 @@
+from typing import Any, TypedDict
+
+from django.core.cache import cache
+from spotipy import Spotify
+
+from pyjams.utils.trigrams import TRIGRAM_LIMIT, TRIGRAM_THRESHOLD, TrigramIndex
+
+# Track metadata is immutable for our purposes, playlist stats are keyed by snapshot and refreshed
+# whenever the playlist page is rendered.
+TRACK_CACHE_TIMEOUT = 60 * 60 * 24
+STATS_CACHE_TIMEOUT = 60 * 60
+# Snapshot ids looked up for clients polling a playlist are shared by all of them for this long
+VERSION_CACHE_TIMEOUT = 5
+# Tracks kept in each worker's fuzzy name index, the least recently cached are dropped first
+TRACK_INDEX_SIZE = 50_000
+
+# Names of tracks this worker has cached, for typo tolerant lookups without asking Spotify
+track_index: TrigramIndex[str] = TrigramIndex(max_size=TRACK_INDEX_SIZE)
+
+
+class PlaylistStats(TypedDict):
+    snapshot_id: str
+    followers: int
+    track_count: int
+    duration_ms: int
+
+
+def format_duration(duration_ms: int) -> str:
+    """Format a track duration as ``m:ss``."""
+    minutes = duration_ms // 60000
+    seconds = (duration_ms % 60000) // 1000
+    return f"{minutes}:{seconds:02d}"
+
+
+def format_track_items(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Add display fields to Spotify playlist items in place."""
+    for item in items:
+        if item["track"]:
+            item["track"]["duration_formatted"] = format_duration(item["track"]["duration_ms"])
+    return items
+
+
+def track_id_from_uri(track: str) -> str:
+    """Get the bare track id from a track id, URI or open.spotify.com URL."""
+    return track.rstrip("/").split("/")[-1].split(":")[-1].split("?")[0]
+
+
+def normalize_track_uri(track: str) -> str:
+    """Turn a track id, URI or open.spotify.com URL into a ``spotify:track:`` URI."""
+    return f"spotify:track:{track_id_from_uri(track)}"
+
+
+def _track_key(track_id: str) -> str:
+    return f"pyjams:track:{track_id}"
+
+
+def cache_tracks(tracks: list[dict[str, Any]]) -> None:
+    """Remember full Spotify track objects so later writes can render them without a lookup."""
+    known = {t["id"]: t for t in tracks if t and t.get("id")}
+    cache.set_many({_track_key(track_id): track for track_id, track in known.items()}, TRACK_CACHE_TIMEOUT)
+    track_index.update(
+        (track_id, " ".join([track.get("name", ""), *(artist["name"] for artist in track.get("artists", []))]))
+        for track_id, track in known.items()
+    )
+
+
+def get_track(spotify: Spotify, track: str) -> dict[str, Any]:
+    """Get a Spotify track object, from cache when it was seen recently."""
+    track_id = track_id_from_uri(track)
+    cached = cache.get(_track_key(track_id))
+    if cached is not None:
+        return cached
+    result = spotify.track(track_id)
+    cache_tracks([result])
+    return result
+
+
+def get_cached_tracks(track_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Get whichever of the given tracks are in the metadata cache, keyed by track id."""
+    found = cache.get_many([_track_key(track_id) for track_id in track_ids])
+    return {track["id"]: track for track in found.values()}
+
+
+def search_cached_tracks(
+    query: str, threshold: float = TRIGRAM_THRESHOLD, limit: int = TRIGRAM_LIMIT
+) -> list[tuple[dict[str, Any], float]]:
+    """Find cached tracks whose name and artists are spelled like ``query``, most similar first."""
+    ranked = track_index.search(query, threshold, limit)
+    found = get_cached_tracks([track_id for track_id, _ in ranked])
+    # Metadata may have expired from the shared cache while the id is still indexed
+    return [(found[track_id], score) for track_id, score in ranked if track_id in found]
+
+
+def _stats_key(playlist_id: str) -> str:
+    return f"pyjams:playlist_stats:{playlist_id}"
+
+
+def get_playlist_stats(playlist_id: str) -> PlaylistStats | None:
+    """Get the last known stats for a playlist."""
+    return cache.get(_stats_key(playlist_id))
+
+
+def _version_key(playlist_id: str) -> str:
+    return f"pyjams:playlist_version:{playlist_id}"
+
+
+def set_playlist_stats(playlist_id: str, stats: PlaylistStats) -> None:
+    cache.set(_stats_key(playlist_id), stats, STATS_CACHE_TIMEOUT)
+    # Writes made here are the newest version, pollers needn't wait for the next lookup to see them
+    cache.set(_version_key(playlist_id), stats["snapshot_id"], VERSION_CACHE_TIMEOUT)
+
+
+def get_playlist_version(spotify: Spotify, playlist_id: str) -> str:
+    """Get a playlist's current snapshot id, asking Spotify at most once per ``VERSION_CACHE_TIMEOUT``."""
+    snapshot_id = cache.get(_version_key(playlist_id))
+    if snapshot_id is None:
+        snapshot_id = spotify.playlist(playlist_id, fields="snapshot_id")["snapshot_id"]
+        cache.set(_version_key(playlist_id), snapshot_id, VERSION_CACHE_TIMEOUT)
+    return snapshot_id
+
+
+def build_playlist_stats(playlist: dict[str, Any], items: list[dict[str, Any]]) -> PlaylistStats:
+    """Compute stats from a Spotify playlist object and its items."""
+    return {
+        "snapshot_id": playlist["snapshot_id"],
+        "followers": playlist["followers"]["total"],
+        "track_count": len(items),
+        "duration_ms": sum(item["track"]["duration_ms"] for item in items if item["track"]),
+    }
+
+
+def adjust_playlist_stats(
+    playlist_id: str, snapshot_id: str, track_delta: int, duration_delta: int
+) -> PlaylistStats | None:
+    """Apply the effect of a write to the cached stats and move them to the new snapshot.
+
+    Returns None when there are no cached stats to adjust.
+    """
+    stats = get_playlist_stats(playlist_id)
+    if stats is None:
+        return None
+    stats = {
+        "snapshot_id": snapshot_id,
+        "followers": stats["followers"],
+        "track_count": max(0, stats["track_count"] + track_delta),
+        "duration_ms": max(0, stats["duration_ms"] + duration_delta),
+    }
+    set_playlist_stats(playlist_id, stats)
+    return stats
+
+
+def display_stats(stats: PlaylistStats) -> dict[str, Any]:
+    """Format stats for the playlist page stat cards."""
+    return {
+        "followers": stats["followers"],
+        "track_count": stats["track_count"],
+        "duration": f"{round(stats['duration_ms'] / (1000 * 60))} min",
+    }
@@ -0,0 +1,162 @@
+"""Trigram similarity search for names people tend to misspell.
+
+Trigrams follow ``pg_trgm``: every word is lower cased and padded with two spaces in front and one
+behind, and the similarity of two strings is the number of trigrams they share divided by the
+number of distinct trigrams in either. Production asks Postgres, where migration ``0012`` adds a
+trigram GIN index on featured playlist names. Elsewhere, and for track metadata that only lives in
+the cache, ``TrigramIndex`` answers the same question in memory.
+"""
+
+import heapq
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from typing import Generic, TypeVar
+
+from django.db import connection, transaction
+
+K = TypeVar("K", bound=Hashable)
+
+# pg_trgm's default similarity threshold
+TRIGRAM_THRESHOLD = 0.3
+TRIGRAM_LIMIT = 10
+
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """Get the trigrams of ``text`` the way ``pg_trgm`` extracts them."""
+    grams: set[str] = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: str, b: str) -> float:
+    """Share of trigrams ``a`` and ``b`` have in common, from 0 to 1."""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+
+class TrigramIndex(Generic[K]):
+    """In-memory inverted index from trigrams to keys.
+
+    A search only scores keys sharing at least one trigram with the query, and skips those that
+    can't reach the threshold from their trigram count alone.
+
+    Args:
+        max_size: Keys kept at most, the least recently added are dropped first. None for no limit.
+    """
+
+    def __init__(self, max_size: int | None = None) -> None:
+        self.max_size = max_size
+        self._grams: OrderedDict[K, frozenset[str]] = OrderedDict()
+        self._postings: dict[str, set[K]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._grams
+
+    def _discard(self, key: K) -> None:
+        for gram in self._grams.pop(key, ()):
+            keys = self._postings[gram]
+            keys.discard(key)
+            if not keys:
+                del self._postings[gram]
+
+    def add(self, key: K, text: str) -> None:
+        """Index ``text`` under ``key``, replacing whatever was indexed for it before."""
+        grams = trigrams(text)
+        with self._lock:
+            self._discard(key)
+            if not grams:
+                return
+            self._grams[key] = grams
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(key)
+            while self.max_size is not None and len(self._grams) > self.max_size:
+                self._discard(next(iter(self._grams)))
+
+    def update(self, items: Iterable[tuple[K, str]]) -> None:
+        for key, text in items:
+            self.add(key, text)
+
+    def discard(self, key: K) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def search(
+        self, query: str, threshold: float = TRIGRAM_THRESHOLD, limit: int = TRIGRAM_LIMIT
+    ) -> list[tuple[K, float]]:
+        """Find the keys most similar to ``query``.
+
+        Returns:
+            Up to ``limit`` ``(key, similarity)`` pairs at or above ``threshold``, most similar first
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        with self._lock:
+            shared: dict[K, int] = {}
+            for gram in grams:
+                for key in self._postings.get(gram, ()):
+                    shared[key] = shared.get(key, 0) + 1
+            # The union is at least as large as the query, so fewer shared trigrams than this can't match
+            needed = threshold * len(grams)
+            scored = [
+                (key, count / (len(grams) + len(self._grams[key]) - count))
+                for key, count in shared.items()
+                if count >= needed
+            ]
+        return heapq.nlargest(limit, (item for item in scored if item[1] >= threshold), key=lambda item: item[1])
+
+
+_featured_index: tuple[int, TrigramIndex[int]] | None = None
+_featured_index_lock = threading.Lock()
+
+
+def _featured_fallback_index(generation: int, load: Callable[[], Iterable[tuple[int, str]]]) -> TrigramIndex[int]:
+    global _featured_index
+    with _featured_index_lock:
+        if _featured_index is None or _featured_index[0] != generation:
+            index: TrigramIndex[int] = TrigramIndex()
+            index.update(load())
+            _featured_index = (generation, index)
+        return _featured_index[1]
+
+
+def rank_featured_similar(
+    query: str,
+    threshold: float,
+    limit: int,
+    generation: int,
+    load: Callable[[], Iterable[tuple[int, str]]],
+) -> list[tuple[int, float]]:
+    """Find active featured playlists whose name is similar to ``query``, most similar first.
+
+    Args:
+        generation: Featured cache generation, the in-memory index is rebuilt when it changes
+        load: Returns ``(id, name)`` for every active featured playlist, used without Postgres
+    """
+    if not trigrams(query):
+        return []
+    if connection.vendor != "postgresql":
+        return _featured_fallback_index(generation, load).search(query, threshold, limit)
+
+    # `%` only uses the trigram index with the threshold set for the session, scoped to this transaction
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", [str(threshold)])
+        cursor.execute(
+            "SELECT id, similarity(name, %s) AS score FROM pyjams_featuredplaylist "
+            "WHERE is_active AND name %% %s ORDER BY score DESC, id DESC LIMIT %s",
+            [query, query, limit],
+        )
+        return [(row_id, float(score)) for row_id, score in cursor.fetchall()]
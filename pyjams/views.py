@@ -1,22 +1,101 @@
-from collections.abc import Callable
+import hashlib
+import json
+from collections.abc import Callable, Iterable, Iterator
 from functools import wraps
+from itertools import batched
 from typing import Any, ParamSpec, TypeVar
 
 from django.contrib import auth, messages
-from django.http import HttpRequest, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.template.loader import render_to_string
+from django.urls import reverse
 from django.utils import timezone
-from django.views.decorators.http import require_http_methods
-
-from pyjams.models import FeaturedPlaylist, Permission, PlaylistManager
-from pyjams.utils.messages import error, success
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.html import format_html, json_script
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition, require_http_methods
+
+from pyjams.models import (
+    ArtistPlaylist,
+    FeaturedPlaylist,
+    ImportJob,
+    Permission,
+    PlaylistManager,
+    PlaylistSnapshot,
+    TrackSuggestion,
+)
+from pyjams.utils import cache as pyjams_cache
+from pyjams.utils.analytics import get_report
+from pyjams.utils.artists import schedule_artist_index, schedule_artist_index_for
+from pyjams.utils.autocomplete import AUTOCOMPLETE_LIMIT, autocomplete, record_query, remember_tracks
+from pyjams.utils.dedupe import scan_playlist
+from pyjams.utils.export import (
+    EXPORT_FORMATS,
+    batch_chunks,
+    iter_export_rows,
+    iter_export_rows_for_playlists,
+    stream_csv,
+    stream_gzip,
+    stream_ndjson,
+)
+from pyjams.utils.handlers import accepts_encoding
+from pyjams.utils.imports import fail_stale_imports, start_import
+from pyjams.utils.library import get_library_index, get_library_version
+from pyjams.utils.live import live_broker
+from pyjams.utils.messages import error, info, success
+from pyjams.utils.mutations import playlist_writes
+from pyjams.utils.pagination import KeysetPage, clamp_page_size
+from pyjams.utils.similar import get_similar_playlists, schedule_signature_update
 from pyjams.utils.spotify import (
+    SPOTIFY_BATCH_LIMIT,
+    add_tracks_in_batches,
+    get_background_spotify,
     get_playlist_info,
+    get_playlist_track_uris,
     get_spotify,
     handle_spotify_callback,
     initiate_spotify_auth,
+    iter_playlist_items,
 )
+from pyjams.utils.suggestions import cast_vote, get_queue, review_suggestion, suggest_track, user_votes
+from pyjams.utils.sync import PlaylistChangedError, remove_positions, sync_playlist
+from pyjams.utils.templates import (
+    cache_track_list,
+    fragment_response,
+    get_cached_track_list,
+    render_chunked,
+    render_track_list,
+    render_track_rows,
+)
+from pyjams.utils.tracks import (
+    PlaylistStats,
+    adjust_playlist_stats,
+    build_playlist_stats,
+    cache_tracks,
+    display_stats,
+    format_duration,
+    format_track_items,
+    get_cached_tracks,
+    get_playlist_stats,
+    get_playlist_version,
+    get_track,
+    normalize_track_uri,
+    search_cached_tracks,
+    set_playlist_stats,
+    track_id_from_uri,
+)
+from pyjams.utils.trigrams import TRIGRAM_LIMIT, TRIGRAM_THRESHOLD
+
+# Rows rendered per streamed chunk, and per page of the scrolling track list
+STREAM_PAGE_SIZE = SPOTIFY_BATCH_LIMIT
+TRACK_PAGE_SIZE = SPOTIFY_BATCH_LIMIT
+# Sent by links rendering their page ahead of a click, see ``prefetchable``
+PREFETCH_HEADER = "X-PyJams-Prefetch"
+# How long a prefetched page waits for the navigation that uses it
+PREFETCH_TIMEOUT = 10
 
 P = ParamSpec("P")
 R = TypeVar("R")
@@ -44,8 +123,9 @@ def require_permissions(*permissions: Permission) -> Callable[[Callable[P, R]],
 @require_http_methods(["GET"])
 def index(request: HttpRequest) -> HttpResponse:
     """Render index page with login or search interface."""
-    playlists = []
-    managed_playlists = []
+    site_featured = None
+    community_page: KeysetPage[FeaturedPlaylist] = KeysetPage()
+    managed_playlists: list[FeaturedPlaylist] = []
 
     if request.user.is_authenticated:
         if not request.user.has_permissions(Permission.VIEW):
@@ -53,19 +133,22 @@ def index(request: HttpRequest) -> HttpResponse:
 
         try:
             _ = get_spotify(request.session)
-            playlists = FeaturedPlaylist.objects.filter(is_active=True)
+            site_featured = FeaturedPlaylist.get_site_featured()
+            community_page = FeaturedPlaylist.get_community_featured_page()
 
             # Get playlists managed by current user
-            managed_playlists = [
-                p
-                for p in playlists
-                if PlaylistManager.objects.filter(playlist=p, user_id=request.user.spotify_id, is_active=True).exists()
-            ]
+            managed_playlists = list(
+                FeaturedPlaylist.objects.filter(
+                    is_active=True, managers_through__user=request.user, managers_through__is_active=True
+                )
+            )
         except Exception as e:
             print(f"Error fetching Spotify data: {e}")
 
     context = {
-        "playlists": playlists,
+        "site_featured": site_featured,
+        "page": community_page,
+        "page_url": reverse("pyjams:community_featured"),
         "managed_playlists": managed_playlists,
     }
 
@@ -74,47 +157,310 @@ def index(request: HttpRequest) -> HttpResponse:
     return render(request, "index.html", context)
 
 
+def _is_playlist_manager(request: HttpRequest, managers: Iterable[PlaylistManager]) -> bool:
+    return any(m.user_id == request.user.id for m in managers)
+
+
+def _etag(*parts: Any) -> str:
+    return hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()[:32]
+
+
+def revalidate(etag_func: Callable[..., str | None]) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorator answering a matching ``If-None-Match`` with 304 before the view does any work.
+
+    ``etag_func`` gets the view's arguments and returns None when it can't tell cheaply, in which
+    case the view runs as usual. Responses are marked for revalidation on every use. Streamed
+    responses get no ETag, a stream that failed part way must not be revalidated as complete.
+    """
+
+    def decorator(view_func: Callable[P, R]) -> Callable[P, R]:
+        conditional = condition(etag_func=etag_func)(view_func)
+
+        @wraps(view_func)
+        def _wrapped_view(*args: P.args, **kwargs: P.kwargs) -> R:
+            response = conditional(*args, **kwargs)
+            if response.streaming:
+                response.headers.pop("ETag", None)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return _wrapped_view
+
+    return decorator
+
+
+def _prefetch_key(request: HttpRequest) -> str:
+    return f"pyjams:prefetch:{request.user.pk}:{_etag(request.get_full_path())}"
+
+
+def prefetchable(
+    etag_func: Callable[..., str | None],
+) -> Callable[[Callable[..., HttpResponse]], Callable[..., HttpResponse]]:
+    """Decorator letting a page be rendered before the click that opens it.
+
+    A request with the ``X-PyJams-Prefetch`` header renders the page, keeps it for this user for
+    ``PREFETCH_TIMEOUT`` seconds and is answered with an empty 204. The user's next ordinary
+    request for the same URL is answered from that copy, once, if ``etag_func`` still gives the
+    copy's ETag. A page changed in the meantime is rendered again. Streamed and unsuccessful
+    responses aren't kept, and nothing is rendered ahead while messages are waiting, since
+    rendering would use them up.
+    """
+
+    def decorator(view_func: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+        @wraps(view_func)
+        def _wrapped_view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            key = _prefetch_key(request)
+            if request.headers.get(PREFETCH_HEADER):
+                if not messages.get_messages(request):
+                    response = view_func(request, *args, **kwargs)
+                    if response.status_code == 200 and not response.streaming and response.has_header("ETag"):
+                        stored = {"content": response.content, "headers": dict(response.items())}
+                        cache.set(key, stored, PREFETCH_TIMEOUT)
+                prefetched = HttpResponse(status=204)
+                patch_cache_control(prefetched, no_store=True)
+                return prefetched
+
+            stored = cache.get(key)
+            if stored is None:
+                return view_func(request, *args, **kwargs)
+            cache.delete(key)
+            etag = etag_func(request, *args, **kwargs)
+            if etag is None or quote_etag(etag) != stored["headers"]["ETag"]:
+                return view_func(request, *args, **kwargs)
+            response = HttpResponse(stored["content"])
+            for header, value in stored["headers"].items():
+                response[header] = value
+            return get_conditional_response(request, etag=response["ETag"], response=response)
+
+        return _wrapped_view
+
+    return decorator
+
+
+def _playlist_details_etag(request: HttpRequest, playlist_id: str) -> str | None:
+    # A 304 would leave pending messages unshown until some later page
+    if messages.get_messages(request):
+        return None
+    public_playlist = FeaturedPlaylist.objects.filter(spotify_id=playlist_id).only("id", "updated_at").first()
+    if public_playlist is None:
+        return None
+    return _etag(
+        request.user.pk,
+        request.user.role,
+        # The page's forms carry a CSRF token, which stops working once the secret rotates on login
+        request.META.get("CSRF_COOKIE", ""),
+        # Shared by every viewer and re-read from Spotify at most every few seconds
+        get_playlist_version(get_spotify(request.session), playlist_id),
+        public_playlist.updated_at.isoformat(),
+        PlaylistManager.version(public_playlist.id),
+        # Similar playlists come from other featured playlists
+        pyjams_cache.get_generation(pyjams_cache.FEATURED_NAMESPACE),
+    )
+
+
+def _stream_playlist_details(
+    request: HttpRequest,
+    spotify: Any,
+    playlist: dict[str, Any],
+    items: list[dict[str, Any]],
+    is_manager: bool,
+    context: dict[str, Any],
+) -> StreamingHttpResponse:
+    """Send the playlist page with the first page of rows, then the rest of the rows as Spotify returns them.
+
+    Stats are shown from the first page until the last row is in, then corrected in place. The
+    status has already been sent when a later page fails, so the failure is shown as a last row
+    and the first page's stats are kept.
+    """
+    playlist_id = playlist["id"]
+    stats = build_playlist_stats(playlist, items)
+    stats["track_count"] = playlist["tracks"]["total"]
+    complete = False
+
+    def rows() -> Iterator[str]:
+        nonlocal complete
+        yield render_track_rows(items, is_manager)
+        offset = len(items)
+        try:
+            for page in batched(iter_playlist_items(spotify, playlist_id, offset=offset), STREAM_PAGE_SIZE):
+                yield render_track_rows(list(page), is_manager, offset)
+                offset += len(page)
+                stats["duration_ms"] += sum(item["track"]["duration_ms"] for item in page if item["track"])
+        except Exception as e:
+            yield format_html(
+                '<tr class="table-warning"><td colspan="6">Loading tracks after #{} failed: {}</td></tr>',
+                offset,
+                str(e),
+            )
+            return
+        stats["track_count"] = offset
+        set_playlist_stats(playlist_id, stats)
+        complete = True
+
+    def final_stats() -> Iterator[str]:
+        if complete:
+            yield json_script(display_stats(stats), "streamedStats")
+
+    chunks = render_chunked(
+        request,
+        "playlist.html",
+        {**context, "stats": display_stats(stats)},
+        {"track_list_html": rows, "streamed_stats": final_stats},
+    )
+    response = StreamingHttpResponse(chunks, content_type="text/html; charset=utf-8")
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @require_permissions(Permission.VIEW)
 @require_http_methods(["GET"])
+@prefetchable(_playlist_details_etag)
+@revalidate(_playlist_details_etag)
 def playlist_details(request: HttpRequest, playlist_id: str) -> HttpResponse:
+    """Render a playlist page with the first page of tracks, the rest are loaded while scrolling.
+
+    With ``?stream=1`` every track is rendered instead, streamed in as it is fetched.
+    """
     spotify = get_spotify(request.session)
     current_user = spotify.current_user()
 
     playlist, tracks = get_playlist_info(spotify, playlist_id)
     public_playlist = FeaturedPlaylist.objects.get(spotify_id=playlist_id)
 
-    # Format track durations
-    for track in tracks["items"]:
-        if track["track"]:
-            duration_ms = track["track"]["duration_ms"]
-            minutes = duration_ms // 60000
-            seconds = (duration_ms % 60000) // 1000
-            track["track"]["duration_formatted"] = f"{minutes}:{seconds:02d}"
-
     managers = PlaylistManager.get_active_managers(public_playlist.id)
-    total_ms = sum(item["track"]["duration_ms"] for item in tracks["items"] if item["track"])
-
-    stats = {
-        "followers": playlist["followers"]["total"],
-        "track_count": len(tracks["items"]),
-        "duration": f"{round(total_ms / (1000 * 60))} min",
+    is_manager = _is_playlist_manager(request, managers)
+    context = {
+        "playlist": playlist,
+        "current_user": current_user,
+        "public_playlist": public_playlist,
+        "playlist_managers": managers,
+        "is_manager": is_manager,
+        "similar_playlists": get_similar_playlists(spotify, public_playlist, playlist["snapshot_id"]),
     }
+    if request.GET.get("stream") == "1":
+        return _stream_playlist_details(request, spotify, playlist, tracks["items"], is_manager, context)
+
+    stats = build_playlist_stats(playlist, tracks["items"])
+    set_playlist_stats(playlist_id, stats)
 
     return render(
         request,
         "playlist.html",
         {
-            "playlist": playlist,
-            "tracks": tracks["items"],
-            "current_user": current_user,
-            "public_playlist": public_playlist,
-            "playlist_managers": managers,
-            "is_manager": any(m.user_id == current_user["id"] for m in managers),
-            "stats": stats,
+            **context,
+            "track_list_html": render_track_list(playlist_id, playlist["snapshot_id"], tracks["items"], is_manager),
+            "stats": display_stats(stats),
+            "next_offset": len(tracks["items"]) if tracks["next"] else None,
         },
     )
 
 
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def playlist_tracks(request: HttpRequest, playlist_id: str) -> HttpResponse:
+    """Serve the track list fragment for a playlist, straight from cache when unchanged."""
+    spotify = get_spotify(request.session)
+    public_playlist = FeaturedPlaylist.objects.get(spotify_id=playlist_id)
+    is_manager = _is_playlist_manager(request, PlaylistManager.get_active_managers(public_playlist.id))
+
+    snapshot_id = spotify.playlist(playlist_id, fields="snapshot_id")["snapshot_id"]
+    fragment = get_cached_track_list(playlist_id, snapshot_id, is_manager)
+    if fragment is None:
+        tracks = spotify.playlist_tracks(playlist_id)
+        fragment = cache_track_list(playlist_id, snapshot_id, tracks["items"], is_manager)
+    return fragment_response(request, fragment)
+
+
+def _track_page_etag(request: HttpRequest, playlist_id: str) -> str | None:
+    public_playlist = FeaturedPlaylist.objects.filter(spotify_id=playlist_id).only("id").first()
+    if public_playlist is None:
+        return None
+    return _etag(
+        request.user.pk,
+        get_playlist_version(get_spotify(request.session), playlist_id),
+        PlaylistManager.version(public_playlist.id),
+        request.GET.get("offset", ""),
+    )
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+@revalidate(_track_page_etag)
+def playlist_track_page(request: HttpRequest, playlist_id: str) -> HttpResponse:
+    """Serve the page of track rows starting at ``?offset=``, for the scrolling track list.
+
+    ``X-Next-Offset`` is where the following page starts and is left out after the last one.
+    ``X-Snapshot-Id`` is the playlist's current version, so the browser can tell when the rows it
+    already shows are out of date. Pages are revalidated by ETag, so scrolling back to a page that
+    has been dropped from the browser's DOM doesn't fetch it from Spotify again.
+    """
+    offset = request.GET.get("offset", "0")
+    if not offset.isdigit():
+        return JsonResponse({"error": "Invalid offset"}, status=400)
+    offset = int(offset)
+    spotify = get_spotify(request.session)
+    public_playlist = FeaturedPlaylist.objects.get(spotify_id=playlist_id)
+    is_manager = _is_playlist_manager(request, PlaylistManager.get_active_managers(public_playlist.id))
+
+    page = spotify.playlist_items(playlist_id, limit=TRACK_PAGE_SIZE, offset=offset)
+    response = HttpResponse(render_track_rows(page["items"], is_manager, offset))
+    response["X-Snapshot-Id"] = get_playlist_version(spotify, playlist_id)
+    if page["next"]:
+        response["X-Next-Offset"] = str(offset + len(page["items"]))
+    return response
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def playlist_version(request: HttpRequest, playlist_id: str) -> HttpResponse:
+    """Current snapshot id of a playlist, with its stats when they are cached for that snapshot.
+
+    For clients that poll for changes instead of holding an event stream. The ETag is strong and
+    an unchanged playlist is answered with 304 Not Modified, so most polls cost a few bytes.
+    """
+    if not FeaturedPlaylist.objects.filter(spotify_id=playlist_id, is_active=True).exists():
+        return JsonResponse({"error": "Playlist not found"}, status=404)
+    snapshot_id = get_playlist_version(get_spotify(request.session), playlist_id)
+    stats = get_playlist_stats(playlist_id)
+    shown_stats = display_stats(stats) if stats and stats["snapshot_id"] == snapshot_id else None
+    body = json.dumps({"data": {"snapshot_id": snapshot_id, "stats": shown_stats}})
+    etag = f'"{_etag(body)}"'
+
+    response = get_conditional_response(request, etag=etag) or HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    # Stored by the browser, but always revalidated
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def playlist_events(request: HttpRequest, playlist_id: str) -> HttpResponse:
+    """Stream changes to a featured playlist as Server-Sent Events.
+
+    Sends ``added`` and ``removed`` with the track URIs that changed, then ``snapshot`` with the new
+    snapshot id. ``snapshot_id`` is the version the page is showing, so changes made since it was
+    rendered are announced straight away.
+    """
+    if not FeaturedPlaylist.objects.filter(spotify_id=playlist_id, is_active=True).exists():
+        return JsonResponse({"error": "Playlist not found"}, status=404)
+    subscription = live_broker.subscribe(
+        playlist_id,
+        get_spotify(request.session),
+        snapshot_id=request.GET.get("snapshot_id", ""),
+        last_event_id=request.headers.get("Last-Event-ID"),
+    )
+    if subscription is None:
+        # No Retry-After: browsers give up on a refused stream and poll the playlist version instead
+        return JsonResponse({"error": "Too many live viewers, follow the playlist version instead"}, status=503)
+
+    response = StreamingHttpResponse(live_broker.stream(subscription), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop proxies from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @require_permissions(Permission.MANAGE_PLAYLIST)
 @require_http_methods(["POST"])
 def create_playlist(request: HttpRequest) -> JsonResponse:
@@ -136,51 +482,597 @@ def create_playlist(request: HttpRequest) -> JsonResponse:
         return JsonResponse({"error": str(e)}, status=400)
 
 
+def _track_update_response(
+    request: HttpRequest,
+    message: str,
+    snapshot_id: str,
+    stats: PlaylistStats | None,
+    row_html: str = "",
+    trigger: dict[str, Any] | None = None,
+) -> HttpResponse:
+    """Describe a single track write as out-of-band HTMX swaps, or as JSON for fetch callers."""
+    shown_stats = display_stats(stats) if stats else None
+    if request.headers.get("HX-Request"):
+        response = render(request, "components/track_update.html", {"row_html": row_html, "stats": shown_stats})
+        if trigger:
+            response["HX-Trigger"] = json.dumps(trigger)
+        return response
+    return JsonResponse({"message": message, "snapshot_id": snapshot_id, "stats": shown_stats, "html": row_html})
+
+
 @require_permissions(Permission.MANAGE_PLAYLIST)
 @require_http_methods(["POST"])
-def add_track(request: HttpRequest) -> JsonResponse:
-    """Add a track to a playlist."""
+def add_track(request: HttpRequest, playlist_id: str) -> HttpResponse:
+    """Add a track to a playlist and return just the new row."""
     spotify = get_spotify(request.session)
     track_id = request.POST.get("track_id")
-    playlist_id = request.POST.get("playlist_id")
 
-    if not all([track_id, playlist_id]):
+    if not track_id:
         return JsonResponse({"error": "Missing required parameters"}, status=400)
 
     try:
-        spotify.playlist_add_items(playlist_id, [track_id])
-        success(request, "Track added successfully!")
-        # Render updated track list
-        playlist, tracks = get_playlist_info(spotify, playlist_id)
-        html = render_to_string(
-            "components/track_list.html", {"tracks": tracks["items"], "is_manager": True}, request=request
+        # Usually cached from the search results the track was picked from
+        track = get_track(spotify, track_id)
+        # Concurrent writes to the same playlist are applied together, in submission order
+        result = playlist_writes.submit(spotify, playlist_id, "add", track["uri"], owner=str(request.user.pk))
+        if not result.ok or result.snapshot_id is None:
+            error(request, f"Failed to add track: {result.error}")
+            return JsonResponse({"error": result.error}, status=400)
+        if result.superseded:
+            # The track isn't in the playlist, there is no row to show
+            info(request, "Track was removed again by a later change")
+            return _track_update_response(
+                request, "Track was removed again by a later change", result.snapshot_id, None
+            )
+        stats = adjust_playlist_stats(playlist_id, result.snapshot_id, 1, track["duration_ms"])
+        schedule_artist_index_for(spotify, playlist_id)
+
+        item = format_track_items([{"track": track}])[0]
+        row_html = render_to_string(
+            "components/track_row.html",
+            {"track": item, "position": stats["track_count"] if stats else "", "is_manager": True},
         )
-        return JsonResponse({"message": "Track added successfully", "html": html})
+        success(request, "Track added successfully!")
+        return _track_update_response(request, "Track added successfully", result.snapshot_id, stats, row_html=row_html)
     except Exception as e:
         error(request, f"Failed to add track: {e!s}")
         return JsonResponse({"error": str(e)}, status=400)
 
 
+def _posted_track_uris(request: HttpRequest) -> list[str]:
+    """Read track ids/URIs from a JSON body, repeated form fields or a newline separated list."""
+    if request.content_type == "application/json":
+        values = json.loads(request.body or b"{}").get("track_uris", [])
+    else:
+        values = request.POST.getlist("track_uris")
+        if len(values) == 1:
+            values = values[0].split()
+    return [normalize_track_uri(value) for value in values if value and value.strip()]
+
+
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["POST"])
+def add_tracks(request: HttpRequest, playlist_id: str) -> JsonResponse:
+    """Add many tracks to a playlist in Spotify-sized batches."""
+    try:
+        uris = _posted_track_uris(request)
+    except (ValueError, AttributeError):
+        return JsonResponse({"error": "Invalid track list"}, status=400)
+    if not uris:
+        return JsonResponse({"error": "Missing required parameters"}, status=400)
+
+    spotify = get_spotify(request.session)
+    try:
+        result = add_tracks_in_batches(spotify, playlist_id, uris)
+    except Exception as e:
+        error(request, f"Failed to add tracks: {e!s}")
+        return JsonResponse({"error": str(e)}, status=400)
+
+    stats = None
+    if result.added and result.snapshot_id:
+        known = get_cached_tracks([track_id_from_uri(uri) for uri in result.added])
+        duration = sum(track["duration_ms"] for track in known.values())
+        stats = adjust_playlist_stats(playlist_id, result.snapshot_id, len(result.added), duration)
+        schedule_artist_index_for(spotify, playlist_id)
+
+    message = f"Added {len(result.added)} tracks"
+    if result.skipped:
+        message += f", skipped {len(result.skipped)} already in the playlist"
+    if result.failed:
+        message += f", {len(result.failed)} failed: {result.error}"
+    return JsonResponse(
+        {
+            "message": message,
+            "snapshot_id": result.snapshot_id,
+            "added": result.added,
+            "skipped": result.skipped,
+            "failed": result.failed,
+            "requests": result.requests,
+            "stats": display_stats(stats) if stats else None,
+        },
+        status=207 if result.failed and result.added else 400 if result.failed else 200,
+    )
+
+
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["POST"])
+def sync_tracks(request: HttpRequest, playlist_id: str) -> JsonResponse:
+    """Make a playlist match the posted track list exactly, writing only the differences.
+
+    ``?dry_run=1`` only reports the plan. ``?replace=1`` allows rewriting the whole playlist when
+    that takes far fewer requests, at the cost of every track's added date and author.
+    """
+    try:
+        uris = _posted_track_uris(request)
+    except (ValueError, AttributeError):
+        return JsonResponse({"error": "Invalid track list"}, status=400)
+    if not uris:
+        return JsonResponse({"error": "Missing required parameters"}, status=400)
+    dry_run = request.GET.get("dry_run") == "1"
+    allow_replace = request.GET.get("replace") == "1"
+
+    spotify = get_spotify(request.session)
+    try:
+        result = sync_playlist(spotify, playlist_id, uris, dry_run=dry_run, allow_replace=allow_replace)
+    except Exception as e:
+        error(request, f"Failed to sync playlist: {e!s}")
+        return JsonResponse({"error": str(e)}, status=400)
+
+    stats = None
+    if result.changed and not dry_run:
+        known = get_cached_tracks(list({track_id_from_uri(uri) for uri in uris}))
+        stats = adjust_playlist_stats(playlist_id, result.snapshot_id, result.inserted - result.removed, 0)
+        if stats and all(track_id_from_uri(uri) in known for uri in uris):
+            stats["duration_ms"] = sum(known[track_id_from_uri(uri)]["duration_ms"] for uri in uris)
+            set_playlist_stats(playlist_id, stats)
+
+    return JsonResponse(
+        {
+            "data": {
+                "snapshot_id": result.snapshot_id,
+                "removed": result.removed,
+                "moved": result.moved,
+                "inserted": result.inserted,
+                "replaced": result.replaced,
+                "requests": result.requests,
+                "dry_run": dry_run,
+                "stats": display_stats(stats) if stats else None,
+            }
+        }
+    )
+
+
+def _serialize_snapshot(snapshot: PlaylistSnapshot) -> dict[str, Any]:
+    return {
+        "id": snapshot.id,
+        "snapshot_id": snapshot.snapshot_id,
+        "created_at": snapshot.created_at.isoformat(),
+        "track_count": snapshot.track_count,
+    }
+
+
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["GET"])
+def playlist_history(request: HttpRequest, playlist_id: str) -> JsonResponse:
+    """List the recorded versions of a featured playlist, newest first."""
+    limit = clamp_page_size(request.GET.get("limit"))
+    snapshots = PlaylistSnapshot.objects.filter(playlist__spotify_id=playlist_id).defer("data")[:limit]
+    return JsonResponse({"data": {"snapshots": [_serialize_snapshot(s) for s in snapshots]}})
+
+
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["GET"])
+def snapshot_diff(request: HttpRequest, playlist_id: str, snapshot_pk: int) -> JsonResponse:
+    """Compare a recorded version against another one, by default the version before it."""
+    snapshots = PlaylistSnapshot.objects.filter(playlist__spotify_id=playlist_id)
+    snapshot = snapshots.filter(pk=snapshot_pk).first()
+    if snapshot is None:
+        return JsonResponse({"error": "Snapshot not found"}, status=404)
+
+    against = request.GET.get("against")
+    other = (
+        snapshots.filter(pk=against).first()
+        if against and against.isdigit()
+        else snapshots.filter(pk__lt=snapshot.pk).first()
+    )
+    if other is None:
+        return JsonResponse({"error": "Nothing to compare against"}, status=404)
+
+    diff = snapshot.diff(other)
+    return JsonResponse(
+        {
+            "data": {
+                "snapshot": _serialize_snapshot(snapshot),
+                "against": _serialize_snapshot(other),
+                "added": diff.added,
+                "removed": diff.removed,
+                "reordered": diff.reordered,
+            }
+        }
+    )
+
+
 @require_permissions(Permission.MANAGE_PLAYLIST)
 @require_http_methods(["POST"])
-def remove_track(request: HttpRequest) -> JsonResponse:
-    """Remove a track from a playlist."""
+def rollback_playlist(request: HttpRequest, playlist_id: str, snapshot_pk: int) -> JsonResponse:
+    """Bring a playlist back to a recorded version through the sync engine."""
+    snapshot = PlaylistSnapshot.objects.filter(playlist__spotify_id=playlist_id, pk=snapshot_pk).first()
+    if snapshot is None:
+        return JsonResponse({"error": "Snapshot not found"}, status=404)
+
+    spotify = get_spotify(request.session)
+    try:
+        result = sync_playlist(spotify, playlist_id, [normalize_track_uri(t) for t in snapshot.spotify_ids()])
+    except Exception as e:
+        error(request, f"Failed to roll back playlist: {e!s}")
+        return JsonResponse({"error": str(e)}, status=400)
+
+    success(request, "Playlist rolled back successfully!")
+    return JsonResponse({"data": {"snapshot_id": result.snapshot_id, "requests": result.requests}})
+
+
+def _export_response(
+    request: HttpRequest, rows: Iterator[dict[str, Any]], export_format: str, filename: str, offset: int
+) -> StreamingHttpResponse:
+    """Stream export rows in the requested format, gzipped when the client accepts it."""
+    # A resumed export continues an existing file, which already has its header
+    chunks = stream_csv(rows, header=offset == 0) if export_format == "csv" else stream_ndjson(rows)
+
+    if accepts_encoding(request, "gzip"):
+        response = StreamingHttpResponse(stream_gzip(chunks), content_type=EXPORT_FORMATS[export_format])
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = StreamingHttpResponse(batch_chunks(chunks), content_type=EXPORT_FORMATS[export_format])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{export_format}"'
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
+def _export_params(request: HttpRequest) -> tuple[str, int]:
+    """Read the export format and resume offset.
+
+    Raises:
+        ValueError: If either is invalid
+    """
+    export_format = request.GET.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported format: {export_format}")
+    offset = int(request.GET.get("offset", 0))
+    if offset < 0:
+        raise ValueError("Offset must not be negative")
+    return export_format, offset
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def export_playlist(request: HttpRequest, playlist_id: str) -> HttpResponse:
+    """Stream every track of a playlist as CSV or JSON Lines."""
+    try:
+        export_format, offset = _export_params(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    spotify = get_spotify(request.session)
+    rows = iter_export_rows(spotify, playlist_id, offset)
+    return _export_response(request, rows, export_format, f"playlist-{playlist_id}", offset)
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def export_featured(request: HttpRequest) -> HttpResponse:
+    """Stream the tracks of every active featured playlist as CSV or JSON Lines."""
+    try:
+        export_format, offset = _export_params(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    spotify = get_spotify(request.session)
+    # Ordered by id so the row offset of a resumed export points at the same place
+    playlist_ids = FeaturedPlaylist.objects.filter(is_active=True).order_by("id").values_list("spotify_id", flat=True)
+    rows = iter_export_rows_for_playlists(spotify, playlist_ids.iterator(), offset)
+    return _export_response(request, rows, export_format, "featured-playlists", offset)
+
+
+def _serialize_import(job: ImportJob) -> dict[str, Any]:
+    return {
+        "id": job.id,
+        "playlist_id": job.playlist_id,
+        "status": job.status,
+        "rows": job.rows,
+        "added": job.added,
+        "skipped": job.skipped,
+        "unresolved": job.unresolved,
+        "failed": job.failed,
+        "snapshot_id": job.snapshot_id,
+        "error": job.error,
+        "finished": job.is_finished,
+    }
+
+
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["POST"])
+def import_tracks(request: HttpRequest, playlist_id: str) -> JsonResponse:
+    """Start a background import of a CSV, JSON Lines or plain list of track URIs/ISRCs."""
+    upload = request.FILES.get("file")
+    if upload is None:
+        return JsonResponse({"error": "Missing required parameters"}, status=400)
+
+    job = ImportJob.objects.create(user=request.user, playlist_id=playlist_id, filename=upload.name or "")
+    start_import(job, get_background_spotify(request.session), upload)
+    return JsonResponse({"data": _serialize_import(job)}, status=202)
+
+
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["GET"])
+def import_status(request: HttpRequest, job_id: int) -> JsonResponse:
+    """Report the progress of one of the user's imports."""
+    job = ImportJob.objects.filter(pk=job_id, user=request.user).first()
+    if job is None:
+        return JsonResponse({"error": "Import not found"}, status=404)
+    if fail_stale_imports(ImportJob.objects.filter(pk=job.pk)):
+        job.refresh_from_db()
+    return JsonResponse({"data": _serialize_import(job)})
+
+
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["POST"])
+def remove_track(request: HttpRequest, playlist_id: str) -> HttpResponse:
+    """Remove every occurrence of a track from a playlist."""
     spotify = get_spotify(request.session)
     track_id = request.POST.get("track_id")
-    playlist_id = request.POST.get("playlist_id")
 
-    if not all([track_id, playlist_id]):
+    if not track_id:
         return JsonResponse({"error": "Missing required parameters"}, status=400)
 
     try:
-        spotify.playlist_remove_all_occurrences_of_items(playlist_id, [track_id])
+        track = get_track(spotify, track_id)
+        # Counted in the current version of the playlist to keep the cached stats in step, usually
+        # without reading the track list again
+        _, uris = get_playlist_track_uris(spotify, playlist_id)
+        occurrences = uris.count(track["uri"])
+        result = playlist_writes.submit(spotify, playlist_id, "remove", track["uri"], owner=str(request.user.pk))
+        if not result.ok or result.snapshot_id is None:
+            error(request, f"Failed to remove track: {result.error}")
+            return JsonResponse({"error": result.error}, status=400)
+        stats = adjust_playlist_stats(
+            playlist_id, result.snapshot_id, -occurrences, -occurrences * track["duration_ms"]
+        )
+        schedule_artist_index_for(spotify, playlist_id)
         success(request, "Track removed successfully!")
-        return JsonResponse({"message": "Track removed successfully"})
+        return _track_update_response(
+            request,
+            "Track removed successfully",
+            result.snapshot_id,
+            stats,
+            trigger={"trackRemoved": {"trackId": track["id"], "snapshotId": result.snapshot_id}},
+        )
     except Exception as e:
         error(request, f"Failed to remove track: {e!s}")
         return JsonResponse({"error": str(e)}, status=400)
 
 
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["GET"])
+def playlist_duplicates(request: HttpRequest, playlist_id: str) -> HttpResponse:
+    """Find duplicate tracks in a featured playlist.
+
+    Tracks are always matched by id. ``isrc=1`` also matches the same recording on other releases,
+    ``title=1`` tracks with the same title and artists once case, punctuation and suffixes like
+    "Remastered" are ignored.
+    """
+    if not FeaturedPlaylist.objects.filter(spotify_id=playlist_id).exists():
+        return JsonResponse({"error": "Playlist not found"}, status=404)
+    by_isrc = request.GET.get("isrc") == "1"
+    by_title = request.GET.get("title") == "1"
+
+    spotify = get_spotify(request.session)
+    try:
+        groups = scan_playlist(spotify, playlist_id, by_isrc=by_isrc, by_title=by_title)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if request.headers.get("HX-Request"):
+        return render(request, "components/duplicates.html", {"groups": groups, "playlist_id": playlist_id})
+    return JsonResponse(
+        {
+            "data": [
+                {
+                    "reason": group.reason,
+                    "items": [
+                        {"uri": item.uri, "position": item.position, "name": item.name, "artists": item.artists}
+                        for item in group.items
+                    ],
+                }
+                for group in groups
+            ]
+        }
+    )
+
+
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["POST"])
+def remove_duplicates(request: HttpRequest, playlist_id: str) -> JsonResponse:
+    """Remove chosen occurrences of tracks by position, leaving every other occurrence in place.
+
+    Expects ``{"items": [{"uri": ..., "position": ...}]}`` with positions as returned by
+    ``playlist_duplicates``. Nothing is removed if any of them no longer holds its track.
+    """
+    try:
+        posted = json.loads(request.body)["items"]
+        items = [(normalize_track_uri(item["uri"]), int(item["position"])) for item in posted]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Invalid track list"}, status=400)
+    if not items:
+        return JsonResponse({"error": "Missing required parameters"}, status=400)
+    if not FeaturedPlaylist.objects.filter(spotify_id=playlist_id).exists():
+        return JsonResponse({"error": "Playlist not found"}, status=404)
+
+    spotify = get_spotify(request.session)
+    try:
+        result = remove_positions(spotify, playlist_id, items)
+    except PlaylistChangedError as e:
+        return JsonResponse({"error": str(e)}, status=409)
+    except Exception as e:
+        error(request, f"Failed to remove duplicates: {e!s}")
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # A position posted twice is only removed once
+    removed = {position: uri for uri, position in items}
+    known = get_cached_tracks(list({track_id_from_uri(uri) for uri in removed.values()}))
+    duration = sum(
+        known[track_id]["duration_ms"] for uri in removed.values() if (track_id := track_id_from_uri(uri)) in known
+    )
+    stats = adjust_playlist_stats(playlist_id, result.snapshot_id, -result.removed, -duration)
+    success(request, f"Removed {result.removed} duplicate tracks")
+    return JsonResponse(
+        {
+            "data": {
+                "snapshot_id": result.snapshot_id,
+                "removed": result.removed,
+                "requests": result.requests,
+                "stats": display_stats(stats) if stats else None,
+            }
+        }
+    )
+
+
+def _suggestion_queue_response(request: HttpRequest, playlist: FeaturedPlaylist, status: int = 200) -> HttpResponse:
+    """Render a page of a playlist's ranked suggestions, as a fragment for HTMX or as JSON."""
+    queue = get_queue(playlist.pk)
+    try:
+        offset = max(0, int(request.GET.get("offset", 0)))
+    except ValueError:
+        offset = 0
+    page = queue.page(offset, clamp_page_size(request.GET.get("limit")))
+    mine = user_votes(request.user.pk, [suggestion.id for suggestion in page])
+
+    if request.headers.get("HX-Request"):
+        is_manager = request.user.has_permission(Permission.MANAGE_PLAYLIST) and _is_playlist_manager(
+            request, PlaylistManager.get_active_managers(playlist.pk)
+        )
+        return render(
+            request,
+            "components/suggestions.html",
+            {
+                "playlist": playlist,
+                "suggestions": [(suggestion, mine.get(suggestion.id, 0)) for suggestion in page],
+                "is_manager": is_manager,
+                "can_suggest": request.user.has_permission(Permission.SUGGEST),
+                "can_vote": request.user.has_permission(Permission.VOTE),
+            },
+            status=status,
+        )
+    return JsonResponse(
+        {
+            "data": {
+                "total": len(queue),
+                "suggestions": [
+                    {
+                        "id": suggestion.id,
+                        "uri": suggestion.track_uri,
+                        "name": suggestion.track_name,
+                        "artists": suggestion.artists,
+                        "suggested_by": suggestion.suggested_by,
+                        "score": suggestion.score,
+                        "my_vote": mine.get(suggestion.id, 0),
+                    }
+                    for suggestion in page
+                ],
+            }
+        },
+        status=status,
+    )
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def suggestion_queue(request: HttpRequest, playlist_id: int) -> HttpResponse:
+    """Pending suggestions of a featured playlist, most votes first."""
+    playlist = FeaturedPlaylist.objects.filter(pk=playlist_id, is_active=True).first()
+    if playlist is None:
+        return JsonResponse({"error": "Playlist not found"}, status=404)
+    return _suggestion_queue_response(request, playlist)
+
+
+@require_permissions(Permission.SUGGEST)
+@require_http_methods(["POST"])
+def add_suggestion(request: HttpRequest, playlist_id: int) -> HttpResponse:
+    """Propose a track for a featured playlist."""
+    track_id = request.POST.get("track_id", "").strip()
+    if not track_id:
+        return JsonResponse({"error": "Missing required parameters"}, status=400)
+    playlist = FeaturedPlaylist.objects.filter(pk=playlist_id, is_active=True).first()
+    if playlist is None:
+        return JsonResponse({"error": "Playlist not found"}, status=404)
+
+    spotify = get_spotify(request.session)
+    try:
+        track = get_track(spotify, track_id)
+    except Exception as e:
+        return JsonResponse({"error": f"Track not found: {e!s}"}, status=400)
+    try:
+        suggest_track(playlist, request.user, track)
+    except IntegrityError:
+        return JsonResponse({"error": "This track has already been suggested"}, status=409)
+    return _suggestion_queue_response(request, playlist, status=201)
+
+
+@require_permissions(Permission.VOTE)
+@require_http_methods(["POST"])
+def vote_suggestion(request: HttpRequest, suggestion_id: int) -> HttpResponse:
+    """Vote for (1) or against (-1) a pending suggestion, or take a vote back (0)."""
+    try:
+        value = int(request.POST.get("value", ""))
+    except ValueError:
+        return JsonResponse({"error": "Invalid vote"}, status=400)
+    suggestion = TrackSuggestion.objects.filter(pk=suggestion_id, status="pending").select_related("playlist").first()
+    if suggestion is None:
+        return JsonResponse({"error": "Suggestion not found"}, status=404)
+
+    try:
+        score = cast_vote(suggestion, request.user.pk, value)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if score is None:
+        return JsonResponse({"error": "Suggestion not found"}, status=404)
+    if request.headers.get("HX-Request"):
+        return _suggestion_queue_response(request, suggestion.playlist)
+    return JsonResponse({"data": {"id": suggestion.pk, "score": score, "my_vote": value}})
+
+
+@require_permissions(Permission.MANAGE_PLAYLIST)
+@require_http_methods(["POST"])
+def moderate_suggestion(request: HttpRequest, suggestion_id: int) -> HttpResponse:
+    """Accept a suggestion, adding its track to the playlist, or reject it."""
+    action = request.POST.get("action")
+    if action not in ("accept", "reject"):
+        return JsonResponse({"error": "Action must be accept or reject"}, status=400)
+    suggestion = TrackSuggestion.objects.filter(pk=suggestion_id, status="pending").select_related("playlist").first()
+    if suggestion is None:
+        return JsonResponse({"error": "Suggestion not found"}, status=404)
+    playlist = suggestion.playlist
+    if not _is_playlist_manager(request, PlaylistManager.get_active_managers(playlist.pk)):
+        return HttpResponseForbidden("Only managers of this playlist can review its suggestions")
+
+    if action == "accept":
+        spotify = get_spotify(request.session)
+        try:
+            track = get_track(spotify, suggestion.track_uri)
+            result = playlist_writes.submit(
+                spotify, playlist.spotify_id, "add", track["uri"], owner=str(request.user.pk)
+            )
+        except Exception as e:
+            error(request, f"Failed to add track: {e!s}")
+            return JsonResponse({"error": str(e)}, status=400)
+        if not result.ok or result.snapshot_id is None:
+            error(request, f"Failed to add track: {result.error}")
+            return JsonResponse({"error": result.error}, status=400)
+        if not result.superseded:
+            adjust_playlist_stats(playlist.spotify_id, result.snapshot_id, 1, track["duration_ms"])
+            schedule_artist_index(spotify, playlist)
+
+    review_suggestion(suggestion, request.user, accepted=action == "accept")
+    return _suggestion_queue_response(request, playlist)
+
+
 @require_permissions(Permission.SEARCH)
 @require_http_methods(["GET"])
 def search_tracks(request: HttpRequest) -> HttpResponse | JsonResponse:
@@ -190,6 +1082,10 @@ def search_tracks(request: HttpRequest) -> HttpResponse | JsonResponse:
 
     spotify = get_spotify(request.session)
     results = spotify.search(q=q, type="track", limit=5)
+    # Keep the full track objects so adding one of them later needs no extra lookup
+    cache_tracks(results["tracks"]["items"])
+    remember_tracks(results["tracks"]["items"])
+    record_query(q, str(request.user.pk))
 
     # Get user's playlists
     current_user = spotify.current_user()
@@ -215,6 +1111,16 @@ def search_tracks(request: HttpRequest) -> HttpResponse | JsonResponse:
     return JsonResponse({"tracks": tracks, "playlists": playlists})
 
 
+@require_permissions(Permission.SEARCH)
+@require_http_methods(["GET"])
+def autocomplete_search(request: HttpRequest) -> JsonResponse:
+    """Suggest completions for a partial query from names this worker already knows."""
+    q = request.GET.get("q", "")
+    limit = clamp_page_size(request.GET.get("limit"), default=AUTOCOMPLETE_LIMIT)
+    suggestions = [{"text": s.text, "kind": s.kind} for s in autocomplete(q, limit)]
+    return JsonResponse({"data": {"suggestions": suggestions}})
+
+
 @require_http_methods(["GET"])
 def privacy(request: HttpRequest) -> HttpResponse:
     """Render privacy policy page."""
@@ -263,7 +1169,6 @@ def manage_playlists(request: HttpRequest) -> HttpResponse:
     """Consolidated view for playlist management."""
     context: dict[str, Any] = {
         "site_featured": None,
-        "community_featured": [],
         "user_playlists": [],
         "available_playlists": [],
     }
@@ -275,14 +1180,13 @@ def manage_playlists(request: HttpRequest) -> HttpResponse:
 
             # Get featured playlists with fresh data from Spotify
             context["site_featured"] = FeaturedPlaylist.get_site_featured()
-            context["community_featured"] = FeaturedPlaylist.get_community_featured()
 
             if request.user.has_permissions(Permission.CREATE_FEATURED):
                 playlists = spotify.current_user_playlists()  # Get user's playlists
                 context["user_playlists"] = playlists["items"]
 
                 if request.user.has_permissions(Permission.MANAGE_FEATURED):
-                    featured_ids = {p.spotify_id for p in FeaturedPlaylist.objects.filter(is_active=True)}
+                    featured_ids = FeaturedPlaylist.get_active_spotify_ids()
                     context["available_playlists"] = [p for p in playlists["items"] if p["id"] not in featured_ids]
 
         except Exception as e:
@@ -335,6 +1239,7 @@ def feature_community_playlist(request: HttpRequest, playlist_id: str) -> JsonRe
             FeaturedPlaylist.objects.filter(featured_type="site", is_active=True).update(
                 is_active=False, unfeatured_date=timezone.now()
             )
+            FeaturedPlaylist.invalidate_cache()
 
         # Create new featured playlist
         featured = FeaturedPlaylist.objects.create(
@@ -349,6 +1254,8 @@ def feature_community_playlist(request: HttpRequest, playlist_id: str) -> JsonRe
 
         # Create initial playlist manager entry for the creator
         PlaylistManager.objects.create(playlist=featured, user=request.user, is_active=True)
+        schedule_artist_index(spotify, featured)
+        schedule_signature_update(spotify, featured)
 
         success_msg = f"'{playlist['name']}' is now featured as a {feature_type} playlist!"
         messages.success(request, success_msg)
@@ -412,13 +1319,18 @@ def remove_playlist_manager(request: HttpRequest, playlist_id: int) -> JsonRespo
     return JsonResponse({"error": message}, status=400)
 
 
+def _managers_etag(request: HttpRequest, playlist_id: int) -> str:
+    return _etag(playlist_id, PlaylistManager.version(playlist_id))
+
+
 @require_permissions(Permission.MANAGE_USERS)
 @require_http_methods(["GET"])
+@revalidate(_managers_etag)
 def get_playlist_managers(request: HttpRequest, playlist_id: int) -> JsonResponse:
     """Get all managers for a playlist."""
     try:
         managers = PlaylistManager.get_active_managers(playlist_id)
-        return JsonResponse({"managers": [{"user_id": m.user_id, "added_date": m.added_date} for m in managers]})
+        return JsonResponse({"managers": [{"user_id": m.user_id, "added_date": m.created_at} for m in managers]})
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
 
@@ -459,10 +1371,40 @@ def profile(request: HttpRequest) -> HttpResponse:
         return redirect("pyjams:index")
 
 
+@require_permissions(Permission.MODERATE)
+@require_http_methods(["GET"])
+def analytics(request: HttpRequest) -> HttpResponse:
+    """Site wide numbers over every active featured playlist, for moderators."""
+    # Refreshing only uses stored snapshots and cached track metadata, the management command can
+    # also fill in what is missing from Spotify
+    report = get_report(refresh=request.GET.get("refresh") == "1")
+    if request.GET.get("format") == "json":
+        return JsonResponse({"data": report})
+
+    summary = [
+        ("Playlists", report["playlists"]),
+        ("Tracks", report["tracks"]),
+        ("Explicit", f"{report['explicit_ratio']:.0%}"),
+        ("Median popularity", f"{report['popularity_percentiles'].get('p50', 0):.0f}"),
+    ]
+    durations = [("mean", format_duration(int(report["duration"]["mean_ms"])))] + [
+        (name, format_duration(int(value))) for name, value in report["duration"]["percentiles_ms"].items()
+    ]
+    return render(request, "analytics.html", {"report": report, "summary": summary, "durations": durations})
+
+
+def _search_playlists_etag(request: HttpRequest) -> str | None:
+    if request.GET.get("refresh", "false").lower() == "true":
+        return None
+    version = get_library_version(request.user.spotify_id or str(request.user.pk))
+    return _etag(version, request.GET.get("q", "").strip()) if version else None
+
+
 @require_permissions(Permission.VIEW)
 @require_http_methods(["GET"])
+@revalidate(_search_playlists_etag)
 def search_playlists(request: HttpRequest) -> JsonResponse:
-    """Search for playlists and get recent playlists.
+    """Search the user's whole playlist library, or list their most recent playlists.
 
     Returns top 5 user playlists when no query is provided.
     """
@@ -471,37 +1413,142 @@ def search_playlists(request: HttpRequest) -> JsonResponse:
     spotify = get_spotify(request.session)
 
     try:
-        # Get current user's playlists
-        current_user = spotify.current_user()
-
-        # Get user's playlists with a higher limit when explicitly refreshing
-        limit = 10 if refresh else 5
-        user_playlists = spotify.user_playlists(current_user["id"], limit=limit)
-
-        def format_playlist(p: dict[str, Any]) -> dict[str, Any]:
-            image_url = None
-            if p["images"] and len(p["images"]) > 0:
-                image_url = p["images"][0]["url"]
-
-            return {
-                "id": p["id"],
-                "name": p["name"],
-                "description": p.get("description", ""),
-                "image_url": image_url,
-                "tracks_total": p["tracks"]["total"],
-                "owner": p["owner"]["display_name"],
-                "is_public": p.get("public", False),
-            }
+        index = get_library_index(spotify, request.user.spotify_id or str(request.user.pk), refresh=refresh)
 
-        # Filter playlists if search query present
-        playlists = user_playlists["items"]
-        if len(q) >= 2:
-            playlists = [p for p in playlists if q.lower() in p["name"].lower()]
+        playlists = index.search(q) if len(q) >= 2 else index.entries[: 10 if refresh else 5]
 
-        search_results = [format_playlist(p) for p in playlists]
+        # The snapshot id is only used to keep the index current
+        search_results = [{k: v for k, v in p.items() if k != "snapshot_id"} for p in playlists]
 
         return JsonResponse({"data": {"search_results": search_results}})
 
     except Exception as e:
         error(request, f"Error searching playlists: {e!s}")
         return JsonResponse({"error": str(e)}, status=400)
+
+
+def _serialize_featured(playlist: FeaturedPlaylist) -> dict[str, Any]:
+    return {
+        "id": playlist.id,
+        "spotify_id": playlist.spotify_id,
+        "name": playlist.get_display_name(),
+        "description": playlist.description or "",
+        "image_url": playlist.image_url,
+        "featured_type": playlist.featured_type,
+        "featured_date": playlist.featured_date.isoformat(),
+        "unfeatured_date": playlist.unfeatured_date.isoformat() if playlist.unfeatured_date else None,
+        "creator": playlist.creator.display_name,
+    }
+
+
+def _featured_page_response(
+    request: HttpRequest, page_getter: Callable[..., KeysetPage[FeaturedPlaylist]], url_name: str
+) -> HttpResponse:
+    """Serve one keyset page of featured playlists as an HTMX fragment or JSON."""
+    cursor = request.GET.get("cursor") or None
+    limit = clamp_page_size(request.GET.get("limit"))
+    try:
+        page = page_getter(cursor=cursor, limit=limit)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if request.headers.get("HX-Request"):
+        return render(request, "components/featured_page.html", {"page": page, "page_url": reverse(url_name)})
+    return JsonResponse(
+        {
+            "data": {
+                "results": [_serialize_featured(p) for p in page.items],
+                "next_cursor": page.next_cursor,
+            }
+        }
+    )
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def search_featured(request: HttpRequest) -> JsonResponse:
+    """Ranked full-text search over every active featured playlist."""
+    q = request.GET.get("q", "").strip()
+    limit = clamp_page_size(request.GET.get("limit"))
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        return JsonResponse({"error": "Invalid page"}, status=400)
+    if len(q) < 2:
+        return JsonResponse({"data": {"results": [], "page": page, "has_next": False}})
+
+    playlists, has_next = FeaturedPlaylist.search(q, page=page, limit=limit)
+    return JsonResponse(
+        {"data": {"results": [_serialize_featured(p) for p in playlists], "page": page, "has_next": has_next}}
+    )
+
+
+@require_permissions(Permission.SEARCH)
+@require_http_methods(["GET"])
+def fuzzy_search(request: HttpRequest) -> JsonResponse:
+    """Typo tolerant matches among featured playlist names and recently seen tracks.
+
+    Cheap enough to call on every keystroke: nothing here asks Spotify.
+    """
+    q = request.GET.get("q", "").strip()
+    limit = clamp_page_size(request.GET.get("limit"), default=TRIGRAM_LIMIT)
+    try:
+        threshold = float(request.GET.get("threshold", TRIGRAM_THRESHOLD))
+    except ValueError:
+        return JsonResponse({"error": "Invalid threshold"}, status=400)
+    if not 0 < threshold <= 1:
+        return JsonResponse({"error": "Threshold must be above 0 and at most 1"}, status=400)
+    if len(q) < 2:
+        return JsonResponse({"data": {"playlists": [], "tracks": []}})
+
+    playlists = [
+        {**_serialize_featured(playlist), "similarity": round(score, 3)}
+        for playlist, score in FeaturedPlaylist.similar_to(q, threshold, limit)
+    ]
+    tracks = [
+        {
+            "id": track["id"],
+            "name": track["name"],
+            "artists": [artist["name"] for artist in track["artists"]],
+            "album": track["album"]["name"],
+            "similarity": round(score, 3),
+        }
+        for track, score in search_cached_tracks(q, threshold, limit)
+    ]
+    return JsonResponse({"data": {"playlists": playlists, "tracks": tracks}})
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def artist_playlists(request: HttpRequest, artist_id: str) -> JsonResponse:
+    """Featured playlists containing an artist, and who added the artist's tracks to them."""
+    usage = ArtistPlaylist.usage(track_id_from_uri(artist_id))
+    if usage is None:
+        return JsonResponse({"error": "Artist not found in any featured playlist"}, status=404)
+    return JsonResponse(
+        {
+            "data": {
+                "artist": {"id": usage.artist_id, "name": usage.artist_name},
+                "playlists": [
+                    {**_serialize_featured(playlist), "track_count": count} for playlist, count in usage.playlists
+                ],
+                "added_by": [{"spotify_id": user, "track_count": count} for user, count in usage.added_by],
+            }
+        }
+    )
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def community_featured(request: HttpRequest) -> HttpResponse:
+    """Page through active community featured playlists."""
+    return _featured_page_response(request, FeaturedPlaylist.get_community_featured_page, "pyjams:community_featured")
+
+
+@require_permissions(Permission.VIEW)
+@require_http_methods(["GET"])
+def site_featured_history(request: HttpRequest) -> HttpResponse:
+    """Page through previously site featured playlists."""
+    return _featured_page_response(
+        request, FeaturedPlaylist.get_previous_site_featured_page, "pyjams:site_featured_history"
+    )
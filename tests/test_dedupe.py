@@ -0,0 +1,49 @@
+from typing import Any
+
+from pyjams.utils.dedupe import find_duplicates, normalize_title
+
+
+def item(track_id: str, name: str = "Song", artists: tuple[str, ...] = ("Band",), isrc: str = "") -> dict[str, Any]:
+    return {
+        "track": {
+            "id": track_id,
+            "uri": f"spotify:track:{track_id}",
+            "name": name,
+            "artists": [{"name": artist} for artist in artists],
+            "external_ids": {"isrc": isrc} if isrc else {},
+        }
+    }
+
+
+def test_normalize_title() -> None:
+    assert normalize_title("Song (feat. Guest) - 2011 Remaster", ["B", "A"]) == normalize_title("song", ["a", "b"])
+    assert normalize_title("(What's the Story) Morning Glory?", ["Oasis"]) == "what s the story morning glory|oasis"
+
+
+def test_exact_duplicates_only_by_default() -> None:
+    items = [item("a"), item("b", isrc="X1"), item("a"), {"track": None}, item("c", isrc="X1"), item("a")]
+    groups = find_duplicates(items)
+    assert len(groups) == 1
+    assert groups[0].reason == "track"
+    assert [i.position for i in groups[0].items] == [0, 2, 5]
+    assert [i.position for i in groups[0].duplicates] == [2, 5]
+
+
+def test_isrc_and_title_keys() -> None:
+    items = [
+        item("a", "Hit", isrc="X1"),
+        item("b", "Hit - Remastered", isrc="X1"),
+        item("c", "Other", isrc="X2"),
+        item("d", "Other (Live)"),
+        item("e", "Other", artists=("Someone else",)),
+    ]
+    assert find_duplicates(items) == []
+
+    by_isrc = find_duplicates(items, by_isrc=True)
+    assert [(g.reason, [i.uri for i in g.items]) for g in by_isrc] == [("isrc", ["spotify:track:a", "spotify:track:b"])]
+
+    both = find_duplicates(items, by_isrc=True, by_title=True)
+    assert [(g.reason, g.keep.position, [i.position for i in g.duplicates]) for g in both] == [
+        ("isrc", 0, [1]),
+        ("title", 2, [3]),
+    ]
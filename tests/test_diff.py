@@ -0,0 +1,81 @@
+import random
+from collections.abc import Sequence
+from itertools import pairwise
+
+import pytest
+
+from pyjams.utils.diff import (
+    Insert,
+    Move,
+    Operation,
+    Remove,
+    diff_tracks,
+    longest_common_subsequence,
+    plan_removals,
+    plan_sync,
+)
+
+
+def apply(current: Sequence[str | None], operations: Sequence[Operation]) -> list[str | None]:
+    """Apply operations the way Spotify does."""
+    state = list(current)
+    for operation in operations:
+        if isinstance(operation, Remove):
+            for uri, position in operation.positions:
+                assert state[position] == uri
+                del state[position]
+        elif isinstance(operation, Move):
+            start, length = operation.range_start, operation.range_length
+            block = state[start : start + length]
+            del state[start : start + length]
+            at = operation.insert_before if operation.insert_before < start else operation.insert_before - length
+            state[at:at] = block
+        else:
+            state[operation.position : operation.position] = operation.uris
+    return state
+
+
+def test_lcs_length() -> None:
+    pairs = longest_common_subsequence(list("ABCBDAB"), list("BDCABA"))
+    assert len(pairs) == 4
+    assert all(i < i2 and j < j2 for (i, j), (i2, j2) in pairwise(pairs))
+
+
+def test_unchanged_playlist_needs_nothing() -> None:
+    tracks = [f"t{i}" for i in range(500)]
+    assert diff_tracks(tracks, tracks).is_empty
+    assert plan_sync(tracks, tracks) == []
+
+
+def test_batches_contiguous_changes() -> None:
+    current = [f"t{i}" for i in range(5000)]
+    target = current[:1000] + [f"new{i}" for i in range(250)] + current[1500:4000] + current[1000:1100]
+    operations = plan_sync(current, target)
+    assert apply(current, operations) == target
+    # 400 + 1000 removals, one move, 250 inserts
+    assert sum(isinstance(op, Remove) for op in operations) == 14
+    assert sum(isinstance(op, Move) for op in operations) == 1
+    assert sum(isinstance(op, Insert) for op in operations) == 3
+
+
+def test_unavailable_items_are_left_alone() -> None:
+    current = ["a", None, "b", "c"]
+    result = apply(current, plan_sync(current, ["c", "a", "d"]))
+    assert [uri for uri in result if uri is not None] == ["c", "a", "d"]
+    assert None in result
+
+
+def test_removals_by_position_keep_other_occurrences() -> None:
+    current = ["a", "b", "a", "c", "a"]
+    operations = plan_removals(current, [4, 2, 4], batch_size=1)
+    assert operations == [Remove([("a", 4)]), Remove([("a", 2)])]
+    assert apply(current, operations) == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_sync_reaches_target(seed: int) -> None:
+    rng = random.Random(seed)
+    pool = [f"t{i}" for i in range(30)]
+    current = [rng.choice(pool) for _ in range(rng.randint(0, 40))]
+    target = [rng.choice(pool) for _ in range(rng.randint(0, 40))]
+    assert apply(current, plan_sync(current, target, batch_size=3)) == target
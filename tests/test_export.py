@@ -0,0 +1,26 @@
+import gzip
+
+from pyjams.utils.export import stream_csv, stream_gzip
+
+ROW = {
+    "playlist_id": "p",
+    "position": 0,
+    "track_id": "t0",
+    "name": 'Comma, "quoted"',
+    "artists": "a, b",
+    "album": "al",
+    "duration_ms": 1000,
+    "added_at": None,
+    "added_by": None,
+}
+
+
+def test_resumed_csv_has_no_header() -> None:
+    assert "".join(stream_csv([ROW])).startswith("playlist_id,")
+    assert "".join(stream_csv([ROW], header=False)).startswith("p,0,t0,")
+
+
+def test_gzip_stream_round_trip() -> None:
+    rows = [{**ROW, "position": i} for i in range(5000)]
+    compressed = b"".join(stream_gzip(stream_csv(rows), batch_size=1024))
+    assert gzip.decompress(compressed).decode() == "".join(stream_csv(rows))
@@ -0,0 +1,23 @@
+import pytest
+from django.test import RequestFactory
+
+from pyjams.utils.handlers import accepts_encoding
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, GZIP;q=0.5", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000, br", False),
+        ("x-gzip", False),
+        ("*", True),
+        ("*, gzip;q=0", False),
+        ("identity", False),
+        ("", False),
+    ],
+)
+def test_accepts_encoding(header: str, expected: bool) -> None:
+    request = RequestFactory().get("/", headers={"Accept-Encoding": header})
+    assert accepts_encoding(request, "gzip") is expected
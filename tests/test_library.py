@@ -0,0 +1,59 @@
+import time
+from typing import Any
+from unittest.mock import Mock, patch
+
+from pyjams.utils import library
+from pyjams.utils.library import LibraryEntry, LibraryIndex
+
+
+def entry(i: int, name: str, description: str = "") -> LibraryEntry:
+    return {
+        "id": f"p{i}",
+        "name": name,
+        "description": description,
+        "image_url": None,
+        "tracks_total": 0,
+        "owner": "me",
+        "is_public": True,
+        "snapshot_id": "s",
+    }
+
+
+def playlist(i: int, name: str) -> dict[str, Any]:
+    return {
+        "id": f"p{i}",
+        "name": name,
+        "images": [],
+        "tracks": {"total": 0},
+        "owner": {"display_name": "me"},
+        "snapshot_id": "s",
+    }
+
+
+def test_prefix_search_ranks_name_matches_first() -> None:
+    index = LibraryIndex(
+        [
+            entry(0, "Road trip", "summer driving songs"),
+            entry(1, "Summer hits 2024"),
+            entry(2, "Winter"),
+            entry(3, "Summertime sadness covers"),
+        ]
+    )
+    assert [e["id"] for e in index.search("summ")] == ["p1", "p3", "p0"]
+    assert [e["id"] for e in index.search("summer son")] == ["p0"]
+    assert index.search("autumn") == []
+    assert [e["id"] for e in index.search("s", limit=1)] == ["p1"]
+
+
+def test_refresh_fetches_an_old_library_again() -> None:
+    spotify = Mock()
+    spotify.current_user_playlists.return_value = {"total": 1, "items": [playlist(0, "Old name")]}
+    library.get_library_index(spotify, "user-1")
+
+    # A rename beyond the first page leaves page one as it was
+    spotify.current_user_playlists.return_value = {"total": 1, "items": [playlist(0, "New name")]}
+    assert library.get_library_index(spotify, "user-1", refresh=True).search("new") == []
+
+    with patch.object(library.time, "time", return_value=time.time() + library.LIBRARY_MAX_AGE + 1):
+        index = library.get_library_index(spotify, "user-1", refresh=True)
+    assert [e["name"] for e in index.search("new")] == ["New name"]
@@ -0,0 +1,106 @@
+from typing import Any
+
+from django.core.cache import cache
+
+from pyjams.utils.live import LiveBroker, LiveEvent
+
+# The loop never calls Spotify itself, only the fake fetch
+spotify: Any = None
+
+
+class FakePlaylists:
+    def __init__(self) -> None:
+        self.versions = {"p1": ("s1", ["a", "b", "b"])}
+        self.calls = 0
+
+    def __call__(self, spotify: Any, playlist_id: str) -> tuple[str, list[str | None]]:
+        self.calls += 1
+        snapshot_id, uris = self.versions[playlist_id]
+        return snapshot_id, list(uris)
+
+
+def drain(broker: LiveBroker, subscription: Any) -> list[tuple[str, dict[str, Any]]]:
+    events = []
+    while not subscription.queue.empty():
+        event: LiveEvent = subscription.queue.get()
+        events.append((event.event, event.data))
+    return events
+
+
+def test_one_check_fans_out_to_every_viewer() -> None:
+    playlists = FakePlaylists()
+    broker = LiveBroker(fetch=playlists, poll_interval=None, max_streams=2)
+    first = broker.subscribe("p1", spotify=spotify, snapshot_id="s1")
+    second = broker.subscribe("p1", spotify=spotify, snapshot_id="s1")
+    assert first and second
+
+    broker.poll()
+    assert playlists.calls == 1
+    assert drain(broker, first) == []
+
+    playlists.versions["p1"] = ("s2", ["b", "c", "c"])
+    broker.poll()
+    assert playlists.calls == 2
+    expected = [
+        ("added", {"uris": ["c", "c"]}),
+        ("removed", {"uris": ["a", "b"]}),
+        ("snapshot", {"snapshot_id": "s2", "previous": "s1", "track_count": 3}),
+    ]
+    assert drain(broker, first) == expected
+    assert drain(broker, second) == expected
+
+    # Writes published from here are announced once, the next check finds nothing new
+    assert broker.publish("p1", "s3", ["b"], previous_uris=["b", "c", "c"])
+    playlists.versions["p1"] = ("s3", ["b"])
+    broker.poll()
+    assert [name for name, _ in drain(broker, first)] == ["removed", "snapshot"]
+
+
+def test_stale_viewer_and_reconnect_replay() -> None:
+    playlists = FakePlaylists()
+    broker = LiveBroker(fetch=playlists, poll_interval=None, max_streams=1)
+    stale = broker.subscribe("p1", spotify=spotify, snapshot_id="s0")
+    assert stale is not None
+    assert broker.subscribe("p1", spotify=spotify) is None
+
+    broker.poll()
+    assert drain(broker, stale) == [("snapshot", {"snapshot_id": "s1", "previous": "s0", "track_count": 3})]
+    broker.unsubscribe(stale)
+    assert broker.stream_count == 0
+
+    broker.publish("p1", "s2", ["a"])
+    again = broker.subscribe("p1", spotify=spotify, last_event_id="1")
+    assert again is not None
+    assert [(event.id, event.event) for event in again.replay] == [(2, "removed"), (3, "snapshot")]
+
+    stream = broker.stream(again, duration=0)
+    assert next(stream) == "retry: 3000\n\n"
+    assert next(stream).startswith("id: 2\nevent: removed\ndata: ")
+    assert next(stream).startswith("id: 3\nevent: snapshot\n")
+    assert list(stream) == []
+    assert broker.stream_count == 0
+
+
+def test_writes_reach_viewers_on_other_workers() -> None:
+    playlists = FakePlaylists()
+    playlists.versions["p2"] = ("s1", ["a"])
+    writer = LiveBroker(fetch=playlists, poll_interval=None, max_streams=1)
+    viewer = LiveBroker(fetch=playlists, poll_interval=None, max_streams=1)
+    subscription = viewer.subscribe("p2", spotify=spotify, snapshot_id="s1")
+    assert subscription is not None
+    try:
+        # The writing worker has no viewers of its own
+        writer.announce("p2", "s2", ["a", "b"], previous_uris=["a"])
+        assert drain(viewer, subscription) == []
+
+        # Picked up from the shared cache, even while Spotify can't be asked
+        del playlists.versions["p2"]
+        viewer.poll()
+        assert drain(viewer, subscription) == [
+            ("added", {"uris": ["b"]}),
+            ("snapshot", {"snapshot_id": "s2", "previous": "s1", "track_count": 2}),
+        ]
+        viewer.poll()
+        assert drain(viewer, subscription) == []
+    finally:
+        cache.delete("pyjams:live:p2")
@@ -0,0 +1,35 @@
+from pyjams.utils import minhash
+
+
+def tracks(prefix: str, count: int) -> list[str]:
+    return [f"{prefix}{i}" for i in range(count)]
+
+
+def test_similarity_estimates_jaccard() -> None:
+    base = tracks("t", 1000)
+    half = minhash.signature(base[:500] + tracks("x", 500))
+    full = minhash.signature(base)
+    assert full is not None and half is not None
+    # Jaccard of the two sets is 1/3, 128 permutations estimate it within a few percent
+    assert abs(minhash.similarity(full, half) - 1 / 3) < 0.1
+    shuffled = minhash.signature(reversed(base))
+    unrelated = minhash.signature(tracks("y", 1000))
+    assert shuffled is not None and unrelated is not None
+    assert minhash.similarity(full, shuffled) == 1.0
+    assert minhash.similarity(full, unrelated) < 0.05
+
+
+def test_round_trip_and_bands() -> None:
+    sig = minhash.signature(tracks("t", 50))
+    assert sig is not None
+    data = minhash.to_bytes(sig)
+    assert len(data) == minhash.MINHASH_PERMUTATIONS * 4
+    assert (minhash.from_bytes(data) == sig).all()
+
+    buckets = minhash.band_buckets(sig)
+    assert len(buckets) == minhash.LSH_BANDS
+    assert all(0 <= bucket < 2**63 for bucket in buckets)
+    again = minhash.signature(tracks("t", 50))
+    assert again is not None
+    assert minhash.band_buckets(again) == buckets
+    assert minhash.signature([]) is None
@@ -0,0 +1,114 @@
+import threading
+from typing import Any
+
+from spotipy.exceptions import SpotifyException
+
+from pyjams.utils.mutations import PlaylistWriteQueue
+
+
+class FakeSpotify:
+    def __init__(self, conflicts: int = 0) -> None:
+        self.calls: list[tuple[str, list[str]]] = []
+        self.snapshot = 0
+        self.conflicts = conflicts
+
+    def _next(self) -> dict[str, Any]:
+        self.snapshot += 1
+        return {"snapshot_id": f"s{self.snapshot}"}
+
+    def playlist(self, playlist_id: str, fields: str | None = None) -> dict[str, Any]:
+        return {"snapshot_id": f"s{self.snapshot}"}
+
+    def playlist_add_items(self, playlist_id: str, items: list[str]) -> dict[str, Any]:
+        self.calls.append(("add", items))
+        return self._next()
+
+    def playlist_remove_all_occurrences_of_items(
+        self, playlist_id: str, items: list[str], snapshot_id: str | None = None
+    ) -> dict[str, Any]:
+        if self.conflicts:
+            self.conflicts -= 1
+            raise SpotifyException(409, -1, "snapshot conflict")
+        self.calls.append(("remove", items))
+        return self._next()
+
+
+def submit_concurrently(queue: PlaylistWriteQueue, spotify: FakeSpotify, writes: list[tuple[str, str]]) -> list[Any]:
+    """Submit writes from separate threads while the leader is held inside its window."""
+    release = threading.Event()
+
+    def hold(_: float) -> None:
+        release.wait(5)
+
+    queue._sleep = hold
+    results: list[Any] = [None] * len(writes)
+
+    def run(index: int, kind: str, uri: str) -> None:
+        results[index] = queue.submit(spotify, "playlist", kind, uri, owner="user")  # type: ignore[arg-type]
+
+    threads = []
+    for index, (kind, uri) in enumerate(writes):
+        thread = threading.Thread(target=run, args=(index, kind, uri))
+        thread.start()
+        threads.append(thread)
+        # Keep submission order deterministic
+        while len(queue._pending.get("playlist", [])) <= index:
+            pass
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+class TestPlaylistWriteQueue:
+    def test_concurrent_adds_share_one_call(self) -> None:
+        spotify = FakeSpotify()
+        results = submit_concurrently(PlaylistWriteQueue(), spotify, [("add", f"spotify:track:{i}") for i in range(3)])
+        assert spotify.calls == [("add", ["spotify:track:0", "spotify:track:1", "spotify:track:2"])]
+        assert all(r.ok and r.snapshot_id == "s1" and r.batch_size == 3 for r in results)
+
+    def test_keeps_order_between_kinds(self) -> None:
+        spotify = FakeSpotify()
+        submit_concurrently(
+            PlaylistWriteQueue(),
+            spotify,
+            [("add", "spotify:track:a"), ("remove", "spotify:track:b"), ("add", "spotify:track:c")],
+        )
+        assert spotify.calls == [
+            ("add", ["spotify:track:a"]),
+            ("remove", ["spotify:track:b"]),
+            ("add", ["spotify:track:c"]),
+        ]
+
+    def test_add_superseded_by_remove_is_dropped(self) -> None:
+        spotify = FakeSpotify()
+        results = submit_concurrently(
+            PlaylistWriteQueue(), spotify, [("add", "spotify:track:a"), ("remove", "spotify:track:a")]
+        )
+        assert spotify.calls == [("remove", ["spotify:track:a"])]
+        assert results[0].superseded and not results[1].superseded
+        assert results[0].ok and results[0].snapshot_id == results[1].snapshot_id == "s1"
+
+    def test_remove_retries_after_snapshot_conflict(self) -> None:
+        spotify = FakeSpotify(conflicts=1)
+        result = PlaylistWriteQueue(window=0).submit(spotify, "playlist", "remove", "spotify:track:a", owner="user")
+        assert result.ok
+        assert spotify.calls == [("remove", ["spotify:track:a"])]
+
+    def test_closed_batches_are_applied_in_order(self) -> None:
+        spotify = FakeSpotify()
+        queue = PlaylistWriteQueue(window=0)
+        threads = []
+        with queue.exclusive("playlist"):
+            # Both batches close while the playlist is held, then compete for it
+            for ticket, kind in enumerate(["add", "remove"], start=2):
+                thread = threading.Thread(
+                    target=queue.submit, args=(spotify, "playlist", kind, "spotify:track:a"), kwargs={"owner": "user"}
+                )
+                thread.start()
+                threads.append(thread)
+                while queue._turns["playlist"]._next_ticket < ticket:
+                    pass
+        for thread in threads:
+            thread.join(5)
+        assert spotify.calls == [("add", ["spotify:track:a"]), ("remove", ["spotify:track:a"])]
@@ -0,0 +1,24 @@
+import random
+
+from pyjams.utils.snapshots import decode_delta, decode_keyframe, encode_delta, encode_keyframe
+
+
+def test_keyframe_round_trip() -> None:
+    ids = [1, 2**32 - 1, 7, 7, 300]
+    assert decode_keyframe(encode_keyframe(ids)) == ids
+
+
+def test_small_edit_encodes_small() -> None:
+    previous = list(range(1, 5001))
+    ids = previous[:2000] + [9001, 9002] + previous[2100:] + previous[2000:2100]
+    delta = encode_delta(previous, ids)
+    assert decode_delta(previous, delta) == ids
+    assert len(delta) < 32
+
+
+def test_random_delta_round_trip() -> None:
+    rng = random.Random(0)
+    for _ in range(100):
+        previous = [rng.randint(1, 50) for _ in range(rng.randint(0, 60))]
+        ids = [rng.randint(1, 80) for _ in range(rng.randint(0, 60))]
+        assert decode_delta(previous, encode_delta(previous, ids)) == ids
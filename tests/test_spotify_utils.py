@@ -4,8 +4,10 @@ from unittest.mock import Mock, patch
 
 import pytest
 from django.contrib.sessions.backends.base import SessionBase
+from django.core.cache import cache
+from spotipy.exceptions import SpotifyException
 
-from pyjams.utils.spotify import SpotifySessionManager, TokenError, get_spotify
+from pyjams.utils.spotify import SpotifySessionManager, TokenError, add_tracks_in_batches, get_spotify
 
 
 @pytest.fixture
@@ -166,3 +168,49 @@ class TestGetSpotify:
         stored_token = mock_session._session["spotify_token"]
         assert stored_token["access_token"] == "refreshed_token"
         assert "expires_at" in stored_token
+
+
+def playlist_client(current: list[str]) -> Mock:
+    spotify = Mock()
+    spotify.playlist.return_value = {"snapshot_id": "s1"}
+    spotify.playlist_items.return_value = {"items": [{"track": {"uri": uri}} for uri in current], "next": None}
+    spotify.playlist_add_items.side_effect = lambda playlist_id, batch: {"snapshot_id": f"after-{batch[-1]}"}
+    return spotify
+
+
+def test_add_in_batches_skips_existing_and_repeated_tracks() -> None:
+    cache.clear()
+    spotify = playlist_client(["spotify:track:a"])
+    result = add_tracks_in_batches(spotify, "p1", ["spotify:track:a", "spotify:track:b", "spotify:track:b"])
+    assert result.added == ["spotify:track:b"]
+    assert result.skipped == ["spotify:track:a", "spotify:track:b"]
+    assert result.snapshot_id == "after-spotify:track:b"
+    spotify.playlist_add_items.assert_called_once_with("p1", ["spotify:track:b"])
+
+    # Without the check, only repeats within the request are dropped
+    result = add_tracks_in_batches(spotify, "p1", ["spotify:track:a", "spotify:track:a"], skip_existing=False)
+    assert result.added == ["spotify:track:a"]
+    assert result.skipped == ["spotify:track:a"]
+
+
+def test_add_in_batches_splits_at_the_spotify_limit() -> None:
+    cache.clear()
+    spotify = playlist_client([])
+    uris = [f"spotify:track:{i}" for i in range(250)]
+    result = add_tracks_in_batches(spotify, "p1", uris)
+    assert result.added == uris
+    assert result.requests == 3
+    assert [len(call.args[1]) for call in spotify.playlist_add_items.call_args_list] == [100, 100, 50]
+
+
+def test_add_in_batches_stops_at_the_first_failed_batch() -> None:
+    cache.clear()
+    spotify = playlist_client([])
+    spotify.playlist_add_items.side_effect = [{"snapshot_id": "s2"}, SpotifyException(429, -1, "Rate limited")]
+    uris = [f"spotify:track:{i}" for i in range(250)]
+    result = add_tracks_in_batches(spotify, "p1", uris)
+    assert result.added == uris[:100]
+    assert result.failed == uris[100:]
+    assert result.snapshot_id == "s2"
+    assert result.requests == 2
+    assert "Rate limited" in (result.error or "")
@@ -0,0 +1,18 @@
+from unittest.mock import Mock
+
+from django.core.cache import cache
+
+from pyjams.utils.tracks import get_playlist_version, set_playlist_stats
+
+
+def test_playlist_version_is_shared_and_follows_writes() -> None:
+    cache.clear()
+    spotify = Mock()
+    spotify.playlist.return_value = {"snapshot_id": "s1"}
+    assert get_playlist_version(spotify, "p1") == "s1"
+    assert get_playlist_version(spotify, "p1") == "s1"
+    spotify.playlist.assert_called_once_with("p1", fields="snapshot_id")
+
+    set_playlist_stats("p1", {"snapshot_id": "s2", "followers": 0, "track_count": 1, "duration_ms": 1000})
+    assert get_playlist_version(spotify, "p1") == "s2"
+    assert spotify.playlist.call_count == 1
@@ -0,0 +1,43 @@
+import pytest
+
+from pyjams.utils.trigrams import TrigramIndex, similarity, trigrams
+
+
+def test_trigrams_match_pg_trgm() -> None:
+    assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("a-b") == {"  a", " a ", "  b", " b "}
+    assert trigrams("  !! ") == frozenset()
+
+
+def test_similarity() -> None:
+    assert similarity("beatles", "Beatles") == 1.0
+    assert similarity("beatles", "beetles") == pytest.approx(0.4545, abs=1e-4)
+    assert similarity("beatles", "") == 0.0
+
+
+def test_search_ranks_and_thresholds() -> None:
+    index: TrigramIndex[int] = TrigramIndex()
+    index.update([(1, "Radiohead essentials"), (2, "Radio hits"), (3, "Jazz classics"), (4, "Radiohead")])
+
+    results = index.search("radiohaed")
+    assert [key for key, _ in results] == [4, 2]
+    assert [score for _, score in results] == pytest.approx([3 / 7, 0.3125])
+    assert [key for key, _ in index.search("radiohaed", threshold=0.2, limit=3)] == [4, 2, 1]
+    assert [key for key, _ in index.search("radiohaed", limit=1)] == [4]
+    assert index.search("radiohaed", threshold=0.9) == []
+    assert index.search("...") == []
+
+
+def test_replace_discard_and_eviction() -> None:
+    index: TrigramIndex[str] = TrigramIndex(max_size=2)
+    index.add("a", "Daft Punk")
+    index.add("a", "Justice")
+    assert index.search("daft punk") == []
+    assert index.search("justice")[0][0] == "a"
+
+    index.add("b", "Air")
+    index.add("c", "Phoenix")
+    assert len(index) == 2
+    assert "a" not in index
+    index.discard("b")
+    assert [key for key, _ in index.search("phoenix")] == ["c"]